@@ -0,0 +1,28 @@
+"""job model tier
+
+Revision ID: 0b7e5d2a9c84
+Revises: f3a9c1d7b245
+Create Date: 2026-10-18 21:34:08.915263
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7e5d2a9c84'
+down_revision = 'f3a9c1d7b245'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Skip if create_all already added it (databases predating migrations)
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('generation_jobs')}
+    if 'model_tier' not in columns:
+        # Existing jobs are routed by prompt size, as before
+        op.add_column('generation_jobs', sa.Column('model_tier', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('generation_jobs', 'model_tier')
@@ -0,0 +1,29 @@
+"""document content hash
+
+Revision ID: 5c0d2e7f14b9
+Revises: a88e08c36c37
+Create Date: 2026-10-18 14:02:10.412377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c0d2e7f14b9'
+down_revision = 'a88e08c36c37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Skip if create_all already added it (databases predating migrations)
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('documents')}
+    if 'content_sha256' not in columns:
+        op.add_column('documents', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+        op.create_index(op.f('ix_documents_content_sha256'), 'documents', ['content_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_documents_content_sha256'), table_name='documents')
+    op.drop_column('documents', 'content_sha256')
@@ -0,0 +1,31 @@
+"""job owner and heartbeat
+
+Revision ID: 7d4c8e1f3a60
+Revises: 0b7e5d2a9c84
+Create Date: 2026-10-18 22:02:47.310586
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4c8e1f3a60'
+down_revision = '0b7e5d2a9c84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Skip if create_all already added them (databases predating migrations)
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('generation_jobs')}
+    if 'owner' not in columns:
+        op.add_column('generation_jobs', sa.Column('owner', sa.String(), nullable=True))
+    if 'heartbeat_at' not in columns:
+        # Unfinished jobs without a heartbeat count as abandoned and are re-queued
+        op.add_column('generation_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('generation_jobs', 'heartbeat_at')
+    op.drop_column('generation_jobs', 'owner')
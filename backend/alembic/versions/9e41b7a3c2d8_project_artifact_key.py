@@ -0,0 +1,29 @@
+"""project artifact key
+
+Revision ID: 9e41b7a3c2d8
+Revises: 5c0d2e7f14b9
+Create Date: 2026-10-18 15:20:37.106254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e41b7a3c2d8'
+down_revision = '5c0d2e7f14b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Skip if create_all already added it (databases predating migrations)
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('generated_projects')}
+    if 'artifact_key' not in columns:
+        op.add_column('generated_projects', sa.Column('artifact_key', sa.String(length=64), nullable=True))
+        op.create_index(op.f('ix_generated_projects_artifact_key'), 'generated_projects', ['artifact_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_generated_projects_artifact_key'), table_name='generated_projects')
+    op.drop_column('generated_projects', 'artifact_key')
@@ -0,0 +1,106 @@
+"""initial schema
+
+Revision ID: a88e08c36c37
+Revises: 
+Create Date: 2026-10-18 13:48:44.998163
+
+Tables as created by Base.metadata.create_all before migrations were
+introduced. Tables that already exist are skipped, so databases created by
+create_all (which may hold only some of them) upgrade in place.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a88e08c36c37'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'documents' not in existing:
+        op.create_table('documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('document_id', sa.String(), nullable=True),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('file_type', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_documents_document_id'), 'documents', ['document_id'], unique=True)
+        op.create_index(op.f('ix_documents_id'), 'documents', ['id'], unique=False)
+
+    if 'generated_projects' not in existing:
+        op.create_table('generated_projects',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.String(), nullable=True),
+        sa.Column('prompt', sa.Text(), nullable=True),
+        sa.Column('files_json', sa.Text(), nullable=True),
+        sa.Column('zip_path', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_generated_projects_id'), 'generated_projects', ['id'], unique=False)
+        op.create_index(op.f('ix_generated_projects_project_id'), 'generated_projects', ['project_id'], unique=True)
+
+    if 'generation_cache' not in existing:
+        op.create_table('generation_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cache_key', sa.String(), nullable=True),
+        sa.Column('model_name', sa.String(), nullable=True),
+        sa.Column('project_id', sa.String(), nullable=True),
+        sa.Column('hit_count', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('last_used_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_generation_cache_cache_key'), 'generation_cache', ['cache_key'], unique=True)
+        op.create_index(op.f('ix_generation_cache_expires_at'), 'generation_cache', ['expires_at'], unique=False)
+        op.create_index(op.f('ix_generation_cache_id'), 'generation_cache', ['id'], unique=False)
+        op.create_index(op.f('ix_generation_cache_last_used_at'), 'generation_cache', ['last_used_at'], unique=False)
+        op.create_index(op.f('ix_generation_cache_project_id'), 'generation_cache', ['project_id'], unique=False)
+
+    if 'generation_jobs' not in existing:
+        op.create_table('generation_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('prompt', sa.Text(), nullable=True),
+        sa.Column('use_cache', sa.Boolean(), nullable=True),
+        sa.Column('project_id', sa.String(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_generation_jobs_id'), 'generation_jobs', ['id'], unique=False)
+        op.create_index(op.f('ix_generation_jobs_job_id'), 'generation_jobs', ['job_id'], unique=True)
+        op.create_index(op.f('ix_generation_jobs_status'), 'generation_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index(op.f('ix_generation_jobs_status'), table_name='generation_jobs')
+    op.drop_index(op.f('ix_generation_jobs_job_id'), table_name='generation_jobs')
+    op.drop_index(op.f('ix_generation_jobs_id'), table_name='generation_jobs')
+    op.drop_table('generation_jobs')
+    op.drop_index(op.f('ix_generation_cache_project_id'), table_name='generation_cache')
+    op.drop_index(op.f('ix_generation_cache_last_used_at'), table_name='generation_cache')
+    op.drop_index(op.f('ix_generation_cache_id'), table_name='generation_cache')
+    op.drop_index(op.f('ix_generation_cache_expires_at'), table_name='generation_cache')
+    op.drop_index(op.f('ix_generation_cache_cache_key'), table_name='generation_cache')
+    op.drop_table('generation_cache')
+    op.drop_index(op.f('ix_generated_projects_project_id'), table_name='generated_projects')
+    op.drop_index(op.f('ix_generated_projects_id'), table_name='generated_projects')
+    op.drop_table('generated_projects')
+    op.drop_index(op.f('ix_documents_id'), table_name='documents')
+    op.drop_index(op.f('ix_documents_document_id'), table_name='documents')
+    op.drop_table('documents')
+    # ### end Alembic commands ###
\ No newline at end of file
@@ -0,0 +1,30 @@
+"""compact project storage
+
+Revision ID: c7a5f0d91e36
+Revises: 9e41b7a3c2d8
+Create Date: 2026-10-18 16:05:12.730114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a5f0d91e36'
+down_revision = '9e41b7a3c2d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Skip columns create_all already added (databases predating migrations)
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('generated_projects')}
+    if 'project_data' not in columns:
+        op.add_column('generated_projects', sa.Column('project_data', sa.LargeBinary(), nullable=True))
+    if 'raw_text' not in columns:
+        op.add_column('generated_projects', sa.Column('raw_text', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('generated_projects', 'raw_text')
+    op.drop_column('generated_projects', 'project_data')
@@ -0,0 +1,66 @@
+"""full text search
+
+Revision ID: d2f8a4b61e07
+Revises: c7a5f0d91e36
+Create Date: 2026-10-18 18:40:09.517320
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f8a4b61e07'
+down_revision = 'c7a5f0d91e36'
+branch_labels = None
+depends_on = None
+
+# (table, column): documents.content and generated_projects.prompt
+TARGETS = [('documents', 'content'), ('generated_projects', 'prompt')]
+
+
+def _tsvector(table: str, column: str) -> str:
+    return f"to_tsvector('simple', left(coalesce({table}.{column}, ''), 500000))"
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table, column in TARGETS:
+        fts = f'{table}_fts'
+        if dialect == 'sqlite':
+            # IF NOT EXISTS: create_all databases already have them
+            op.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"{column}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+                f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+            )
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        elif dialect == 'postgresql':
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_fts "
+                f"ON {table} USING gin (({_tsvector(table, column)}))"
+            )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table, column in TARGETS:
+        fts = f'{table}_fts'
+        if dialect == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
+        elif dialect == 'postgresql':
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_fts")
@@ -0,0 +1,28 @@
+"""document section index
+
+Revision ID: e6b13c9a5f20
+Revises: d2f8a4b61e07
+Create Date: 2026-10-18 19:25:41.208833
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b13c9a5f20'
+down_revision = 'd2f8a4b61e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Skip if create_all already added it (databases predating migrations)
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('documents')}
+    if 'section_index' not in columns:
+        # Existing documents get their index built on first top-k composition
+        op.add_column('documents', sa.Column('section_index', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'section_index')
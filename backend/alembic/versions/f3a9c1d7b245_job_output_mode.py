@@ -0,0 +1,28 @@
+"""job output mode
+
+Revision ID: f3a9c1d7b245
+Revises: e6b13c9a5f20
+Create Date: 2026-10-18 21:10:32.547019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9c1d7b245'
+down_revision = 'e6b13c9a5f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Skip if create_all already added it (databases predating migrations)
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('generation_jobs')}
+    if 'output_mode' not in columns:
+        # Existing jobs keep running in the default GENERATION_OUTPUT_MODE
+        op.add_column('generation_jobs', sa.Column('output_mode', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('generation_jobs', 'output_mode')
@@ -0,0 +1,129 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, sessionmaker
+from pydantic import BaseModel, Field
+from typing import FrozenSet, List, Optional
+import json
+from ..config import settings
+from ..database import get_async_db, get_session_factory
+from ..models.models import Document
+from ..services.batch_generation import BatchGeneration, BatchItem
+from ..services.model_router import model_router
+from ..services.rate_limiter import Admission, RateLimited, admit_batch
+from ..services.section_index import load_section_index
+from ..services.generative import GenerativeService, get_generative_service
+from .generation import response_fields
+
+router = APIRouter()
+
+class CompositionSpec(BaseModel):
+    name: Optional[str] = None  # echoed back to tell the variants apart
+    snippet_ids: List[str] = []
+    practice_ids: List[str] = []
+    extra_instructions: Optional[str] = None
+    token_budget: Optional[int] = Field(default=None, gt=0)
+    section_top_k: Optional[int] = Field(default=None, gt=0)
+    tier: Optional[str] = None  # a key of GEMINI_MODEL_TIERS; default: routed by prompt size
+
+class BatchGenerateRequest(BaseModel):
+    document_id: str
+    specs: List[CompositionSpec] = Field(min_length=1)
+    use_cache: bool = True
+    max_concurrency: Optional[int] = Field(default=None, gt=0)  # capped at BATCH_MAX_CONCURRENCY
+
+async def _compose_batch(request: BatchGenerateRequest, db: AsyncSession) -> List[BatchItem]:
+    if len(request.specs) > settings.BATCH_MAX_SPECS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many specs: {len(request.specs)} (maximum {settings.BATCH_MAX_SPECS})"
+        )
+    for spec in request.specs:
+        try:
+            model_router.validate_tier(spec.tier)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # Fetched once for the whole batch; the section index only if a spec uses it
+    needs_index = any(spec.section_top_k for spec in request.specs)
+    query = select(Document).where(Document.document_id == request.document_id)
+    if not needs_index:
+        query = query.options(defer(Document.section_index))
+    document = await db.scalar(query)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    section_index = await load_section_index(db, document) if needs_index else None
+    
+    return BatchGeneration.compose(
+        document.content or "", [spec.model_dump() for spec in request.specs], section_index
+    )
+
+async def _admit(http_request: Request, items: List[BatchItem]) -> Admission:
+    """One token and (up to the client's limit) one concurrency slot per spec, not per batch"""
+    try:
+        return await admit_batch(http_request.scope, len(items))
+    except RateLimited as e:
+        raise HTTPException(status_code=429, detail=e.detail, headers={"Retry-After": str(e.retry_after_seconds)})
+
+def _max_concurrency(request: BatchGenerateRequest, admission: Admission) -> int:
+    max_concurrency = min(request.max_concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY)
+    # Never more generations at once than the slots the batch was admitted with
+    return min(max_concurrency, admission.slots) if admission.slots else max_concurrency
+
+@router.post("/generate-batch")
+async def generate_batch(
+    request: BatchGenerateRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    generative_service: GenerativeService = Depends(get_generative_service),
+    fields: Optional[FrozenSet[str]] = Depends(response_fields)
+):
+    """Compose one prompt per spec from the same document and generate them concurrently"""
+    
+    items = await _compose_batch(request, db)
+    admission = await _admit(http_request, items)
+    results = [
+        result async for result in BatchGeneration.run(
+            items, session_factory, generative_service, _max_concurrency(request, admission),
+            use_cache=request.use_cache, fields=fields
+        )
+    ]
+    results.sort(key=lambda result: result["index"])
+    
+    return {"document_id": request.document_id, "results": results}
+
+@router.post("/generate-batch/stream")
+async def generate_batch_stream(
+    request: BatchGenerateRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    generative_service: GenerativeService = Depends(get_generative_service),
+    fields: Optional[FrozenSet[str]] = Depends(response_fields)
+):
+    """Batch generation streamed as NDJSON: one result event per spec as it finishes, then done"""
+    
+    items = await _compose_batch(request, db)
+    admission = await _admit(http_request, items)
+    
+    async def event_stream():
+        completed = failed = 0
+        async for result in BatchGeneration.run(
+            items, session_factory, generative_service, _max_concurrency(request, admission),
+            use_cache=request.use_cache, fields=fields
+        ):
+            if result["status"] == "completed":
+                completed += 1
+            else:
+                failed += 1
+            yield json.dumps({"type": "result", **result}) + "\n"
+        yield json.dumps({"type": "done", "completed": completed, "failed": failed}) + "\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
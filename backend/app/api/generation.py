@@ -1,79 +1,187 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session, sessionmaker
 from pydantic import BaseModel
-import uuid
+from typing import FrozenSet, Literal, Optional
 import json
 import os
-from ..database import get_db
+from ..database import get_db, get_session_factory
 from ..models.models import GeneratedProject
-from ..services.generative import GenerativeService
+from ..services.generation_pipeline import GenerationPipeline
+from ..services.generative import GenerativeService, get_generative_service
+from ..services.model_router import model_router
+from ..services.artifact_store import ArtifactInfo, ArtifactStore, get_artifact_store
 from ..services.project_generator import ProjectGenerator
+from ..services.project_storage import ProjectStorage
+from ..services.structured_output import structured_stats
+from .conditional import RangeNotSatisfiable, etag_matches, parse_byte_range
 
 router = APIRouter()
 
 class GenerateCodeRequest(BaseModel):
     prompt: str
+    use_cache: bool = True  # False forces a fresh generation
+    output_mode: Optional[Literal["text", "structured"]] = None  # defaults to GENERATION_OUTPUT_MODE
+    tier: Optional[str] = None  # a key of GEMINI_MODEL_TIERS; default: routed by prompt size
+
+def validate_model_tier(request: GenerateCodeRequest) -> None:
+    try:
+        model_router.validate_tier(request.tier)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def response_fields(
+    fields: Optional[str] = Query(
+        None, description="Comma-separated subset of the result, e.g. project_id,download_url"
+    )
+) -> Optional[FrozenSet[str]]:
+    try:
+        return GenerationPipeline.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/generate-code")
 async def generate_code(
     request: GenerateCodeRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    generative_service: GenerativeService = Depends(get_generative_service),
+    fields: Optional[FrozenSet[str]] = Depends(response_fields)
 ):
     """Generate code from prompt using AI"""
     
+    validate_model_tier(request)
     try:
-        # Generate code using AI service
-        generative_service = GenerativeService()
-        generated_data = generative_service.generate_code(request.prompt)
+        response = await GenerationPipeline.run(
+            request.prompt, db, generative_service,
+            use_cache=request.use_cache, output_mode=request.output_mode, model_tier=request.tier
+        )
+        return GenerationPipeline.select_fields(response, fields)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating code: {str(e)}")
 
-        # Create project ZIP
-        zip_path = ProjectGenerator.create_project_zip(generated_data)
+@router.get("/generate-code/structured/stats")
+async def structured_output_stats():
+    """Structured mode failure rates and the token cost of repairs vs full regenerations"""
+    
+    return structured_stats.stats()
 
-        # Generate project ID
-        project_id = str(uuid.uuid4())
+@router.get("/generate-code/models/stats")
+async def model_stats():
+    """Per-model calls, errors, timeouts, hedges and fallbacks, and recent latency / error rate (this worker)"""
+    
+    return {"models": model_router.snapshot()}
 
-        # Save to database
-        db_project = GeneratedProject(
-            project_id=project_id,
-            prompt=request.prompt,
-            files_json=json.dumps(generated_data),
-            zip_path=zip_path
-        )
+@router.post("/generate-code/stream")
+async def generate_code_stream(
+    request: GenerateCodeRequest,
+    session_factory: sessionmaker = Depends(get_session_factory),
+    generative_service: GenerativeService = Depends(get_generative_service),
+    fields: Optional[FrozenSet[str]] = Depends(response_fields)
+):
+    """Generate code, streaming NDJSON events: model text chunks, files as they close, then the result"""
 
-        db.add(db_project)
-        db.commit()
-        db.refresh(db_project)
+    validate_model_tier(request)
 
-        return {
-            "project_id": project_id,
-            "files": generated_data.get("files", []),
-            "download_url": f"/api/download/{project_id}",
-            "raw_text": generated_data.get("raw_text", ""),
-            "instructions": generated_data.get("instructions", "")
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating code: {str(e)}")
+    async def event_stream():
+        # Dependencies are torn down before the body streams: the session belongs to the stream
+        db = session_factory()
+        try:
+            async for event in GenerationPipeline.run_stream(
+                request.prompt, db, generative_service, use_cache=request.use_cache, model_tier=request.tier
+            ):
+                if event["type"] == "done":
+                    event = GenerationPipeline.select_fields(event, fields)
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": f"Error generating code: {str(e)}"}) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/download/{project_id}")
 async def download_project(
     project_id: str,
+    range_header: Optional[str] = Header(None, alias="range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Download generated project as ZIP file"""
+    """Download generated project as ZIP file (supports Range and If-None-Match)"""
     
-    # Get project from database
-    project = db.query(GeneratedProject).filter(GeneratedProject.project_id == project_id).first()
+    # Get project from database (sync session: off the event loop)
+    project = await run_in_threadpool(
+        lambda: db.query(GeneratedProject).filter(GeneratedProject.project_id == project_id).first()
+    )
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Check if ZIP file exists
-    if not os.path.exists(project.zip_path):
+    filename = f"generated_project_{project_id}.zip"
+    
+    if project.artifact_key:
+        store = get_artifact_store()
+        info = await run_in_threadpool(store.stat, project.artifact_key)
+        if info is not None:
+            return await _artifact_response(store, info, filename, range_header, if_range, if_none_match)
+    
+    # Projects saved before the artifact store
+    elif project.zip_path and os.path.exists(project.zip_path):
+        return FileResponse(
+            path=project.zip_path,
+            filename=filename,
+            media_type="application/zip"
+        )
+    
+    # ZIP evicted (or on another host): rebuild it on the fly from the stored files
+    if not ProjectStorage.has_data(project):
         raise HTTPException(status_code=404, detail="Project file not found")
+    project_data = await run_in_threadpool(ProjectStorage.load, project, False)
+    return StreamingResponse(
+        ProjectGenerator.stream_project_zip(project_data),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+async def _artifact_response(
+    store: ArtifactStore,
+    info: ArtifactInfo,
+    filename: str,
+    range_header: Optional[str],
+    if_range: Optional[str],
+    if_none_match: Optional[str]
+) -> Response:
+    # Content-addressed: the key is a strong ETag
+    etag = f'"{info.key}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{filename}"'
+    }
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    byte_range = None
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_byte_range(range_header, info.size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{info.size}"})
+    
+    await run_in_threadpool(store.touch, info.key)
+    
+    if byte_range is None:
+        headers["Content-Length"] = str(info.size)
+        return StreamingResponse(store.iter_bytes(info.key), media_type="application/zip", headers=headers)
     
-    return FileResponse(
-        path=project.zip_path,
-        filename=f"generated_project_{project_id}.zip",
-        media_type="application/zip"
-    )
\ No newline at end of file
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{info.size}"
+    headers["Content-Length"] = str(end - start)
+    return StreamingResponse(
+        store.iter_bytes(info.key, start, end), status_code=206, media_type="application/zip", headers=headers
+    )
@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from typing import Optional
+import base64
+from ..config import settings
+from ..database import get_async_db
+from ..models.models import Document, GeneratedProject
+from ..services.search_index import match_clause
+
+router = APIRouter()
+
+PREVIEW_CHARS = 200
+
+def encode_cursor(row_id: int) -> str:
+    return base64.urlsafe_b64encode(str(row_id).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def page_size(limit: Optional[int]) -> int:
+    return min(limit or settings.LIST_PAGE_SIZE, settings.LIST_MAX_PAGE_SIZE)
+
+async def fetch_page(db: AsyncSession, model, columns, text_column, q: Optional[str], cursor: Optional[str], limit: int):
+    """
+    One page, newest first, as (row, preview) pairs plus the next cursor.
+
+    Keyset pagination: the cursor is the last id served, so a page costs the
+    same however deep it is. Only `columns` are loaded, and the large text
+    column only as a short preview computed by the database.
+    """
+    preview = func.substr(text_column, 1, PREVIEW_CHARS + 1).label("preview")
+    query = select(model, preview).options(load_only(*columns))
+    if cursor:
+        query = query.where(model.id < decode_cursor(cursor))
+    if q and q.strip():
+        query = query.where(match_clause(model.__table__, q, db.bind.dialect.name))
+    rows = (await db.execute(query.order_by(model.id.desc()).limit(limit + 1))).all()
+
+    next_cursor = encode_cursor(rows[limit - 1][0].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+def _preview(text: Optional[str]) -> str:
+    text = text or ""
+    return text[:PREVIEW_CHARS] + "..." if len(text) > PREVIEW_CHARS else text
+
+@router.get("/documents")
+async def list_documents(
+    q: Optional[str] = Query(None, description="Full-text search over the document content"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Uploaded documents, newest first; `next_cursor` fetches the following page"""
+
+    limit = page_size(limit)
+    columns = (Document.id, Document.document_id, Document.filename, Document.file_type, Document.created_at)
+    rows, next_cursor = await fetch_page(db, Document, columns, Document.content, q, cursor, limit)
+    return {
+        "items": [
+            {
+                "document_id": document.document_id,
+                "filename": document.filename,
+                "file_type": document.file_type,
+                "content_preview": _preview(preview),
+                "created_at": document.created_at,
+            }
+            for document, preview in rows
+        ],
+        "next_cursor": next_cursor
+    }
+
+@router.get("/projects")
+async def list_projects(
+    q: Optional[str] = Query(None, description="Full-text search over the generation prompt"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Generated projects, newest first; `next_cursor` fetches the following page"""
+
+    limit = page_size(limit)
+    columns = (GeneratedProject.id, GeneratedProject.project_id, GeneratedProject.created_at)
+    rows, next_cursor = await fetch_page(db, GeneratedProject, columns, GeneratedProject.prompt, q, cursor, limit)
+    return {
+        "items": [
+            {
+                "project_id": project.project_id,
+                "prompt_preview": _preview(preview),
+                "download_url": f"/api/download/{project.project_id}",
+                "created_at": project.created_at,
+            }
+            for project, preview in rows
+        ],
+        "next_cursor": next_cursor
+    }
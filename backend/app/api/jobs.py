@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+from typing import FrozenSet, Optional
+from ..services.generation_pipeline import GenerationPipeline
+from ..services.job_queue import GenerationJobQueue, QueueFullError, TERMINAL_STATUSES
+from .generation import GenerateCodeRequest, response_fields, validate_model_tier
+
+router = APIRouter()
+
+# How often the event stream re-reads the DB (jobs may run in another worker process)
+EVENTS_POLL_INTERVAL = 5.0
+
+def get_job_queue(request: Request) -> GenerationJobQueue:
+    job_queue = getattr(request.app.state, "job_queue", None)
+    if job_queue is None:
+        raise HTTPException(status_code=503, detail="Job queue is not running")
+    return job_queue
+
+@router.post("/generate-code/jobs", status_code=202)
+async def submit_generation_job(request: GenerateCodeRequest, http_request: Request):
+    """Queue a code generation job and return its id immediately"""
+
+    job_queue = get_job_queue(http_request)
+    validate_model_tier(request)
+    try:
+        job = job_queue.submit(
+            request.prompt, use_cache=request.use_cache, output_mode=request.output_mode, model_tier=request.tier
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    job_id = job["job_id"]
+    return {
+        **job,
+        "status_url": f"/api/generate-code/jobs/{job_id}",
+        "events_url": f"/api/generate-code/jobs/{job_id}/events"
+    }
+
+@router.get("/generate-code/jobs/{job_id}")
+async def get_generation_job(
+    job_id: str,
+    http_request: Request,
+    fields: Optional[FrozenSet[str]] = Depends(response_fields)
+):
+    """Poll a generation job; includes the result once completed"""
+
+    job = get_job_queue(http_request).get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if "result" in job:
+        job["result"] = GenerationPipeline.select_fields(job["result"], fields)
+    return job
+
+@router.get("/generate-code/jobs/{job_id}/events")
+async def stream_generation_job(job_id: str, http_request: Request):
+    """Server-sent events with each status change until the job finishes"""
+
+    job_queue = get_job_queue(http_request)
+    job = job_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        events = job_queue.subscribe(job_id)
+        try:
+            current = job
+            yield _format_event(current)
+            while current["status"] not in TERMINAL_STATUSES:
+                try:
+                    update = await asyncio.wait_for(events.get(), timeout=EVENTS_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    update = job_queue.get_job(job_id)
+                    if update["status"] == current["status"]:
+                        yield ": keep-alive\n\n"
+                        continue
+                if update["status"] == "completed" and "result" not in update:
+                    update = job_queue.get_job(job_id)
+                current = update
+                yield _format_event(current)
+        finally:
+            job_queue.unsubscribe(job_id, events)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _format_event(payload: dict) -> str:
+    return f"event: {payload['status']}\ndata: {json.dumps(payload)}\n\n"
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from ..config import settings
+from ..services.generation_cache import generation_cache
+from ..services.metrics import JOB_QUEUE_DEPTH, MetricsRegistry, registry
+from ..services.model_router import ModelRouter, model_router
+from ..services.structured_output import structured_stats
+from ..services.upload_dedup import upload_dedup
+
+router = APIRouter()
+
+# Counters the services already keep, read at scrape time
+registry.callback(
+    "generation_cache_requests_total", "Generation cache lookups by result", "counter",
+    lambda: {("hit",): generation_cache.hits, ("miss",): generation_cache.misses}, ("result",)
+)
+registry.callback(
+    "generation_cache_memory_entries", "Entries in the in-memory generation cache", "gauge",
+    lambda: {(): generation_cache.stats()["memory_entries"]}
+)
+registry.callback(
+    "upload_dedup_requests_total", "Upload deduplication lookups by result", "counter",
+    lambda: {("hit",): upload_dedup.hits, ("miss",): upload_dedup.misses}, ("result",)
+)
+registry.callback(
+    "structured_generations_total", "Structured generations by outcome", "counter",
+    lambda: {
+        (outcome,): structured_stats.stats()[outcome]
+        for outcome in ("valid_first_attempt", "repaired", "failed")
+    },
+    ("outcome",)
+)
+registry.callback(
+    "llm_model_events_total", "Gemini calls per model: answered, failed, timed out, hedged, fallbacks", "counter",
+    lambda: {
+        (model, event): stats[event]
+        for model, stats in model_router.snapshot().items()
+        for event in ModelRouter.EVENTS
+    },
+    ("model", "event")
+)
+registry.callback(
+    "llm_model_latency_seconds", "Recent Gemini latency percentiles per model (hedge delay source)", "gauge",
+    lambda: {
+        (model, quantile): stats[key]
+        for model, stats in model_router.snapshot().items()
+        for quantile, key in (("0.5", "latency_p50_s"), ("0.95", "latency_p95_s"))
+        if stats[key] is not None
+    },
+    ("model", "quantile")
+)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """Prometheus text exposition of this worker's metrics"""
+
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+
+    job_queue = getattr(request.app.state, "job_queue", None)
+    if job_queue is not None:
+        JOB_QUEUE_DEPTH.set(job_queue.depth)
+    return PlainTextResponse(registry.render(), media_type=MetricsRegistry.CONTENT_TYPE)
@@ -1,52 +1,26 @@
-from fastapi import APIRouter, HTTPException
-import os
-import glob
+from fastapi import APIRouter, Header, Response
+from typing import Optional
+from ..services.practices_registry import practices_registry
+from .conditional import etag_matches
 
 router = APIRouter()
 
 @router.get("/practices")
-async def get_practices():
+async def get_practices(if_none_match: Optional[str] = Header(None)):
     """Get all available best practices from markdown files"""
     
-    practices_dir = os.path.join(os.path.dirname(__file__), "..", "practices")
-    practices = []
+    etag = practices_registry.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
     
-    if not os.path.exists(practices_dir):
-        return {"practices": []}
+    # Client already has this version of the library
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
     
-    # Read all markdown files in practices directory
-    md_files = glob.glob(os.path.join(practices_dir, "*.md"))
-    
-    for file_path in md_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-                # Extract title from filename or first line
-                filename = os.path.basename(file_path)
-                practice_id = filename.replace('.md', '')
-                title = practice_id.replace('_', ' ').replace('-', ' ').title()
-                
-                # Extract excerpt (first paragraph or first 200 chars)
-                lines = content.split('\n')
-                excerpt = ""
-                for line in lines:
-                    if line.strip() and not line.startswith('#'):
-                        excerpt = line.strip()
-                        break
-                
-                if not excerpt and content:
-                    excerpt = content[:200] + "..." if len(content) > 200 else content
-                
-                practices.append({
-                    "id": practice_id,
-                    "title": title,
-                    "excerpt": excerpt,
-                    "content": content
-                })
-                
-        except Exception as e:
-            print(f"Error reading practice file {file_path}: {e}")
-            continue
+    return Response(content=practices_registry.payload, media_type="application/json", headers=headers)
+
+@router.post("/practices/reload")
+async def reload_practices():
+    """Re-read practice files changed on disk"""
     
-    return {"practices": practices}
\ No newline at end of file
+    changed = practices_registry.refresh()
+    return {"changed": changed, "etag": practices_registry.etag}
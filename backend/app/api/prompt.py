@@ -1,11 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from pydantic import BaseModel, Field
 from typing import List, Optional
-from ..database import get_db
+from ..database import get_async_db
 from ..models.models import Document
-from ..snippets import SNIPPETS
-from ..api.practices import get_practices
+from ..services.prompt_composer import PromptComposer
+from ..services.section_index import load_section_index
 
 router = APIRouter()
 
@@ -14,65 +16,35 @@ class ComposePromptRequest(BaseModel):
     snippet_ids: List[str] = []
     practice_ids: List[str] = []
     extra_instructions: Optional[str] = None
+    token_budget: Optional[int] = Field(default=None, gt=0)  # defaults to PROMPT_TOKEN_BUDGET
+    section_top_k: Optional[int] = Field(default=None, gt=0)  # only the k most relevant document sections
 
 @router.post("/compose-prompt")
 async def compose_prompt(
     request: ComposePromptRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Compose final prompt from document, snippets, and practices"""
     
     # Get document content
-    document = db.query(Document).filter(Document.document_id == request.document_id).first()
+    query = select(Document).where(Document.document_id == request.document_id)
+    if not request.section_top_k:
+        query = query.options(defer(Document.section_index))
+    document = await db.scalar(query)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    # Start building the prompt
-    prompt_parts = []
+    section_index = await load_section_index(db, document) if request.section_top_k else None
     
-    # Add document content
-    prompt_parts.append("## Document Requirements")
-    prompt_parts.append(document.content)
-    prompt_parts.append("")
-    
-    # Add selected snippets
-    if request.snippet_ids:
-        prompt_parts.append("## Prompt Engineering Context")
-        for snippet_id in request.snippet_ids:
-            if snippet_id in SNIPPETS:
-                snippet = SNIPPETS[snippet_id]
-                prompt_parts.append(f"### {snippet['title']}")
-                prompt_parts.append(snippet['content'])
-                prompt_parts.append("")
-    
-    # Add selected practices
-    if request.practice_ids:
-        practices_response = await get_practices()
-        practices = {p['id']: p for p in practices_response['practices']}
-        
-        prompt_parts.append("## Best Practices to Apply")
-        for practice_id in request.practice_ids:
-            if practice_id in practices:
-                practice = practices[practice_id]
-                prompt_parts.append(f"### {practice['title']}")
-                prompt_parts.append(practice['content'])
-                prompt_parts.append("")
-    
-    # Add extra instructions
-    if request.extra_instructions:
-        prompt_parts.append("## Additional Instructions")
-        prompt_parts.append(request.extra_instructions)
-        prompt_parts.append("")
-    # Add final instruction (always include - not only when extra_instructions provided)
-    prompt_parts.append("## Output Requirements")
-    prompt_parts.append(
-        """
-        Por favor, gere um projeto completo e funcional com base nos requisitos acima.
-        Retorne o código SEM comentários dentro dos blocos de código. Todas as explicações, instruções e descrições devem ser fornecidas separadamente, no campo de instruções, nunca como comentários no código.
-        Para cada bloco de código que você gerar, use sempre três crases seguidas pelo nome da linguagem (por exemplo, python, js, java, etc.) e feche com três crases.
-        Explique o funcionamento dos blocos de código apenas no campo de instruções, usando Markdown, nunca dentro do código.
-        """
+    # Sections are fitted to the token budget; per-section counts are reported
+    composed = PromptComposer.compose(
+        document.content or "",
+        request.snippet_ids,
+        request.practice_ids,
+        request.extra_instructions,
+        request.token_budget,
+        section_top_k=request.section_top_k,
+        section_index=section_index
     )
-    final_prompt = "\n".join(prompt_parts)
     
-    return {"prompt": final_prompt}
\ No newline at end of file
+    return composed.to_response()
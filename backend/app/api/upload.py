@@ -1,60 +1,145 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException
 import uuid
-from ..database import get_db
+from ..config import settings
+from ..database import get_async_db
 from ..models.models import Document
-from ..services.document_parser import DocumentParser
+from ..services.metrics import SECTION_INDEX_DURATION, UPLOAD_PARSE_DURATION
+from ..services.parse_pool import ParsePool, ParseTimeoutError, get_parse_pool
+from ..services.section_index import SectionIndex
+from ..services.upload_dedup import upload_dedup
+from ..services.upload_spool import (
+    MULTIPART_OVERHEAD_BYTES,
+    SpoolingMultiPartParser,
+    UploadTooLargeError,
+)
 
 router = APIRouter()
 
-@router.post("/upload")
+# The body is parsed by hand (to stream it with a size cap), so describe it for the docs
+UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+                "required": ["file"]
+            }
+        }
+    }
+}
+
+async def receive_upload(request: Request) -> UploadFile:
+    """Stream the multipart body into a spooled temp file, rejecting oversized uploads early"""
+
+    max_bytes = settings.UPLOAD_MAX_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds the maximum upload size of {max_bytes} bytes")
+
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    parser = SpoolingMultiPartParser(
+        request.headers,
+        request.stream(),
+        max_upload_bytes=max_bytes,
+        spool_max_size=settings.UPLOAD_SPOOL_MEMORY_BYTES
+    )
+    try:
+        form = await parser.parse()
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except MultiPartException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    file = form.get("file")
+    if not isinstance(file, UploadFile) or not file.filename:
+        await form.close()
+        raise HTTPException(status_code=400, detail="Missing file field")
+    return file
+
+@router.post("/upload", openapi_extra={"requestBody": UPLOAD_REQUEST_BODY})
 async def upload_document(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    parse_pool: ParsePool = Depends(get_parse_pool)
 ):
     """Upload and parse a document"""
-    
+
+    file = await receive_upload(request)
+    try:
+        return await _store_document(file, db, parse_pool)
+    finally:
+        await file.close()
+
+async def _store_document(file: UploadFile, db: AsyncSession, parse_pool: ParsePool):
     # Check file type
     allowed_types = ['.docx', '.pdf', '.md', '.txt']
     file_extension = '.' + file.filename.split('.')[-1].lower()
-    
+
     if file_extension not in allowed_types:
         raise HTTPException(
-            status_code=400, 
+            status_code=400,
             detail=f"File type not supported. Allowed types: {', '.join(allowed_types)}"
         )
-    
+
+    # Same bytes uploaded before: reuse the extracted text, skip parsing
+    content_sha256 = file.file.sha256
+    existing = await upload_dedup.find(db, content_sha256, file_extension[1:])
+    if existing is not None:
+        return _document_response(existing, cached=True)
+
     try:
-        # Read file content
-        file_content = await file.read()
-        
-        # Parse document
-        content, file_type = await DocumentParser.parse_document(file_content, file.filename)
-        
+        # Parse in a worker process, straight from the spooled upload
+        with UPLOAD_PARSE_DURATION.time(file_type=file_extension[1:]):
+            content, file_type = await parse_pool.parse(file.file, file.filename)
+
+        # Split in sections and index them once, off the event loop; stored with the row
+        with SECTION_INDEX_DURATION.time():
+            section_index = await parse_pool.run(SectionIndex.build_bytes, content)
+
         # Generate unique document ID
         document_id = str(uuid.uuid4())
-        
+
         # Save to database
         db_document = Document(
             document_id=document_id,
             filename=file.filename,
             content=content,
-            file_type=file_type
+            file_type=file_type,
+            content_sha256=content_sha256,
+            section_index=section_index
         )
-        
+
         db.add(db_document)
-        db.commit()
-        db.refresh(db_document)
-        
-        return {
-            "document_id": document_id,
-            "filename": file.filename,
-            "file_type": file_type,
-            "content_preview": content[:200] + "..." if len(content) > 200 else content,
-            "content_length": len(content)
-        }
-        
+        await db.commit()
+
+        return _document_response(db_document, cached=False)
+
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ParseTimeoutError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
+
+@router.get("/upload/stats")
+async def upload_stats():
+    """Deduplication hit/miss counters for this worker"""
+    
+    return upload_dedup.stats()
+
+def _document_response(document: Document, cached: bool) -> dict:
+    content = document.content
+    return {
+        "document_id": document.document_id,
+        "filename": document.filename,
+        "file_type": document.file_type,
+        "content_preview": content[:200] + "..." if len(content) > 200 else content,
+        "content_length": len(content),
+        "cached": cached
+    }
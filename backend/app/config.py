@@ -1,11 +1,164 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     APP_ENV: str = "dev"
     DATABASE_URL: Optional[str] = None
     GEMINI_API_KEY: Optional[str] = None
+    GEMINI_BASE_URL: Optional[str] = None  # Override the Gemini endpoint (e.g. a local stub)
+    GEMINI_MODEL: str = "gemini-2.5-flash"
     PORT: int = 8000
+
+    # Database connection pool (sync and async engines)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Startup schema check against Alembic head: off, warn, fail or upgrade
+    DB_SCHEMA_CHECK: str = "warn"
+
+    # SQLite pragmas, applied on every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Gemini HTTP client (one pooled client per process)
+    GEMINI_TIMEOUT_SECONDS: float = 120.0
+    GEMINI_POOL_MAX_CONNECTIONS: int = 100
+    GEMINI_POOL_MAX_KEEPALIVE: int = 20
+    GEMINI_POOL_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    GEMINI_RETRY_ATTEMPTS: int = 3
+    GEMINI_RETRY_MAX_WAIT_SECONDS: float = 10.0
+
+    # Uploads: hard size limit, and how much of an upload stays in memory before spooling to disk
+    UPLOAD_MAX_BYTES: int = 50 * 1024 * 1024
+    UPLOAD_SPOOL_MEMORY_BYTES: int = 1024 * 1024
+
+    # Document parsing process pool (None = one worker per core, 0 = parse on a thread)
+    PARSE_POOL_WORKERS: Optional[int] = None
+    PARSE_TIMEOUT_SECONDS: float = 60.0
+    PARSE_PDF_PAGES_PER_TASK: int = 16
+
+    # Best-practices library: seconds between mtime checks (0 = only via POST /api/practices/reload)
+    PRACTICES_RELOAD_INTERVAL_SECONDS: float = 5.0
+
+    # Prompt composition: estimated-token budget, chars per token for the estimate,
+    # and the smallest cut section worth keeping (smaller ones are dropped)
+    PROMPT_TOKEN_BUDGET: int = 200_000
+    PROMPT_CHARS_PER_TOKEN: float = 4.0
+    PROMPT_MIN_SECTION_TOKENS: int = 32
+    # Share of the budget left by the required sections that the document keeps under any
+    # budget: snippets and practices are cut before the document goes below it
+    PROMPT_MIN_DOCUMENT_SHARE: float = 0.5
+    # Document sections (split at headings at upload, BM25-indexed): longer ones are split in parts
+    SECTION_MAX_TOKENS: int = 1000
+
+    # Generation ("text": free-form answer parsed afterwards, "structured": JSON mode with a
+    # response schema; invalid structured answers get up to GENERATION_REPAIR_ATTEMPTS repair requests)
+    GENERATION_OUTPUT_MODE: str = "text"
+    GENERATION_REPAIR_ATTEMPTS: int = 1
+    GENERATION_MAX_CONCURRENCY: int = 16
+    GENERATION_JOB_WORKERS: int = 4
+    GENERATION_QUEUE_MAX_DEPTH: int = 100
+    # A worker refreshes its running jobs' heartbeat; jobs whose heartbeat is older than
+    # GENERATION_JOB_STALE_SECONDS (their worker died) are re-queued by any live worker
+    GENERATION_JOB_HEARTBEAT_SECONDS: float = 10.0
+    GENERATION_JOB_STALE_SECONDS: float = 60.0
+
+    # Model routing: a request's tier picks from GEMINI_MODEL_TIERS, prompts over
+    # GEMINI_LARGE_PROMPT_TOKENS (estimated) go to GEMINI_LARGE_PROMPT_MODEL, the rest to
+    # GEMINI_MODEL. Failed or timed-out calls (GENERATION_MODEL_TIMEOUT_SECONDS, None = only the
+    # client timeout) move to GEMINI_FALLBACK_MODEL, tried first while the routed model fails
+    # over GENERATION_MODEL_MAX_ERROR_RATE of its calls in the last MODEL_STATS_WINDOW_SECONDS.
+    # A call slower than GENERATION_HEDGE_PERCENTILE of the model's last MODEL_STATS_MAX_SAMPLES
+    # latencies (once it has GENERATION_HEDGE_MIN_SAMPLES) is duplicated if a slot is free.
+    GEMINI_MODEL_TIERS: Dict[str, str] = {"fast": "gemini-2.5-flash-lite", "quality": "gemini-2.5-pro"}
+    GEMINI_LARGE_PROMPT_MODEL: Optional[str] = None
+    GEMINI_LARGE_PROMPT_TOKENS: int = 100_000
+    GEMINI_FALLBACK_MODEL: Optional[str] = None
+    GENERATION_MODEL_TIMEOUT_SECONDS: Optional[float] = None
+    GENERATION_MODEL_MAX_ERROR_RATE: float = 0.5
+    GENERATION_MODEL_MIN_CALLS: int = 5
+    GENERATION_HEDGE_ENABLED: bool = True
+    GENERATION_HEDGE_PERCENTILE: float = 0.95
+    GENERATION_HEDGE_MIN_SAMPLES: int = 20
+    GENERATION_HEDGE_MIN_DELAY_SECONDS: float = 0.5
+    MODEL_STATS_MAX_SAMPLES: int = 200
+    MODEL_STATS_WINDOW_SECONDS: float = 300.0
+
+    # Document / project listing: page size (keyset pagination, newest first)
+    LIST_PAGE_SIZE: int = 20
+    LIST_MAX_PAGE_SIZE: int = 100
+
+    # Batch compose-and-generate: specs per request, and generations in flight per batch
+    BATCH_MAX_SPECS: int = 16
+    BATCH_MAX_CONCURRENCY: int = 4
+
+    # Generation cache (identical prompts reuse the stored project)
+    GENERATION_CACHE_ENABLED: bool = True
+    GENERATION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    GENERATION_CACHE_MEMORY_ENTRIES: int = 256
+    GENERATION_CACHE_MAX_ROWS: int = 10000
+
+    # Stored generations (zlib level for project_data / raw_text; keep the raw model output or not)
+    PROJECT_DATA_COMPRESSION_LEVEL: int = 6
+    GENERATION_STORE_RAW_TEXT: bool = True
+
+    # Project ZIPs (deflate level 1-9, 0 = store uncompressed)
+    ZIP_COMPRESSION_LEVEL: int = 6
+
+    # Artifact store for project ZIPs ("local" or "s3"), with background eviction
+    ARTIFACT_STORE: str = "local"
+    ARTIFACT_LOCAL_DIR: str = "generated_projects"
+    ARTIFACT_S3_ENDPOINT_URL: Optional[str] = None
+    ARTIFACT_S3_BUCKET: Optional[str] = None
+    ARTIFACT_S3_ACCESS_KEY: Optional[str] = None
+    ARTIFACT_S3_SECRET_KEY: Optional[str] = None
+    ARTIFACT_S3_REGION: str = "us-east-1"
+    ARTIFACT_S3_PREFIX: str = "artifacts/"
+    ARTIFACT_MAX_AGE_SECONDS: int = 30 * 24 * 3600
+    ARTIFACT_MAX_TOTAL_BYTES: int = 5 * 1024 ** 3
+    ARTIFACT_SWEEP_INTERVAL_SECONDS: float = 600.0
+
+    # Admission control on expensive routes, per client (RATE_LIMIT_CLIENT_HEADER value, else
+    # client IP). RATE_LIMIT_ROUTES maps paths to a named limit in RATE_LIMITS (routes sharing a
+    # name share it): token bucket refilled at `rate` req/s up to `burst`, plus at most
+    # `concurrency` requests in progress. A request waits up to RATE_LIMIT_MAX_WAIT_SECONDS
+    # (with at most RATE_LIMIT_MAX_WAITING others per client and limit), else gets 429 with
+    # Retry-After. "memory" limits each worker, "redis" shares the state between workers.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    RATE_LIMIT_REDIS_TIMEOUT_SECONDS: float = 0.5
+    RATE_LIMIT_SLOT_LEASE_SECONDS: float = 900.0
+    RATE_LIMIT_CLIENT_HEADER: str = "X-API-Key"
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    RATE_LIMIT_MAX_WAIT_SECONDS: float = 2.0
+    RATE_LIMIT_MAX_WAITING: int = 8
+    RATE_LIMITS: Dict[str, Dict[str, float]] = {
+        "upload": {"rate": 2.0, "burst": 20, "concurrency": 4},
+        "generate": {"rate": 0.5, "burst": 10, "concurrency": 4},
+    }
+    RATE_LIMIT_ROUTES: Dict[str, str] = {
+        "/api/upload": "upload",
+        "/api/generate-code": "generate",
+        "/api/generate-code/stream": "generate",
+        "/api/generate-code/jobs": "generate",
+    }
+    # Charged by the handler once per spec (tokens and slots), not once per request
+    RATE_LIMIT_BATCH_ROUTES: Dict[str, str] = {
+        "/api/generate-batch": "generate",
+        "/api/generate-batch/stream": "generate",
+    }
+
+    # Metrics (GET /metrics) and logging of prompts / model answers: off by default (sizes only);
+    # when on, a sampled fraction of calls is logged, each text cut to LOG_CONTENT_MAX_CHARS
+    METRICS_ENABLED: bool = True
+    LOG_CONTENT: bool = False
+    LOG_CONTENT_SAMPLE_RATE: float = 1.0
+    LOG_CONTENT_MAX_CHARS: int = 2000
     
     class Config:
         env_file = ".env"
@@ -1,12 +1,84 @@
-from sqlalchemy import create_engine
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, StaticPool
 from .config import settings
+from .services.metrics import DB_COMMIT_DURATION
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def _engine_kwargs(url: str, overrides: Dict[str, Any]) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if _is_sqlite(url):
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if make_url(url).database in (None, "", ":memory:"):
+            return {**kwargs, **overrides}  # single shared connection; no pool to size
+    if make_url(url).drivername == "sqlite+aiosqlite":
+        # aiosqlite defaults to NullPool (a new connection per session)
+        kwargs["poolclass"] = AsyncAdaptedQueuePool
+    if overrides.get("poolclass") in (NullPool, StaticPool):
+        return {**kwargs, **overrides}  # nothing to size
+    kwargs.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    return {**kwargs, **overrides}
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    # WAL lets readers proceed during a write; NORMAL fsyncs at checkpoints instead of every commit
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.close()
+
+def create_db_engine(url: str, **overrides: Any) -> Engine:
+    """Sync engine with the configured pool, plus WAL pragmas on SQLite"""
+    db_engine = create_engine(url, **_engine_kwargs(url, overrides))
+    if _is_sqlite(url):
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+def async_database_url(url: str) -> str:
+    """Same database through its async driver (aiosqlite / asyncpg)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if backend == "postgresql":
+        return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    return url
+
+def create_async_db_engine(url: str, **overrides: Any) -> AsyncEngine:
+    async_url = async_database_url(url)
+    async_engine = create_async_engine(async_url, **_engine_kwargs(async_url, overrides))
+    if _is_sqlite(async_url):
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return async_engine
+
+# Commit latency for every session, sync or async (an AsyncSession commits through its sync Session)
+@event.listens_for(Session, "before_commit")
+def _commit_started(session: Session) -> None:
+    session.info["commit_started"] = time.perf_counter()
+
+@event.listens_for(Session, "after_commit")
+def _commit_finished(session: Session) -> None:
+    started = session.info.pop("commit_started", None)
+    if started is not None:
+        DB_COMMIT_DURATION.observe(time.perf_counter() - started)
+
+@event.listens_for(Session, "after_rollback")
+def _commit_failed(session: Session) -> None:
+    session.info.pop("commit_started", None)
+
+engine = create_db_engine(settings.database_url)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -17,4 +89,29 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_session_factory() -> sessionmaker:
+    """FastAPI dependency for handlers that run concurrent tasks, each needing its own session"""
+    return SessionLocal
+
+# Async engine: created on first use so sync-only processes (scripts, Alembic) never load the driver
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    global _async_engine, _async_sessionmaker
+    if _async_sessionmaker is None:
+        _async_engine = create_async_db_engine(settings.database_url)
+        _async_sessionmaker = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_sessionmaker = None
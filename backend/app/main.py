@@ -1,27 +1,69 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-import os
-import tempfile
-import zipfile
-from typing import List, Optional
-import uuid
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 
 from .config import settings
-from .database import get_db, engine, Base
-from .api import upload, snippets, practices, prompt, generation
+from .database import dispose_async_engine, get_session_factory
+from .api import upload, snippets, practices, prompt, generation, jobs, batch, history, metrics
+from .migrations import check_schema
 from .models import models
+from .services.artifact_store import ArtifactSweeper, get_artifact_store
+from .services.gemini_client import GeminiClientProvider
+from .services.generative import GenerativeService
+from .services.job_queue import GenerationJobQueue
+from .services.metrics import RouteLatencyMiddleware
+from .services.parse_pool import ParsePool
+from .services.practices_registry import practices_registry
+from .services.rate_limiter import RateLimitMiddleware, create_rate_limiter
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+logging.basicConfig(level=logging.INFO)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Honours dependency overrides: tests run everything against their own database
+    session_factory = app.dependency_overrides.get(get_session_factory, get_session_factory)()
+    # Schema is managed by Alembic migrations, not created at import
+    await asyncio.to_thread(check_schema, session_factory.kw["bind"])
+    practices_registry.refresh()
+    # Document parsing runs in worker processes, warmed in the background
+    app.state.parse_pool = ParsePool()
+    app.state.parse_pool.start()
+    warm_up = asyncio.create_task(app.state.parse_pool.warm_up())
+    # One pooled Gemini client per worker process
+    app.state.gemini_client_provider = GeminiClientProvider()
+    # Background workers for /api/generate-code/jobs
+    app.state.job_queue = GenerationJobQueue(
+        session_factory=session_factory,
+        generative_service=GenerativeService(app.state.gemini_client_provider)
+    )
+    await app.state.job_queue.start()
+    # Evicts old / least recently used project ZIPs
+    app.state.artifact_sweeper = ArtifactSweeper(get_artifact_store())
+    app.state.artifact_sweeper.start()
+    # Per-client limits on upload / generation routes (None when disabled)
+    app.state.rate_limiter = create_rate_limiter()
+    yield
+    if app.state.rate_limiter is not None:
+        await app.state.rate_limiter.aclose()
+    await app.state.artifact_sweeper.stop()
+    await app.state.job_queue.stop()
+    await app.state.gemini_client_provider.aclose()
+    warm_up.cancel()
+    app.state.parse_pool.shutdown()
+    await dispose_async_engine()
 
 app = FastAPI(
     title="PromptCodeGen API",
     description="Transform documents into optimized prompts and generate code",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Admission control; inside CORS so 429 answers carry the CORS headers too
+app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -29,14 +71,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
+# Per-route latency histograms, served by GET /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(RouteLatencyMiddleware)
+
 # Include routers
 app.include_router(upload.router, prefix="/api", tags=["upload"])
 app.include_router(snippets.router, prefix="/api", tags=["snippets"])
 app.include_router(practices.router, prefix="/api", tags=["practices"])
 app.include_router(prompt.router, prefix="/api", tags=["prompt"])
 app.include_router(generation.router, prefix="/api", tags=["generation"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
+app.include_router(batch.router, prefix="/api", tags=["batch"])
+app.include_router(history.router, prefix="/api", tags=["history"])
+app.include_router(metrics.router, tags=["metrics"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,61 @@
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .services.search_index import is_search_table
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def alembic_config():
+    """Alembic config for in-process use; leaves the app's logging setup alone"""
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.attributes["configure_logger"] = False
+    return config
+
+def include_name(name, type_, parent_names) -> bool:
+    """Autogenerate filter: the full-text search tables are created by raw DDL, not models"""
+    return not (type_ == "table" and is_search_table(name))
+
+def head_revision() -> str:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def current_revision(engine: Engine) -> Optional[str]:
+    from alembic.runtime.migration import MigrationContext
+
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+def upgrade_to_head() -> None:
+    from alembic import command
+
+    command.upgrade(alembic_config(), "head")
+
+def check_schema(engine: Engine, mode: Optional[str] = None) -> None:
+    """
+    Startup check of the database against the latest migration.
+
+    DB_SCHEMA_CHECK: "off" skips it, "warn" logs, "fail" refuses to start,
+    "upgrade" runs `alembic upgrade head` (single-process dev setups only:
+    concurrent workers would race on the DDL).
+    """
+    mode = mode or settings.DB_SCHEMA_CHECK
+    if mode == "off":
+        return
+    if mode == "upgrade":
+        upgrade_to_head()
+        return
+
+    current, head = current_revision(engine), head_revision()
+    if current == head:
+        return
+    message = f"Database schema is at {current or 'no revision'}, expected {head}. Run `alembic upgrade head`."
+    if mode == "fail":
+        raise RuntimeError(message)
+    logging.warning(f"[DB] {message}")
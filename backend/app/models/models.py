@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, LargeBinary, event
 from sqlalchemy.sql import func
 from ..database import Base
+from ..services.search_index import install_search_index
 
 class Document(Base):
     __tablename__ = "documents"
@@ -10,6 +11,8 @@ class Document(Base):
     filename = Column(String)
     content = Column(Text)
     file_type = Column(String)
+    content_sha256 = Column(String(64), index=True, nullable=True)  # hash of the uploaded bytes
+    section_index = Column(LargeBinary, nullable=True)  # zlib-compressed BM25 index of the sections
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class GeneratedProject(Base):
@@ -18,6 +21,42 @@ class GeneratedProject(Base):
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(String, unique=True, index=True)
     prompt = Column(Text)
-    files_json = Column(Text)  # JSON string of generated files
-    zip_path = Column(String)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    files_json = Column(Text)  # legacy: whole generation as JSON (rows before project_data)
+    project_data = Column(LargeBinary, nullable=True)  # zlib-compressed JSON: files, instructions
+    raw_text = Column(LargeBinary, nullable=True)  # zlib-compressed model output (optional)
+    zip_path = Column(String)  # legacy: ZIPs written before the artifact store
+    artifact_key = Column(String(64), index=True, nullable=True)  # sha256 of the ZIP in the artifact store
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# Full-text search over Document.content and GeneratedProject.prompt (see services/search_index.py)
+event.listen(Document.__table__, "after_create", install_search_index)
+event.listen(GeneratedProject.__table__, "after_create", install_search_index)
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String, unique=True, index=True)
+    status = Column(String, index=True, default="queued")  # queued, running, generating, packaging, saving, completed, failed
+    prompt = Column(Text)
+    use_cache = Column(Boolean, default=True)
+    output_mode = Column(String, nullable=True)  # "text" / "structured"; None = GENERATION_OUTPUT_MODE
+    model_tier = Column(String, nullable=True)  # a key of GEMINI_MODEL_TIERS; None = routed by prompt size
+    project_id = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    owner = Column(String, nullable=True)  # worker that claimed the job
+    heartbeat_at = Column(DateTime, nullable=True)  # refreshed by the owner while the job runs
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class GenerationCacheEntry(Base):
+    __tablename__ = "generation_cache"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, unique=True, index=True)  # sha256 of model name + normalized prompt
+    model_name = Column(String)
+    project_id = Column(String, index=True)  # GeneratedProject holding the files and the ZIP
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime, index=True)
+    expires_at = Column(DateTime, index=True)
@@ -0,0 +1,367 @@
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+import hmac
+import logging
+import os
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import quote, urlsplit
+
+import httpx
+
+from ..config import settings
+
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+S3_NAMESPACE = "{http://s3.amazonaws.com/doc/2006-03-01/}"
+
+
+@dataclass
+class ArtifactInfo:
+    key: str
+    size: int
+    last_used: float  # epoch seconds; drives LRU eviction
+
+
+class ArtifactStore(ABC):
+    """
+    Content-addressed blob store for generated project ZIPs.
+
+    Keys are the SHA-256 of the content, so identical projects share one
+    blob and a key never changes meaning (it doubles as a strong ETag).
+    """
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @abstractmethod
+    def put(self, data: bytes) -> str:
+        """Store a blob and return its key"""
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[ArtifactInfo]:
+        """Size and last use of a blob, None if it is missing"""
+
+    @abstractmethod
+    def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield bytes [start, end) of a blob (end=None: to the end)"""
+
+    def touch(self, key: str) -> None:
+        """Record a use of the blob for LRU eviction (optional: a no-op by default)"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a blob; missing keys are ignored"""
+
+    @abstractmethod
+    def list(self) -> List[ArtifactInfo]:
+        """Every blob, for the sweeper"""
+
+
+class LocalArtifactStore(ArtifactStore):
+    """Blobs under `root/<first two hex digits>/<key>.zip`; mtime tracks last use"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.ARTIFACT_LOCAL_DIR
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.zip")
+
+    def put(self, data: bytes) -> str:
+        key = self.key_for(data)
+        path = self._path(key)
+        if os.path.exists(path):
+            self.touch(key)
+            return key
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return key
+
+    def stat(self, key: str) -> Optional[ArtifactInfo]:
+        try:
+            st = os.stat(self._path(key))
+        except FileNotFoundError:
+            return None
+        return ArtifactInfo(key=key, size=st.st_size, last_used=st.st_mtime)
+
+    def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start
+            while remaining is None or remaining > 0:
+                chunk = f.read(self.CHUNK_SIZE if remaining is None else min(self.CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def touch(self, key: str) -> None:
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def list(self) -> List[ArtifactInfo]:
+        artifacts = []
+        if not os.path.isdir(self.root):
+            return artifacts
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".zip"):
+                    st = entry.stat()
+                    artifacts.append(ArtifactInfo(key=entry.name[:-4], size=st.st_size, last_used=st.st_mtime))
+        return artifacts
+
+
+class S3ArtifactStore(ArtifactStore):
+    """
+    Blobs in an S3-compatible bucket (AWS, MinIO, ...), path-style, SigV4-signed.
+
+    S3 has no cheap way to record reads, so LRU order falls back to upload
+    time; pair it with ARTIFACT_MAX_AGE_SECONDS or a bucket lifecycle rule.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: Optional[str] = None,
+        bucket: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        region: Optional[str] = None,
+        prefix: Optional[str] = None,
+    ):
+        self.endpoint_url = (endpoint_url or settings.ARTIFACT_S3_ENDPOINT_URL or "").rstrip("/")
+        self.bucket = bucket or settings.ARTIFACT_S3_BUCKET
+        self.access_key = access_key or settings.ARTIFACT_S3_ACCESS_KEY
+        self.secret_key = secret_key or settings.ARTIFACT_S3_SECRET_KEY
+        self.region = region or settings.ARTIFACT_S3_REGION
+        self.prefix = settings.ARTIFACT_S3_PREFIX if prefix is None else prefix
+        if not (self.endpoint_url and self.bucket and self.access_key and self.secret_key):
+            raise ValueError("ARTIFACT_S3_ENDPOINT_URL, ARTIFACT_S3_BUCKET and S3 credentials must be set.")
+        self._client = httpx.Client(base_url=self.endpoint_url, timeout=60.0)
+
+    def _object_path(self, key: str) -> str:
+        return f"/{self.bucket}/{self.prefix}{key}.zip"
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, str]] = None,
+        content: bytes = b"",
+        payload_hash: str = EMPTY_SHA256,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+    ) -> httpx.Response:
+        params = params or {}
+        signed = self._sign(method, path, params, payload_hash)
+        request = self._client.build_request(
+            method, path, params=params, content=content or None, headers={**signed, **(headers or {})}
+        )
+        return self._client.send(request, stream=stream)
+
+    def _sign(self, method: str, path: str, params: Dict[str, str], payload_hash: str) -> Dict[str, str]:
+        now = datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        datestamp = now.strftime("%Y%m%d")
+        headers = {
+            "host": urlsplit(self.endpoint_url).netloc,
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": amz_date,
+        }
+        signed_headers = ";".join(sorted(headers))
+        canonical_request = "\n".join([
+            method,
+            quote(path, safe="/-_.~"),
+            "&".join(
+                f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(params.items())
+            ),
+            "".join(f"{name}:{headers[name]}\n" for name in sorted(headers)),
+            signed_headers,
+            payload_hash,
+        ])
+        scope = f"{datestamp}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest()
+        ])
+
+        signing_key = f"AWS4{self.secret_key}".encode()
+        for part in (datestamp, self.region, "s3", "aws4_request"):
+            signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        return headers
+
+    def put(self, data: bytes) -> str:
+        key = self.key_for(data)
+        if self.stat(key) is not None:
+            return key
+        # The key is the payload hash, so the signature covers the content for free
+        response = self._request(
+            "PUT", self._object_path(key), content=data, payload_hash=key,
+            headers={"content-type": "application/zip"}
+        )
+        response.raise_for_status()
+        return key
+
+    def stat(self, key: str) -> Optional[ArtifactInfo]:
+        response = self._request("HEAD", self._object_path(key))
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return ArtifactInfo(
+            key=key,
+            size=int(response.headers["content-length"]),
+            last_used=parsedate_to_datetime(response.headers["last-modified"]).timestamp(),
+        )
+
+    def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        headers = {}
+        if start or end is not None:
+            headers["range"] = f"bytes={start}-{'' if end is None else end - 1}"
+        response = self._request("GET", self._object_path(key), headers=headers, stream=True)
+        try:
+            response.raise_for_status()
+            yield from response.iter_bytes()
+        finally:
+            response.close()
+
+    def delete(self, key: str) -> None:
+        response = self._request("DELETE", self._object_path(key))
+        if response.status_code != 404:
+            response.raise_for_status()
+
+    def list(self) -> List[ArtifactInfo]:
+        artifacts = []
+        params = {"list-type": "2", "prefix": self.prefix}
+        while True:
+            response = self._request("GET", f"/{self.bucket}", params=params)
+            response.raise_for_status()
+            root = ET.fromstring(response.content)
+            for item in root.iter(f"{S3_NAMESPACE}Contents"):
+                name = item.findtext(f"{S3_NAMESPACE}Key")[len(self.prefix):]
+                if not name.endswith(".zip"):
+                    continue
+                modified = item.findtext(f"{S3_NAMESPACE}LastModified").replace("Z", "+00:00")
+                artifacts.append(ArtifactInfo(
+                    key=name[:-4],
+                    size=int(item.findtext(f"{S3_NAMESPACE}Size")),
+                    last_used=datetime.fromisoformat(modified).timestamp(),
+                ))
+            token = root.findtext(f"{S3_NAMESPACE}NextContinuationToken")
+            if root.findtext(f"{S3_NAMESPACE}IsTruncated") != "true" or not token:
+                return artifacts
+            params = {**params, "continuation-token": token}
+
+
+def create_artifact_store() -> ArtifactStore:
+    if settings.ARTIFACT_STORE == "s3":
+        return S3ArtifactStore()
+    if settings.ARTIFACT_STORE == "local":
+        return LocalArtifactStore()
+    raise ValueError(f"Unknown ARTIFACT_STORE: {settings.ARTIFACT_STORE}")
+
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """The process-wide store, created from settings on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_artifact_store()
+    return _store
+
+
+class ArtifactSweeper:
+    """
+    Background task evicting blobs older than ARTIFACT_MAX_AGE_SECONDS, then
+    least recently used ones until the store fits in ARTIFACT_MAX_TOTAL_BYTES.
+
+    Evicting is safe: downloads rebuild a missing ZIP from the stored files.
+    """
+
+    def __init__(
+        self,
+        store: ArtifactStore,
+        interval: Optional[float] = None,
+        max_age: Optional[float] = None,
+        max_total_bytes: Optional[int] = None,
+    ):
+        self.store = store
+        self.interval = interval or settings.ARTIFACT_SWEEP_INTERVAL_SECONDS
+        self.max_age = settings.ARTIFACT_MAX_AGE_SECONDS if max_age is None else max_age
+        self.max_total_bytes = settings.ARTIFACT_MAX_TOTAL_BYTES if max_total_bytes is None else max_total_bytes
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logging.error(f"[Artifacts] Falha na limpeza de artefatos: {e}")
+
+    def sweep(self) -> int:
+        """Evict what is over the limits; returns the number of blobs removed"""
+        artifacts = sorted(self.store.list(), key=lambda a: a.last_used)
+        total = sum(a.size for a in artifacts)
+        oldest_allowed = time.time() - self.max_age
+        removed = freed = 0
+        for artifact in artifacts:
+            if artifact.last_used >= oldest_allowed and total - freed <= self.max_total_bytes:
+                break
+            self.store.delete(artifact.key)
+            removed += 1
+            freed += artifact.size
+
+        if removed:
+            logging.info(f"[Artifacts] Removidos {removed} artefatos ({freed} bytes)")
+        return removed
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, FrozenSet, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .generation_pipeline import GenerationPipeline
+from .generative import GenerativeService
+from .prompt_composer import ComposedPrompt, PromptComposer
+from .section_index import SectionIndex
+
+
+@dataclass
+class BatchItem:
+    index: int
+    name: Optional[str]
+    composed: ComposedPrompt
+    tier: Optional[str] = None
+
+
+class BatchGeneration:
+    """
+    One document, N composition specs: compose every prompt, then generate
+    them concurrently (at most max_concurrency at a time per batch).
+
+    The document is passed in once and the practices are looked up once for
+    the whole batch. Each generation gets its own session; one failing spec
+    is reported as such and does not fail the others.
+    """
+
+    @staticmethod
+    def compose(
+        document_content: str, specs: List[Dict[str, Any]], section_index: Optional[SectionIndex] = None
+    ) -> List[BatchItem]:
+        practices = PromptComposer.load_practices(
+            {practice_id for spec in specs for practice_id in spec.get("practice_ids", [])}
+        )
+        return [
+            BatchItem(index, spec.get("name"), PromptComposer.compose(
+                document_content,
+                spec.get("snippet_ids", []),
+                spec.get("practice_ids", []),
+                spec.get("extra_instructions"),
+                spec.get("token_budget"),
+                practices=practices,
+                section_top_k=spec.get("section_top_k"),
+                section_index=section_index,
+            ), spec.get("tier"))
+            for index, spec in enumerate(specs)
+        ]
+
+    @staticmethod
+    async def run(
+        items: List[BatchItem],
+        session_factory: Callable[[], Session],
+        generative_service: GenerativeService,
+        max_concurrency: int,
+        use_cache: bool = True,
+        fields: Optional[FrozenSet[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one result payload per item, in completion order"""
+        slots = asyncio.Semaphore(max_concurrency)
+
+        async def generate(item: BatchItem) -> Dict[str, Any]:
+            async with slots:
+                db = session_factory()
+                try:
+                    response = await GenerationPipeline.run(
+                        item.composed.prompt, db, generative_service, use_cache=use_cache, model_tier=item.tier
+                    )
+                    return BatchGeneration._payload(
+                        item, "completed", result=GenerationPipeline.select_fields(response, fields)
+                    )
+                except Exception as e:
+                    logging.error(f"[Batch] Falha na variante {item.index} ({item.name}): {e}")
+                    return BatchGeneration._payload(item, "failed", error=f"Error generating code: {str(e)}")
+                finally:
+                    db.close()
+
+        tasks = [asyncio.create_task(generate(item)) for item in items]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # Client went away mid-stream: stop the generations still running
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _payload(item: BatchItem, status: str, result: Any = None, error: Optional[str] = None) -> Dict[str, Any]:
+        payload = {
+            "index": item.index,
+            "name": item.name,
+            "status": status,
+            "estimated_tokens": item.composed.estimated_tokens,
+            "truncated": item.composed.truncated,
+        }
+        if error is not None:
+            payload["error"] = error
+        else:
+            payload["result"] = result
+        return payload
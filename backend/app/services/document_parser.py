@@ -1,77 +1,161 @@
+import io
+import logging
 import os
-import tempfile
-from typing import Tuple
-import docx
-import PyPDF2
-import fitz  # PyMuPDF
+from typing import TYPE_CHECKING, BinaryIO, Iterator, List, Optional, Tuple, Union
+
+# docx, PyPDF2 and fitz (PyMuPDF) are imported on first use: together they
+# dominate app import time, and only parse-pool workers ever need them
+if TYPE_CHECKING:
+    import fitz
+    import PyPDF2
+
+# Raw bytes, a filesystem path, or a seekable binary file (e.g. the upload spool)
+DocumentSource = Union[bytes, str, BinaryIO]
 
 class DocumentParser:
     """Parse different document types and extract text content"""
-    
+
     @staticmethod
-    async def parse_document(file_content: bytes, filename: str) -> Tuple[str, str]:
-        """
-        Parse document and return (content, file_type)
-        """
+    def parse(source: DocumentSource, filename: str) -> Tuple[str, str]:
+        """Synchronous, CPU-bound parse; files are read in place, never copied to a temp file"""
         file_extension = os.path.splitext(filename)[1].lower()
-        
+
         if file_extension == '.docx':
-            return DocumentParser._parse_docx(file_content), 'docx'
+            return DocumentParser._parse_docx(source), 'docx'
         elif file_extension == '.pdf':
-            return DocumentParser._parse_pdf(file_content), 'pdf'
+            return DocumentParser._parse_pdf(source), 'pdf'
         elif file_extension in ['.md', '.txt']:
-            return DocumentParser._parse_text(file_content), file_extension[1:]
+            return DocumentParser._parse_text(source), file_extension[1:]
         else:
             raise ValueError(f"Unsupported file type: {file_extension}")
-    
+
     @staticmethod
-    def _parse_docx(file_content: bytes) -> str:
+    def _as_stream(source: DocumentSource) -> BinaryIO:
+        if isinstance(source, (bytes, bytearray)):
+            return io.BytesIO(source)
+        source.seek(0)
+        return source
+
+    @staticmethod
+    def _parse_docx(source: DocumentSource) -> str:
         """Parse DOCX file and extract text"""
-        with tempfile.NamedTemporaryFile() as tmp_file:
-            tmp_file.write(file_content)
-            tmp_file.flush()
-            
-            doc = docx.Document(tmp_file.name)
-            text_content = []
-            
-            for paragraph in doc.paragraphs:
+        import docx
+
+        doc = docx.Document(source if isinstance(source, str) else DocumentParser._as_stream(source))
+        text_content = []
+
+        for paragraph in doc.paragraphs:
+            # Headings become markdown headings, which the section index splits at
+            level = DocumentParser._heading_level(paragraph.style.name if paragraph.style is not None else "")
+            if level and paragraph.text.strip():
+                text_content.append(f"{'#' * level} {paragraph.text.strip()}")
+            else:
                 text_content.append(paragraph.text)
-            
-            return '\n'.join(text_content)
-    
+
+        return '\n'.join(text_content)
+
+    @staticmethod
+    def _heading_level(style_name: str) -> int:
+        """1-6 for Title / Heading N paragraph styles, 0 otherwise"""
+        if style_name == "Title":
+            return 1
+        if style_name.startswith("Heading "):
+            level = style_name[len("Heading "):]
+            return min(int(level), 6) if level.isdigit() else 0
+        return 0
+
     @staticmethod
-    def _parse_pdf(file_content: bytes) -> str:
+    def _parse_pdf(source: DocumentSource) -> str:
         """Parse PDF file and extract text"""
-        with tempfile.NamedTemporaryFile() as tmp_file:
-            tmp_file.write(file_content)
-            tmp_file.flush()
-            
-            # Try PyMuPDF first (better for complex PDFs)
-            try:
-                doc = fitz.open(tmp_file.name)
-                text_content = []
-                
-                for page in doc:
-                    text_content.append(page.get_text())
-                
+        return '\n'.join(DocumentParser.iter_pdf_pages(source))
+
+    @staticmethod
+    def iter_pdf_pages(source: DocumentSource, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield the text of pages [start, stop) one at a time.
+
+        PyMuPDF reads each page; PyPDF2 stands in only for the pages it
+        cannot read (or for the whole range if it cannot open the file).
+        Stop iterating early to skip the remaining pages.
+        """
+        doc = None
+        reader = None
+        try:
+            doc = DocumentParser._open_fitz(source)
+            page_count = doc.page_count
+        except Exception:
+            reader = DocumentParser._open_pypdf2(source)
+            page_count = len(reader.pages)
+
+        try:
+            for number in range(start, page_count if stop is None else min(stop, page_count)):
+                text = None
+                if doc is not None:
+                    try:
+                        text = doc.load_page(number).get_text()
+                    except Exception as e:
+                        logging.warning(f"[Parse] PyMuPDF falhou na página {number + 1}, usando PyPDF2: {e}")
+                if text is None:
+                    if reader is None:
+                        reader = DocumentParser._open_pypdf2(source)
+                    text = reader.pages[number].extract_text() or ''
+                yield text
+        finally:
+            if doc is not None:
                 doc.close()
-                return '\n'.join(text_content)
-            except:
-                # Fallback to PyPDF2
-                with open(tmp_file.name, 'rb') as pdf_file:
-                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-                    text_content = []
-                    
-                    for page in pdf_reader.pages:
-                        text_content.append(page.extract_text())
-                    
-                    return '\n'.join(text_content)
-    
+
+    @staticmethod
+    def pdf_page_count(source: DocumentSource) -> int:
+        try:
+            doc = DocumentParser._open_fitz(source)
+        except Exception:
+            return len(DocumentParser._open_pypdf2(source).pages)
+        try:
+            return doc.page_count
+        finally:
+            doc.close()
+
+    @staticmethod
+    def extract_pdf_pages(source: DocumentSource, start: int, stop: int) -> List[str]:
+        """One page range, as a picklable unit of work for the parse pool"""
+        return list(DocumentParser.iter_pdf_pages(source, start, stop))
+
     @staticmethod
-    def _parse_text(file_content: bytes) -> str:
+    def _open_pypdf2(source: DocumentSource) -> "PyPDF2.PdfReader":
+        import PyPDF2
+
+        return PyPDF2.PdfReader(source if isinstance(source, str) else DocumentParser._as_stream(source))
+
+    @staticmethod
+    def _open_fitz(source: DocumentSource) -> "fitz.Document":
+        import fitz
+
+        if isinstance(source, str):
+            return fitz.open(source, filetype="pdf")
+        if isinstance(source, (bytes, bytearray)):
+            return fitz.open(stream=source, filetype="pdf")
+
+        # Spooled to disk: let MuPDF read the file itself
+        path = getattr(source, "path", None)
+        if path:
+            source.flush()
+            return fitz.open(path, filetype="pdf")
+
+        # Small in-memory upload
+        return fitz.open(stream=DocumentParser._as_stream(source).read(), filetype="pdf")
+
+    @staticmethod
+    def _parse_text(source: DocumentSource) -> str:
         """Parse text/markdown file"""
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                file_content = f.read()
+        elif isinstance(source, (bytes, bytearray)):
+            file_content = source
+        else:
+            file_content = DocumentParser._as_stream(source).read()
         try:
             return file_content.decode('utf-8')
         except UnicodeDecodeError:
             # Try latin-1 as fallback
-            return file_content.decode('latin-1')
\ No newline at end of file
+            return file_content.decode('latin-1')
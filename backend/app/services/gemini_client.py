@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+from tenacity import retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from ..config import settings
+
+# HTTP statuses worth retrying: timeouts, rate limiting and server-side failures
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    from google.genai import errors
+
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+def retry_policy() -> Dict[str, Any]:
+    """tenacity (Async)Retrying arguments: jittered exponential backoff on transient failures"""
+    return dict(
+        stop=stop_after_attempt(settings.GEMINI_RETRY_ATTEMPTS),
+        wait=wait_random_exponential(multiplier=0.5, max=settings.GEMINI_RETRY_MAX_WAIT_SECONDS),
+        retry=retry_if_exception(is_retryable_error),
+        before_sleep=lambda state: logging.warning(
+            f"[Gemini] Tentativa {state.attempt_number} falhou, repetindo: {state.outcome.exception()}"
+        ),
+        reraise=True,
+    )
+
+
+def create_gemini_client(api_key: str):
+    """Build a Gemini client whose httpx clients keep a pool of keep-alive connections"""
+    from google.genai import Client, types
+
+    limits = httpx.Limits(
+        max_connections=settings.GEMINI_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.GEMINI_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.GEMINI_POOL_KEEPALIVE_EXPIRY_SECONDS,
+    )
+    http_options = types.HttpOptions(
+        base_url=settings.GEMINI_BASE_URL,
+        timeout=int(settings.GEMINI_TIMEOUT_SECONDS * 1000),  # milliseconds
+        client_args={"limits": limits},
+        async_client_args={"limits": limits},
+    )
+    return Client(api_key=api_key, http_options=http_options)
+
+
+class GeminiClientProvider:
+    """
+    Process-wide Gemini client, owned by the app lifespan.
+
+    The client (and the google.genai import) is built on first use, so
+    startup stays cheap and settings changed before the first call apply.
+    """
+
+    def __init__(self, api_key: Optional[str] = None):
+        self._api_key = api_key
+        self._client: Any = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    api_key = self._api_key or settings.GEMINI_API_KEY
+                    if not api_key:
+                        raise ValueError("GEMINI_API_KEY não configurada.")
+                    self._client = create_gemini_client(api_key)
+        return self._client
+
+    async def aget(self):
+        """get() without blocking the event loop on the first, expensive call"""
+        if self._client is not None:
+            return self._client
+        return await asyncio.to_thread(self.get)
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aio.aclose()
+            client.close()
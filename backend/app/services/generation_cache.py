@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.models import GeneratedProject, GenerationCacheEntry
+
+
+class GenerationCache:
+    """
+    Content-addressed cache of generation results.
+
+    Two tiers: an in-process LRU of response payloads, and generation_cache
+    rows pointing at the GeneratedProject that holds the files and the ZIP.
+    get / put / invalidate block on the database: call them off the event loop.
+    """
+
+    def __init__(self, memory_entries: Optional[int] = None):
+        self._memory_entries = memory_entries or settings.GENERATION_CACHE_MEMORY_ENTRIES
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Ignore differences that do not change the prompt's meaning (line endings, trailing spaces)"""
+        prompt = unicodedata.normalize("NFC", prompt.replace("\r\n", "\n").replace("\r", "\n"))
+        return "\n".join(line.rstrip() for line in prompt.split("\n")).strip()
+
+    @staticmethod
+    def make_key(prompt: str, model_name: str) -> str:
+        normalized = GenerationCache.normalize_prompt(prompt)
+        return hashlib.sha256(f"{model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, db: Session, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response payload, or None on a miss"""
+        payload = self._memory_get(key)
+        if payload is None:
+            payload = self._db_get(db, key)
+            if payload is not None:
+                self._memory_put(key, payload)
+
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload
+
+    def put(self, db: Session, key: str, model_name: str, payload: Dict[str, Any]) -> None:
+        """Store a freshly generated project under `key`, replacing any previous entry"""
+        now = datetime.utcnow()
+        entry = db.query(GenerationCacheEntry).filter(GenerationCacheEntry.cache_key == key).first()
+        if entry is None:
+            entry = GenerationCacheEntry(cache_key=key, hit_count=0)
+            db.add(entry)
+        entry.model_name = model_name
+        entry.project_id = payload["project_id"]
+        entry.last_used_at = now
+        entry.expires_at = now + timedelta(seconds=settings.GENERATION_CACHE_TTL_SECONDS)
+        db.commit()
+
+        self._memory_put(key, payload)
+        self._evict(db, now)
+
+    def invalidate(self, db: Session, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        db.query(GenerationCacheEntry).filter(GenerationCacheEntry.cache_key == key).delete()
+        db.commit()
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "memory_entries": len(self._memory)}
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._memory.get(key)
+            if item is None:
+                return None
+            expires_at, payload = item
+            if expires_at < time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return payload
+
+    def _memory_put(self, key: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = (time.time() + settings.GENERATION_CACHE_TTL_SECONDS, payload)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._memory_entries:
+                self._memory.popitem(last=False)
+
+    def _db_get(self, db: Session, key: str) -> Optional[Dict[str, Any]]:
+        from .generation_pipeline import GenerationPipeline
+        from .project_storage import ProjectStorage
+
+        now = datetime.utcnow()
+        entry = db.query(GenerationCacheEntry).filter(GenerationCacheEntry.cache_key == key).first()
+        if entry is None:
+            return None
+        if entry.expires_at and entry.expires_at < now:
+            self.invalidate(db, key)
+            return None
+
+        project = db.query(GeneratedProject).filter(
+            GeneratedProject.project_id == entry.project_id
+        ).first()
+        # The stored files are what gets reused; an evicted ZIP is rebuilt from them on download
+        if project is None or not ProjectStorage.has_data(project):
+            self.invalidate(db, key)
+            return None
+
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_used_at = now
+        db.commit()
+        return GenerationPipeline.response_from_project(project)
+
+    def _evict(self, db: Session, now: datetime) -> None:
+        """Drop expired rows, then the least recently used ones above GENERATION_CACHE_MAX_ROWS"""
+        expired = db.query(GenerationCacheEntry).filter(GenerationCacheEntry.expires_at < now).delete()
+        overflow = db.query(GenerationCacheEntry).count() - settings.GENERATION_CACHE_MAX_ROWS
+        if overflow > 0:
+            stale_ids = [
+                row.id for row in db.query(GenerationCacheEntry.id)
+                .order_by(GenerationCacheEntry.last_used_at)
+                .limit(overflow)
+            ]
+            db.query(GenerationCacheEntry).filter(
+                GenerationCacheEntry.id.in_(stale_ids)
+            ).delete(synchronize_session=False)
+        if expired or overflow > 0:
+            logging.info(f"[Cache] Removidas {expired + max(overflow, 0)} entradas do cache")
+        db.commit()
+
+
+generation_cache = GenerationCache()
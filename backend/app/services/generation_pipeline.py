@@ -0,0 +1,227 @@
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+from ..models.models import GeneratedProject
+from .generation_cache import generation_cache
+from .generative import GenerativeService
+from .metrics import RESPONSE_PARSE_DURATION
+from .model_router import model_router
+from .project_generator import ProjectGenerator
+from .project_storage import ProjectStorage
+from .response_parser import ResponseParser
+
+ProgressCallback = Callable[[str], Awaitable[None]]
+
+# What a generation response carries; `fields=` picks a subset
+RESPONSE_FIELDS = ("project_id", "files", "download_url", "raw_text", "instructions", "commands", "cached")
+
+
+class GenerationPipeline:
+    """
+    Generation -> project ZIP -> GeneratedProject row, shared by the sync and job endpoints.
+
+    The Session is sync: cache lookups and saves run on the threadpool, so a
+    slow commit does not stall the event loop (and every stream on it).
+    """
+
+    @staticmethod
+    async def run(
+        prompt: str,
+        db: Session,
+        generative_service: GenerativeService,
+        on_progress: Optional[ProgressCallback] = None,
+        use_cache: bool = True,
+        output_mode: Optional[str] = None,
+        model_tier: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run the full pipeline and return the API response payload.
+
+        With use_cache, an identical earlier prompt returns the stored project
+        (same project_id and ZIP) without calling the model. use_cache=False
+        skips the lookup; the fresh result still replaces the cache entry.
+        output_mode ("text" / "structured") defaults to GENERATION_OUTPUT_MODE;
+        model_tier picks a model from GEMINI_MODEL_TIERS (see ModelRouter).
+        """
+
+        async def progress(stage: str) -> None:
+            if on_progress:
+                await on_progress(stage)
+
+        structured = (output_mode or settings.GENERATION_OUTPUT_MODE) == "structured"
+        cache_key, cached = await run_in_threadpool(
+            GenerationPipeline._cache_lookup, prompt, db, use_cache, structured, model_tier
+        )
+        if cached is not None:
+            return cached
+
+        await progress("generating")
+        if structured:
+            generated_data = await generative_service.generate_structured_async(prompt, model_tier)
+        else:
+            generated_data = await generative_service.generate_code_async(prompt, model_tier)
+
+        return await GenerationPipeline._save_project(
+            prompt, db, generated_data, cache_key, progress, structured, model_tier
+        )
+
+    @staticmethod
+    async def run_stream(
+        prompt: str,
+        db: Session,
+        generative_service: GenerativeService,
+        use_cache: bool = True,
+        model_tier: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of run(), yielding events as the model writes.
+
+        Emits {"type": "chunk"} for every piece of model text, {"type": "file"}
+        as each fenced file block closes, then a final {"type": "done"} event
+        carrying the same payload run() returns. Always text mode: the
+        structured JSON answer has no file boundaries to stream.
+        """
+        cache_key, cached = await run_in_threadpool(
+            GenerationPipeline._cache_lookup, prompt, db, use_cache, model_tier=model_tier
+        )
+        if cached is not None:
+            yield {"type": "done", **cached}
+            return
+
+        # One pass over the stream: file events as blocks close, the full parse at the end
+        parser = ResponseParser()
+        parse_seconds = 0.0
+
+        async for text in generative_service.generate_code_stream(prompt, model_tier):
+            yield {"type": "chunk", "text": text}
+            started = time.perf_counter()
+            file_infos = parser.feed(text)
+            parse_seconds += time.perf_counter() - started
+            for file_info in file_infos:
+                yield {"type": "file", **file_info}
+        started = time.perf_counter()
+        file_infos = parser.close()
+        generated_data = parser.result()
+        RESPONSE_PARSE_DURATION.observe(parse_seconds + time.perf_counter() - started, mode="stream")
+        for file_info in file_infos:
+            yield {"type": "file", **file_info}
+
+        response = await GenerationPipeline._save_project(
+            prompt, db, generated_data, cache_key, model_tier=model_tier
+        )
+        yield {"type": "done", **response}
+
+    @staticmethod
+    def _cache_model_name(prompt: str, structured: bool, model_tier: Optional[str] = None) -> str:
+        # Keyed by the routed model (a fallback answer is cached under it too); structured
+        # answers are cached apart from free-text ones for the same prompt
+        model_name = model_router.route(prompt, model_tier)
+        return f"{model_name}:structured" if structured else model_name
+
+    @staticmethod
+    def _cache_lookup(
+        prompt: str, db: Session, use_cache: bool, structured: bool = False, model_tier: Optional[str] = None
+    ):
+        """Return (cache_key, cached response or None)"""
+        if not settings.GENERATION_CACHE_ENABLED:
+            return None, None
+
+        cache_key = generation_cache.make_key(
+            prompt, GenerationPipeline._cache_model_name(prompt, structured, model_tier)
+        )
+        if use_cache:
+            cached = generation_cache.get(db, cache_key)
+            if cached is not None:
+                return cache_key, {**cached, "cached": True}
+        return cache_key, None
+
+    @staticmethod
+    async def _save_project(
+        prompt: str,
+        db: Session,
+        generated_data: Dict[str, Any],
+        cache_key: Optional[str],
+        progress: Optional[ProgressCallback] = None,
+        structured: bool = False,
+        model_tier: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        if progress:
+            await progress("packaging")
+        artifact_key = await run_in_threadpool(ProjectGenerator.create_project_zip, generated_data)
+
+        if progress:
+            await progress("saving")
+        response = await run_in_threadpool(
+            GenerationPipeline._store_project, prompt, db, generated_data, artifact_key, cache_key, structured, model_tier
+        )
+        return {**response, "cached": False}
+
+    @staticmethod
+    def _store_project(
+        prompt: str,
+        db: Session,
+        generated_data: Dict[str, Any],
+        artifact_key: str,
+        cache_key: Optional[str],
+        structured: bool,
+        model_tier: Optional[str],
+    ) -> Dict[str, Any]:
+        """Blocking: compress and commit the project, then its cache entry"""
+        project_id = str(uuid.uuid4())
+        db_project = GeneratedProject(
+            project_id=project_id,
+            prompt=prompt,
+            artifact_key=artifact_key
+        )
+        ProjectStorage.store(db_project, generated_data)
+
+        db.add(db_project)
+        db.commit()
+        db.refresh(db_project)
+
+        response = GenerationPipeline.build_response(project_id, generated_data)
+        if cache_key:
+            generation_cache.put(
+                db, cache_key, GenerationPipeline._cache_model_name(prompt, structured, model_tier), response
+            )
+        return response
+
+    @staticmethod
+    def build_response(project_id: str, generated_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "project_id": project_id,
+            "files": generated_data.get("files", []),
+            "download_url": f"/api/download/{project_id}",
+            "raw_text": generated_data.get("raw_text", ""),
+            "instructions": generated_data.get("instructions", ""),
+            "commands": generated_data.get("commands", [])
+        }
+
+    @staticmethod
+    def response_from_project(project: GeneratedProject) -> Dict[str, Any]:
+        """Rebuild the API response for a stored project"""
+        return GenerationPipeline.build_response(project.project_id, ProjectStorage.load(project))
+
+    @staticmethod
+    def parse_fields(fields: Optional[str]) -> Optional[FrozenSet[str]]:
+        """`fields=project_id,download_url` -> the selected names; None keeps every field"""
+        if not fields:
+            return None
+        selected = frozenset(name.strip() for name in fields.split(",") if name.strip())
+        unknown = selected.difference(RESPONSE_FIELDS)
+        if unknown:
+            raise ValueError(
+                f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(RESPONSE_FIELDS)}"
+            )
+        return selected
+
+    @staticmethod
+    def select_fields(response: Dict[str, Any], fields: Optional[FrozenSet[str]]) -> Dict[str, Any]:
+        if fields is None:
+            return response
+        return {key: value for key, value in response.items() if key in fields or key == "type"}
@@ -1,45 +1,271 @@
-import json
+import asyncio
 import logging
-from typing import Any, Dict
+import random
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi import Request
+from tenacity import AsyncRetrying
 
 from ..config import settings
+from .gemini_client import GeminiClientProvider, retry_policy
+from .metrics import (
+    GENERATIONS_IN_FLIGHT,
+    GENERATIONS_WAITING,
+    LLM_REQUEST_DURATION,
+    LLM_TOKENS,
+    RESPONSE_PARSE_DURATION,
+)
+from .model_router import model_router
+from .response_parser import ResponseParser
+from .structured_output import (
+    STRUCTURED_SYSTEM_INSTRUCTION,
+    GeneratedFile,
+    StructuredAttempt,
+    StructuredProject,
+    merge_repair,
+    repair_prompt,
+    structured_stats,
+    token_usage,
+    validate_output,
+)
+
+# One semaphore per event loop, bounding in-flight Gemini calls
+_generation_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_generation_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _generation_slots.get(loop)
+    if slots is None:
+        slots = asyncio.Semaphore(settings.GENERATION_MAX_CONCURRENCY)
+        _generation_slots[loop] = slots
+    return slots
+
+
+@asynccontextmanager
+async def _generation_slot() -> AsyncIterator[None]:
+    """Hold a generation slot, counted as waiting until acquired and in flight until released"""
+    slots = _get_generation_slots()
+    with GENERATIONS_WAITING.track():
+        await slots.acquire()
+    try:
+        with GENERATIONS_IN_FLIGHT.track():
+            yield
+    finally:
+        slots.release()
+
+
+async def _reserve_hedge_slot() -> Optional[Callable[[], None]]:
+    """A generation slot for a hedged duplicate request, only if one is free right now"""
+    slots = _get_generation_slots()
+    if slots.locked():
+        return None
+    await slots.acquire()  # free: returns at once
+    GENERATIONS_IN_FLIGHT.inc()
+
+    def release() -> None:
+        GENERATIONS_IN_FLIGHT.dec()
+        slots.release()
+
+    return release
+
+
+def _log_content(label: str, text: str) -> None:
+    """
+    Prompts and answers can be megabytes and carry user documents: log only
+    their size unless LOG_CONTENT is on, then a sample, each cut short.
+    """
+    if not settings.LOG_CONTENT or random.random() >= settings.LOG_CONTENT_SAMPLE_RATE:
+        logging.info(f"[Gemini] {label}: {len(text)} caracteres")
+        return
+    limit = settings.LOG_CONTENT_MAX_CHARS
+    if len(text) > limit:
+        text = f"{text[:limit]}... [{len(text) - limit} caracteres omitidos]"
+    logging.info(f"[Gemini] {label}: {text}")
+
+
+def _record_usage(response) -> None:
+    prompt_tokens, output_tokens = token_usage(response)
+    LLM_TOKENS.inc(prompt_tokens, kind="prompt")
+    LLM_TOKENS.inc(output_tokens, kind="output")
+
+
+def get_generative_service(request: Request) -> "GenerativeService":
+    """FastAPI dependency: a service bound to the app-wide Gemini client"""
+    return GenerativeService(request.app.state.gemini_client_provider)
 
 
 class GenerativeService:
     """Service for AI code generation using Gemini"""
 
-    def __init__(self):
-        self.api_key = settings.GEMINI_API_KEY
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY não configurada.")
+    def __init__(self, client_provider: Optional[GeminiClientProvider] = None):
+        # Without a shared provider (scripts, one-off use) the service owns its client
+        self.client_provider = client_provider or GeminiClientProvider()
 
-    def generate_code(self, prompt: str) -> Dict[str, Any]:
+    async def generate_code_async(self, prompt: str, tier: Optional[str] = None) -> Dict[str, Any]:
         """
-        Generate code from prompt using Gemini AI
+        Generate code without blocking the event loop.
+
+        Uses the async Gemini client; at most GENERATION_MAX_CONCURRENCY calls
+        run at once per worker, the rest wait for a free slot. The model is
+        picked by the model router (`tier`, prompt size, fallback, hedging).
         """
-        from google.genai import Client
+        response = await self._generate_content_async(prompt, tier=tier)
+        with RESPONSE_PARSE_DURATION.time(mode="text"):
+            return self._parse_gemini_response(response)
 
-        logging.basicConfig(level=logging.INFO)
-        logging.info(f"[Gemini] Prompt recebido: {prompt}")
+    async def generate_structured_async(self, prompt: str, tier: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Generate in the model's JSON mode, against the StructuredProject schema.
 
-        gemini_client = Client(api_key=self.api_key)
+        The answer is validated into Pydantic models. One that fails (cut
+        off, missing fields) keeps its complete files, and a repair request
+        asks only for the rest, up to GENERATION_REPAIR_ATTEMPTS times,
+        instead of regenerating everything.
+        """
+        from google.genai import types
 
-        try:
-            model_name = "gemini-2.5-flash"
-            logging.info(f"[Gemini] Usando modelo: {model_name}")
-            response = gemini_client.models.generate_content(
-                contents=prompt, model=model_name
+        config = types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=StructuredProject,
+            system_instruction=STRUCTURED_SYSTEM_INSTRUCTION,
+        )
+        response = await self._generate_content_async(prompt, config, tier)
+        text = response.text or ""
+        with RESPONSE_PARSE_DURATION.time(mode="structured"):
+            attempt = validate_output(text)
+        prompt_tokens, output_tokens = token_usage(response)
+        structured_stats.record_first_attempt(attempt.project is not None, prompt_tokens, output_tokens)
+        if attempt.project is not None:
+            return {**attempt.project.model_dump(), "raw_text": text}
+
+        raw_texts = [text]
+        data = {"files": [f.model_dump() for f in attempt.salvaged]} if attempt.salvaged else None
+        valid = False
+        for _ in range(settings.GENERATION_REPAIR_ATTEMPTS):
+            logging.warning(
+                f"[Gemini] Saída estruturada inválida ({'; '.join(attempt.errors)}); "
+                f"{len(attempt.salvaged)} arquivos aproveitados, pedindo correção"
             )
+            repair_response = await self._generate_content_async(repair_prompt(prompt, attempt), config, tier)
+            repair_text = repair_response.text or ""
+            raw_texts.append(repair_text)
+            with RESPONSE_PARSE_DURATION.time(mode="structured"):
+                repair = validate_output(repair_text)
+            structured_stats.record_repair(prompt_tokens + output_tokens, *token_usage(repair_response))
 
-            logging.info(f"[Gemini] Resposta recebida: {response}")
-            return self._parse_gemini_response(response)
+            data, valid = merge_repair(attempt, repair)
+            if valid:
+                break
+            # Keep what both answers completed; ask again for the rest
+            salvaged = [GeneratedFile(**f) for f in data["files"]] if data else attempt.salvaged
+            attempt = StructuredAttempt(None, salvaged, repair.errors)
+        structured_stats.record_outcome(valid)
+
+        raw_text = "\n\n".join(raw_texts)
+        if data is None:
+            return {
+                "files": [], "raw_text": raw_text, "instructions": "", "commands": [],
+                "error": ResponseParser.PARSE_ERROR,
+            }
+        return {"instructions": "", "commands": [], **data, "raw_text": raw_text}
+
+    async def _generate_content_async(self, prompt: str, config=None, tier: Optional[str] = None):
+        _log_content("Prompt recebido", prompt)
+
+        gemini_client = await self.client_provider.aget()
+
+        mode = "text" if config is None else "structured"
+
+        async def call(model_name: str):
+            logging.info(f"[Gemini] Usando modelo: {model_name}")
+            # Latency of the call itself, without the wait for a slot
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                async for attempt in AsyncRetrying(**retry_policy()):
+                    with attempt:
+                        response = await gemini_client.aio.models.generate_content(
+                            contents=prompt, model=model_name, config=config
+                        )
+                outcome = "ok"
+                return response
+            except asyncio.CancelledError:
+                outcome = "cancelled"  # the losing side of a hedged pair
+                raise
+            finally:
+                LLM_REQUEST_DURATION.observe(time.perf_counter() - started, mode=mode, outcome=outcome)
+
+        try:
+            async with _generation_slot():
+                response = await model_router.generate(call, prompt, tier, reserve_hedge=_reserve_hedge_slot)
+        except Exception as e:
+            logging.error(f"[Gemini] Erro ao consumir a API Gemini: {e}")
+            raise
+
+        _record_usage(response)
+        _log_content("Resposta recebida", response.text or "")
+        return response
+
+    async def generate_code_stream(self, prompt: str, tier: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Yield the model's text as it is generated.
+
+        Holds a generation slot until the stream is exhausted or closed.
+        Only opening the stream is retried, then tried on the fallback model;
+        a stream that fails midway raises. Streams are never hedged.
+        """
+        _log_content("Prompt recebido (stream)", prompt)
+
+        gemini_client = await self.client_provider.aget()
+
+        try:
+            async with _generation_slot():
+                # Until the last chunk (or the consumer closing the stream)
+                started = time.perf_counter()
+                outcome = "error"
+                try:
+                    stream = await self._open_stream(gemini_client, prompt, model_router.candidates(prompt, tier))
+                    async for chunk in stream:
+                        if chunk.text:
+                            yield chunk.text
+                    outcome = "ok"
+                finally:
+                    LLM_REQUEST_DURATION.observe(time.perf_counter() - started, mode="stream", outcome=outcome)
         except Exception as e:
             logging.error(f"[Gemini] Erro ao consumir a API Gemini: {e}")
             raise
 
+    @staticmethod
+    async def _open_stream(gemini_client, prompt: str, models: List[str]):
+        """The stream of the first model in `models` that opens one (after its retries)"""
+        for number, model_name in enumerate(models):
+            logging.info(f"[Gemini] Usando modelo: {model_name}")
+            stats = model_router.stats(model_name)
+            if number:
+                stats.count("fallbacks")
+            try:
+                async for attempt in AsyncRetrying(**retry_policy()):
+                    with attempt:
+                        stream = await gemini_client.aio.models.generate_content_stream(
+                            contents=prompt, model=model_name
+                        )
+            except Exception as e:
+                stats.record(False)
+                if number == len(models) - 1:
+                    raise
+                logging.warning(f"[Gemini] Modelo {model_name} falhou ({e}), usando {models[number + 1]}")
+                continue
+            stats.record(True)
+            return stream
+
     def _parse_gemini_response(self, response) -> Dict[str, Any]:
         """Parse Gemini response into structured format, extracting JSON from text if needed."""
-        import re
 
         if hasattr(response, "text"):
             text = response.text
@@ -48,44 +274,5 @@ class GenerativeService:
         else:
             text = str(response)
 
-        json_regex = r"\{[\s\S]*?\}"
-        match = re.search(json_regex, text)
-        if match:
-            json_str = match.group(0)
-        else:
-            json_str = text
-
-        try:
-            data = json.loads(json_str)
-        except Exception:
-            # Não foi possível extrair JSON: derive instruções removendo todos os blocos de código
-            instr = re.sub(r"```[\s\S]*?```", "", text).strip()
-            return {
-                "files": [],
-                "raw_text": text,
-                "instructions": instr,
-                "error": "Não foi possível interpretar a resposta da Gemini.",
-            }
-
-        files = data.get("files", [])
-        # Se a AI retornou um campo 'instructions' use ele, caso contrário derive removendo blocos de código
-        instructions = data.get("instructions")
-
-        logging.info(f"Arquivos retornados: {files}")
-        # Valida formato de arquivos
-        if not isinstance(files, list):
-            logging.error(f"Formato inesperado de arquivos: {files}")
-            instr = instructions if instructions else re.sub(r"```[\s\S]*?```", "", text).strip()
-            return {"files": [], "raw_text": text, "instructions": instr}
-
-        valid_files = [f for f in files if isinstance(f, dict) and "path" in f and "content" in f]
-        if not valid_files:
-            logging.error(f"Nenhum arquivo válido encontrado: {files}")
-            instr = instructions if instructions else re.sub(r"```[\s\S]*?```", "", text).strip()
-            return {"files": [], "raw_text": text, "instructions": instr}
-
-        # Se não houver instruções explícitas, derive juntando todo o texto fora dos blocos de código
-        if not instructions:
-            instructions = re.sub(r"```[\s\S]*?```", "", text).strip()
-
-        return {"files": valid_files, "raw_text": text, "instructions": instructions}
+        # Single linear pass: ```json block, balanced top-level object, or fenced files
+        return ResponseParser.parse(text or "")
@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+from ..models.models import GeneratedProject, GenerationJob
+from .generation_pipeline import GenerationPipeline
+from .generative import GenerativeService
+
+TERMINAL_STATUSES = {"completed", "failed"}
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at GENERATION_QUEUE_MAX_DEPTH"""
+
+
+class GenerationJobQueue:
+    """
+    Bounded in-process queue running the generation pipeline on a worker pool.
+
+    Job state lives in the generation_jobs table, so status and results
+    survive a restart. Several workers (processes, instances) can share the
+    table: a job runs only in the worker that claims it (an atomic
+    queued -> running update), which keeps its heartbeat fresh while it runs.
+    On start() queued jobs are picked up, and any worker re-queues jobs whose
+    heartbeat went stale (their worker died), never ones still running.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        generative_service: GenerativeService,
+        workers: Optional[int] = None,
+        max_depth: Optional[int] = None,
+    ):
+        self._session_factory = session_factory
+        self._generative_service = generative_service
+        self._worker_count = workers or settings.GENERATION_JOB_WORKERS
+        self._max_depth = max_depth or settings.GENERATION_QUEUE_MAX_DEPTH
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self._max_depth)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._worker_count)]
+        self._tasks.append(asyncio.create_task(self._maintain()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(
+        self, prompt: str, use_cache: bool = True, output_mode: Optional[str] = None, model_tier: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Persist a new job and enqueue it; raises QueueFullError under backpressure"""
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        if self._queue.full():
+            raise QueueFullError(f"Generation queue is full ({self._max_depth} jobs)")
+
+        db = self._session_factory()
+        try:
+            job = GenerationJob(
+                job_id=str(uuid.uuid4()), status="queued", prompt=prompt, use_cache=use_cache,
+                output_mode=output_mode, model_tier=model_tier
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            self._queue.put_nowait(job.job_id)
+            return self.job_payload(job)
+        finally:
+            db.close()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current job state, including the generation result once completed"""
+        db = self._session_factory()
+        try:
+            job = db.query(GenerationJob).filter(GenerationJob.job_id == job_id).first()
+            if not job:
+                return None
+            payload = self.job_payload(job)
+            if job.status == "completed":
+                project = db.query(GeneratedProject).filter(
+                    GeneratedProject.project_id == job.project_id
+                ).first()
+                if project:
+                    payload["result"] = GenerationPipeline.response_from_project(project)
+            return payload
+        finally:
+            db.close()
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        events: asyncio.Queue = asyncio.Queue()
+        self._subscribers[job_id].add(events)
+        return events
+
+    def unsubscribe(self, job_id: str, events: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(events)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+    @staticmethod
+    def job_payload(job: GenerationJob) -> Dict[str, Any]:
+        return {
+            "job_id": job.job_id,
+            "status": job.status,
+            "project_id": job.project_id,
+            "error": job.error,
+        }
+
+    def _publish(self, payload: Dict[str, Any]) -> None:
+        for events in self._subscribers.get(payload["job_id"], ()):
+            events.put_nowait(payload)
+
+    def _commit(self, db: Session, job: GenerationJob, **changes: Any) -> Dict[str, Any]:
+        """Blocking: apply `changes` to the job, commit, and return its payload"""
+        for name, value in changes.items():
+            setattr(job, name, value)
+        db.commit()
+        return self.job_payload(job)
+
+    def _fail(self, db: Session, job: GenerationJob, error: str) -> Dict[str, Any]:
+        db.rollback()
+        return self._commit(db, job, status="failed", error=error)
+
+    async def _maintain(self) -> None:
+        """Pick up queued jobs once, then keep heartbeats fresh and recover abandoned jobs"""
+        job_ids = await run_in_threadpool(lambda: self._queued_job_ids() + self._requeue_stale())
+        while True:
+            if job_ids:
+                logging.info(f"[Jobs] Recolocando {len(job_ids)} jobs pendentes na fila")
+            for job_id in job_ids:
+                await self._queue.put(job_id)
+            await asyncio.sleep(settings.GENERATION_JOB_HEARTBEAT_SECONDS)
+            await run_in_threadpool(self._heartbeat)
+            job_ids = await run_in_threadpool(self._requeue_stale)
+
+    def _queued_job_ids(self) -> List[str]:
+        # Another live worker may hold some of them too: whichever claims a job first runs it
+        db = self._session_factory()
+        try:
+            rows = db.query(GenerationJob.job_id).filter(
+                GenerationJob.status == "queued"
+            ).order_by(GenerationJob.id).all()
+            return [row.job_id for row in rows]
+        finally:
+            db.close()
+
+    def _requeue_stale(self) -> List[str]:
+        """Put back to queued the claimed jobs whose owner stopped refreshing their heartbeat"""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.GENERATION_JOB_STALE_SECONDS)
+        stale = (GenerationJob.heartbeat_at.is_(None)) | (GenerationJob.heartbeat_at < cutoff)
+        db = self._session_factory()
+        try:
+            candidates = db.query(GenerationJob.job_id).filter(
+                GenerationJob.status.notin_(TERMINAL_STATUSES | {"queued"}), stale
+            ).order_by(GenerationJob.id).all()
+            job_ids = []
+            for row in candidates:
+                # Conditional update: a worker heartbeating meanwhile, or another one requeueing first, wins
+                requeued = db.query(GenerationJob).filter(
+                    GenerationJob.job_id == row.job_id,
+                    GenerationJob.status.notin_(TERMINAL_STATUSES | {"queued"}),
+                    stale,
+                ).update({"status": "queued", "owner": None}, synchronize_session=False)
+                db.commit()
+                if requeued:
+                    job_ids.append(row.job_id)
+            return job_ids
+        finally:
+            db.close()
+
+    def _heartbeat(self) -> None:
+        db = self._session_factory()
+        try:
+            db.query(GenerationJob).filter(
+                GenerationJob.owner == self.owner, GenerationJob.status.notin_(TERMINAL_STATUSES | {"queued"})
+            ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _claim(self, db: Session, job_id: str) -> Optional[GenerationJob]:
+        """queued -> running for this worker; None if another worker got there first"""
+        claimed = db.query(GenerationJob).filter(
+            GenerationJob.job_id == job_id, GenerationJob.status == "queued"
+        ).update(
+            {"status": "running", "owner": self.owner, "heartbeat_at": datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.commit()
+        if claimed != 1:
+            return None
+        return db.query(GenerationJob).filter(GenerationJob.job_id == job_id).first()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except Exception as e:
+                logging.error(f"[Jobs] Erro inesperado no job {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str) -> None:
+        # The session is sync: every query and commit runs on the threadpool
+        db = self._session_factory()
+        try:
+            job = await run_in_threadpool(self._claim, db, job_id)
+            if job is None:
+                return
+            self._publish(self.job_payload(job))
+            prompt, use_cache = job.prompt, job.use_cache is not False
+            output_mode, model_tier = job.output_mode, job.model_tier
+
+            async def on_progress(stage: str) -> None:
+                self._publish(await run_in_threadpool(self._commit, db, job, status=stage))
+
+            try:
+                result = await GenerationPipeline.run(
+                    prompt, db, self._generative_service, on_progress=on_progress,
+                    use_cache=use_cache, output_mode=output_mode, model_tier=model_tier
+                )
+            except Exception as e:
+                self._publish(await run_in_threadpool(self._fail, db, job, str(e)))
+                return
+
+            self._publish(await run_in_threadpool(
+                self._commit, db, job, status="completed", project_id=result["project_id"]
+            ))
+        finally:
+            await run_in_threadpool(db.close)
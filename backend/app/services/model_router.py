@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from ..config import settings
+
+ModelCall = Callable[[str], Awaitable[Any]]
+# Reserves capacity for a duplicate request: returns its release callback, or None to not hedge
+HedgeReservation = Callable[[], Awaitable[Optional[Callable[[], None]]]]
+
+
+class ModelStats:
+    """
+    Recent behaviour of one model in this worker: latencies of the last
+    successful calls (hedge delay) and outcomes of the last
+    MODEL_STATS_WINDOW_SECONDS (error rate), plus running counters.
+    """
+
+    def __init__(self, max_samples: int, window_seconds: float):
+        self.latencies: Deque[float] = deque(maxlen=max_samples)
+        self.outcomes: Deque[Tuple[float, bool]] = deque()
+        self.window_seconds = window_seconds
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool, latency: Optional[float] = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.counts["calls" if ok else "errors"] += 1
+            if ok and latency is not None:
+                self.latencies.append(latency)
+            self.outcomes.append((now, ok))
+            self._expire(now)
+
+    def count(self, event: str) -> None:
+        with self._lock:
+            self.counts[event] += 1
+
+    def _expire(self, now: float) -> None:
+        while self.outcomes and self.outcomes[0][0] < now - self.window_seconds:
+            self.outcomes.popleft()
+
+    def latency_percentile(self, fraction: float) -> Optional[float]:
+        """Nearest-rank percentile of the recent latencies; None until there are enough of them"""
+        with self._lock:
+            samples = sorted(self.latencies)
+        if len(samples) < max(settings.GENERATION_HEDGE_MIN_SAMPLES, 1):
+            return None
+        rank = max(1, math.ceil(len(samples) * fraction))
+        return samples[rank - 1]
+
+    def error_rate(self) -> Tuple[float, int]:
+        """(fraction of failed calls, calls) within the window"""
+        with self._lock:
+            self._expire(time.monotonic())
+            calls = len(self.outcomes)
+            errors = sum(1 for _, ok in self.outcomes if not ok)
+        return (errors / calls if calls else 0.0), calls
+
+    def snapshot(self) -> Dict[str, Any]:
+        error_rate, recent_calls = self.error_rate()
+        p50, p95 = self.latency_percentile(0.5), self.latency_percentile(0.95)
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            **{event: counts.get(event, 0) for event in ModelRouter.EVENTS},
+            "recent_calls": recent_calls,
+            "recent_error_rate": round(error_rate, 4),
+            "latency_p50_s": round(p50, 3) if p50 is not None else None,
+            "latency_p95_s": round(p95, 3) if p95 is not None else None,
+        }
+
+
+class ModelRouter:
+    """
+    Picks the Gemini model for each call, hedges slow calls and falls back
+    to GEMINI_FALLBACK_MODEL when one fails.
+
+    The model is the request's tier (GEMINI_MODEL_TIERS), else
+    GEMINI_LARGE_PROMPT_MODEL for prompts over GEMINI_LARGE_PROMPT_TOKENS
+    (estimated), else GEMINI_MODEL. A call still unanswered at the model's
+    recent GENERATION_HEDGE_PERCENTILE latency gets a duplicate request;
+    the first answer wins and the other is cancelled. A call that fails
+    (after its retries) or exceeds GENERATION_MODEL_TIMEOUT_SECONDS is
+    retried once on the fallback model, and a model failing more than
+    GENERATION_MODEL_MAX_ERROR_RATE of its recent calls is tried after the
+    fallback instead of before it, until its errors age out of the window.
+    """
+
+    EVENTS = ("calls", "errors", "timeouts", "hedges", "hedge_wins", "cancelled", "fallbacks")
+
+    def __init__(self):
+        self._stats: Dict[str, ModelStats] = {}
+        self._lock = threading.Lock()
+
+    def stats(self, model: str) -> ModelStats:
+        with self._lock:
+            stats = self._stats.get(model)
+            if stats is None:
+                stats = self._stats[model] = ModelStats(
+                    settings.MODEL_STATS_MAX_SAMPLES, settings.MODEL_STATS_WINDOW_SECONDS
+                )
+            return stats
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            models = dict(self._stats)
+        return {model: stats.snapshot() for model, stats in sorted(models.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    @staticmethod
+    def validate_tier(tier: Optional[str]) -> None:
+        if tier is not None and tier not in settings.GEMINI_MODEL_TIERS:
+            known = ", ".join(sorted(settings.GEMINI_MODEL_TIERS)) or "none configured"
+            raise ValueError(f"Unknown model tier '{tier}' (known: {known})")
+
+    @staticmethod
+    def route(prompt: str, tier: Optional[str] = None) -> str:
+        """The model a prompt goes to when every model is healthy"""
+        if tier is not None:
+            ModelRouter.validate_tier(tier)
+            return settings.GEMINI_MODEL_TIERS[tier]
+        estimated_tokens = len(prompt) / settings.PROMPT_CHARS_PER_TOKEN
+        if settings.GEMINI_LARGE_PROMPT_MODEL and estimated_tokens > settings.GEMINI_LARGE_PROMPT_TOKENS:
+            return settings.GEMINI_LARGE_PROMPT_MODEL
+        return settings.GEMINI_MODEL
+
+    def candidates(self, prompt: str, tier: Optional[str] = None) -> List[str]:
+        """Models to try in order: the routed one, then the fallback (swapped if the first is failing)"""
+        models = [self.route(prompt, tier)]
+        fallback = settings.GEMINI_FALLBACK_MODEL
+        if fallback and fallback != models[0]:
+            error_rate, calls = self.stats(models[0]).error_rate()
+            unhealthy = calls >= settings.GENERATION_MODEL_MIN_CALLS and error_rate > settings.GENERATION_MODEL_MAX_ERROR_RATE
+            models = [fallback, models[0]] if unhealthy else [models[0], fallback]
+        return models
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        if not settings.GENERATION_HEDGE_ENABLED:
+            return None
+        delay = self.stats(model).latency_percentile(settings.GENERATION_HEDGE_PERCENTILE)
+        return max(delay, settings.GENERATION_HEDGE_MIN_DELAY_SECONDS) if delay is not None else None
+
+    async def generate(
+        self,
+        call: ModelCall,
+        prompt: str,
+        tier: Optional[str] = None,
+        reserve_hedge: Optional[HedgeReservation] = None,
+    ) -> Any:
+        """
+        Run `call(model)` on the candidates in turn until one answers.
+        `reserve_hedge` is awaited before sending a duplicate (e.g. to take a
+        generation slot only if one is free); without it, hedges always go.
+        """
+        models = self.candidates(prompt, tier)
+        error: Optional[BaseException] = None
+        for number, model in enumerate(models):
+            if number:
+                logging.warning(f"[Gemini] Modelo {models[number - 1]} falhou ({error}), usando {model}")
+                self.stats(model).count("fallbacks")
+            try:
+                return await self._call_hedged(call, model, reserve_hedge)
+            except Exception as e:
+                error = e
+        raise error
+
+    async def _call_hedged(self, call: ModelCall, model: str, reserve_hedge: Optional[HedgeReservation]) -> Any:
+        stats = self.stats(model)
+        timeout = settings.GENERATION_MODEL_TIMEOUT_SECONDS
+        deadline = time.monotonic() + timeout if timeout else None
+
+        def remaining() -> Optional[float]:
+            return max(deadline - time.monotonic(), 0.0) if deadline is not None else None
+
+        primary = asyncio.create_task(self._timed(call, model))
+        hedge: Optional[asyncio.Task] = None
+        pending = {primary}
+        error: Optional[BaseException] = None
+        try:
+            delay = self.hedge_delay(model)
+            if delay is not None and (deadline is None or delay < remaining()):
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                release = (await reserve_hedge() if reserve_hedge else lambda: None) if not done else None
+                if release is not None:
+                    logging.info(f"[Gemini] {model} sem resposta após {delay:.2f}s, enviando requisição duplicada")
+                    stats.count("hedges")
+                    hedge = asyncio.create_task(self._timed(call, model))
+                    hedge.add_done_callback(lambda _: release())
+                    pending.add(hedge)
+
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=remaining(), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    stats.count("timeouts")
+                    stats.record(False)
+                    raise asyncio.TimeoutError(f"{model} did not answer within {timeout}s")
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            stats.count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The losing request (or both, on timeout / cancellation) is cancelled, not awaited to the end
+            for task in pending:
+                task.cancel()
+                stats.count("cancelled")
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _timed(self, call: ModelCall, model: str) -> Any:
+        stats = self.stats(model)
+        started = time.perf_counter()
+        try:
+            result = await call(model)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            stats.record(False)
+            raise
+        stats.record(True, time.perf_counter() - started)
+        return result
+
+
+model_router = ModelRouter()
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Optional, Tuple
+
+from fastapi import Request
+
+from ..config import settings
+from .document_parser import DocumentParser, DocumentSource
+
+
+class ParseTimeoutError(Exception):
+    """A parse job ran past PARSE_TIMEOUT_SECONDS and its worker was killed"""
+
+
+def _warm_worker() -> int:
+    # Import the native parser libraries once per worker, ahead of real traffic
+    import docx  # noqa: F401
+    import fitz  # noqa: F401
+    import PyPDF2  # noqa: F401
+    return os.getpid()
+
+
+class ParsePool:
+    """
+    Runs document parsing in a pool of worker processes.
+
+    Parsing is CPU-bound and holds the GIL, so it must not run on the event
+    loop. A job that exceeds the timeout gets its pool killed and replaced;
+    other jobs caught in the restart are retried once on the new pool.
+    With workers=0 parsing runs on a thread instead (no hard timeout).
+    """
+
+    def __init__(self, workers: Optional[int] = None, timeout: Optional[float] = None):
+        configured = settings.PARSE_POOL_WORKERS if workers is None else workers
+        self.workers = (os.cpu_count() or 1) if configured is None else configured
+        self.timeout = timeout or settings.PARSE_TIMEOUT_SECONDS
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        if self.workers > 0 and self._executor is None:
+            self._executor = self._create_executor()
+
+    async def warm_up(self) -> None:
+        """Spawn every worker and load the parser libraries in it"""
+        if self.workers > 0:
+            # No job timeout here: spawning and importing is the cost being paid up front
+            self.start()
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(
+                *(loop.run_in_executor(self._executor, _warm_worker) for _ in range(self.workers))
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def parse(self, source: DocumentSource, filename: str) -> Tuple[str, str]:
+        """Parse a document off the event loop; returns (content, file_type)"""
+        source = self._picklable(source)
+        if self.workers > 1 and os.path.splitext(filename)[1].lower() == '.pdf':
+            pages = [text async for text in self.iter_pdf_pages(source)]
+            return '\n'.join(pages), 'pdf'
+        return await self.run(DocumentParser.parse, source, filename)
+
+    async def iter_pdf_pages(
+        self, source: DocumentSource, pages_per_task: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield page texts in order while page ranges are extracted in parallel.
+
+        At most one range per worker is in flight, so a caller that stops
+        early (e.g. once it has a preview) leaves the rest of the PDF unread.
+        """
+        source = self._picklable(source)
+        step = pages_per_task or settings.PARSE_PDF_PAGES_PER_TASK
+        page_count = await self.run(DocumentParser.pdf_page_count, source)
+
+        pending = deque()
+        try:
+            for start in range(0, page_count, step):
+                pending.append(asyncio.ensure_future(
+                    self.run(DocumentParser.extract_pdf_pages, source, start, min(start + step, page_count))
+                ))
+                if len(pending) >= max(self.workers, 1):
+                    for text in await pending.popleft():
+                        yield text
+            while pending:
+                for text in await pending.popleft():
+                    yield text
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.workers == 0:
+            return await asyncio.to_thread(fn, *args)
+
+        self.start()
+        for attempt in range(2):
+            executor = self._executor
+            future = asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+            try:
+                return await asyncio.wait_for(future, timeout=self.timeout)
+            except asyncio.TimeoutError:
+                logging.error(f"[Parse] Tarefa excedeu {self.timeout}s; reiniciando o pool de processos")
+                self._restart(executor)
+                raise ParseTimeoutError(f"Document parsing timed out after {self.timeout:g}s")
+            except BrokenProcessPool:
+                # Killed alongside a timed-out job (or a worker crashed): retry once
+                self._restart(executor)
+                if attempt == 1:
+                    raise
+
+    @staticmethod
+    def _picklable(source: DocumentSource) -> DocumentSource:
+        """Hand workers a path for disk-backed spools, bytes for in-memory ones"""
+        if isinstance(source, (bytes, str)):
+            return source
+        path = getattr(source, "path", None)
+        if path:
+            source.flush()
+            return path
+        source.seek(0)
+        return source.read()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        if self._executor is not broken:
+            return  # another job already replaced it
+        for process in list((broken._processes or {}).values()):
+            process.kill()
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._create_executor()
+
+
+def get_parse_pool(request: Request) -> ParsePool:
+    """FastAPI dependency: the app-wide pool, or an in-thread one when the lifespan did not run"""
+    pool = getattr(request.app.state, "parse_pool", None)
+    return pool if pool is not None else ParsePool(workers=0)
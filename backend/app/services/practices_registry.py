@@ -0,0 +1,133 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+
+PRACTICES_DIR = os.path.join(os.path.dirname(__file__), "..", "practices")
+
+
+class PracticesRegistry:
+    """
+    In-memory index of the best-practices markdown library.
+
+    Files are parsed once; refresh() re-reads only files whose mtime or size
+    changed. The serialized /practices payload and its ETag are rebuilt only
+    when something changed.
+    """
+
+    def __init__(self, practices_dir: str = PRACTICES_DIR):
+        self.practices_dir = practices_dir
+        self._practices: Dict[str, Dict[str, Any]] = {}
+        self._stamps: Dict[str, tuple] = {}  # path -> (mtime_ns, size)
+        self._payload = b'{"practices": []}'
+        self._etag = self._compute_etag(self._payload)
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def etag(self) -> str:
+        self._refresh_if_due()
+        return self._etag
+
+    @property
+    def payload(self) -> bytes:
+        """JSON body of GET /practices"""
+        self._refresh_if_due()
+        return self._payload
+
+    def get(self, practice_id: str) -> Optional[Dict[str, Any]]:
+        self._refresh_if_due()
+        return self._practices.get(practice_id)
+
+    def all(self) -> List[Dict[str, Any]]:
+        self._refresh_if_due()
+        return list(self._practices.values())
+
+    def refresh(self) -> int:
+        """Re-read changed, added and removed files; returns how many changed"""
+        with self._lock:
+            self._last_check = time.monotonic()
+            if not os.path.exists(self.practices_dir):
+                changed = len(self._practices)
+                self._practices, self._stamps = {}, {}
+            else:
+                changed = self._sync_files()
+
+            if changed:
+                ordered = [self._practices[key] for key in sorted(self._practices)]
+                self._payload = json.dumps({"practices": ordered}).encode("utf-8")
+                self._etag = self._compute_etag(self._payload)
+            return changed
+
+    def _sync_files(self) -> int:
+        seen = set()
+        changed = 0
+        for entry in os.scandir(self.practices_dir):
+            if not entry.name.endswith(".md") or not entry.is_file():
+                continue
+            seen.add(entry.path)
+            stat = entry.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if self._stamps.get(entry.path) == stamp:
+                continue
+
+            practice = self._load_file(entry.path)
+            if practice is None:
+                continue
+            self._practices[practice["id"]] = practice
+            self._stamps[entry.path] = stamp
+            changed += 1
+
+        for path in set(self._stamps) - seen:
+            del self._stamps[path]
+            self._practices.pop(os.path.basename(path).replace('.md', ''), None)
+            changed += 1
+        return changed
+
+    def _refresh_if_due(self) -> None:
+        interval = settings.PRACTICES_RELOAD_INTERVAL_SECONDS
+        if self._last_check == 0.0 or (interval > 0 and time.monotonic() - self._last_check >= interval):
+            self.refresh()
+
+    @staticmethod
+    def _load_file(file_path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except Exception as e:
+            logging.error(f"Error reading practice file {file_path}: {e}")
+            return None
+
+        # Extract title from filename or first line
+        filename = os.path.basename(file_path)
+        practice_id = filename.replace('.md', '')
+        title = practice_id.replace('_', ' ').replace('-', ' ').title()
+
+        # Extract excerpt (first paragraph or first 200 chars)
+        excerpt = ""
+        for line in content.split('\n'):
+            if line.strip() and not line.startswith('#'):
+                excerpt = line.strip()
+                break
+
+        if not excerpt and content:
+            excerpt = content[:200] + "..." if len(content) > 200 else content
+
+        return {
+            "id": practice_id,
+            "title": title,
+            "excerpt": excerpt,
+            "content": content
+        }
+
+    @staticmethod
+    def _compute_etag(payload: bytes) -> str:
+        return '"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+
+
+practices_registry = PracticesRegistry()
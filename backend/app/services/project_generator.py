@@ -1,52 +1,101 @@
-import os
+import io
 import json
+import posixpath
 import zipfile
-import tempfile
-import uuid
-from typing import Dict, Any, List
+from typing import BinaryIO, Dict, Any, Iterator
+from ..config import settings
+from .artifact_store import get_artifact_store
+from .metrics import ZIP_BUILD_DURATION
+
+# Fixed entry timestamp: identical projects give identical ZIP bytes (one blob in the store)
+ZIP_ENTRY_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """Unseekable sink that hands ZIP bytes back as they are produced"""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
 
 class ProjectGenerator:
     """Generate downloadable project files from AI response"""
     
     @staticmethod
     def create_project_zip(project_data: Dict[str, Any]) -> str:
-        """Create a ZIP file containing the generated project"""
-        project_id = str(uuid.uuid4())
+        """Create the project ZIP in the artifact store and return its key"""
+        return get_artifact_store().put(ProjectGenerator.build_project_zip(project_data))
+    
+    @staticmethod
+    def build_project_zip(project_data: Dict[str, Any]) -> bytes:
+        """Compress straight from memory: no temp tree, no re-reading files"""
+        with ZIP_BUILD_DURATION.time():
+            buffer = io.BytesIO()
+            ProjectGenerator.write_project_zip(project_data, buffer)
+            return buffer.getvalue()
+    
+    @staticmethod
+    def write_project_zip(project_data: Dict[str, Any], fileobj: BinaryIO) -> None:
+        """Write the project ZIP into any writable file object (seekable or not)"""
+        with ProjectGenerator._open_zip(fileobj) as zipf:
+            for arcname, content in ProjectGenerator._project_entries(project_data).items():
+                ProjectGenerator._write_entry(zipf, arcname, content)
+    
+    @staticmethod
+    def stream_project_zip(project_data: Dict[str, Any]) -> Iterator[bytes]:
+        """Yield the project ZIP one compressed file at a time, without building it whole"""
+        buffer = _ZipStreamBuffer()
+        with ProjectGenerator._open_zip(buffer) as zipf:
+            for arcname, content in ProjectGenerator._project_entries(project_data).items():
+                ProjectGenerator._write_entry(zipf, arcname, content)
+                yield buffer.drain()
+        # Central directory
+        yield buffer.drain()
+    
+    @staticmethod
+    def _open_zip(fileobj: BinaryIO) -> zipfile.ZipFile:
+        level = settings.ZIP_COMPRESSION_LEVEL
+        if level == 0:
+            return zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_STORED)
+        return zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED, compresslevel=level)
+    
+    @staticmethod
+    def _write_entry(zipf: zipfile.ZipFile, arcname: str, content: str) -> None:
+        info = zipfile.ZipInfo(arcname, date_time=ZIP_ENTRY_DATE_TIME)
+        info.external_attr = 0o644 << 16
+        zipf.writestr(info, content, compress_type=zipf.compression, compresslevel=zipf.compresslevel)
+    
+    @staticmethod
+    def _project_entries(project_data: Dict[str, Any]) -> Dict[str, str]:
+        """Archive name -> content; later entries replace earlier ones, as files on disk would"""
+        entries = {}
+        for file_info in project_data.get("files", []):
+            arcname = ProjectGenerator._safe_arcname(file_info["path"])
+            if arcname:
+                entries[arcname] = file_info["content"]
         
-        # Create temporary directory for project files
-        with tempfile.TemporaryDirectory() as temp_dir:
-            project_dir = os.path.join(temp_dir, f"generated_project_{project_id}")
-            os.makedirs(project_dir, exist_ok=True)
-            
-            # Create files from AI response
-            for file_info in project_data.get("files", []):
-                file_path = os.path.join(project_dir, file_info["path"])
-                
-                # Create directory structure
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                
-                # Write file content
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(file_info["content"])
-            
-            # Create additional project files
-            ProjectGenerator._create_additional_files(project_dir, project_data)
-            
-            # Create ZIP file
-            zip_path = f"generated_projects/project_{project_id}.zip"
-            os.makedirs(os.path.dirname(zip_path), exist_ok=True)
-            
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for root, dirs, files in os.walk(project_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, project_dir)
-                        zipf.write(file_path, arcname)
-            
-            return zip_path
+        # Additional project files
+        entries.update(ProjectGenerator._additional_files(project_data))
+        return entries
     
     @staticmethod
-    def _create_additional_files(project_dir: str, project_data: Dict[str, Any]) -> None:
+    def _safe_arcname(path: str) -> str:
+        """Keep archive names relative and inside the project root"""
+        parts = [part for part in posixpath.normpath(path.replace("\\", "/")).split("/") if part not in ("", ".", "..")]
+        return "/".join(parts)
+    
+    @staticmethod
+    def _additional_files(project_data: Dict[str, Any]) -> Dict[str, str]:
         """Create additional project files like README, scripts, etc."""
         
         # Create enhanced README
@@ -78,9 +127,7 @@ Generated files:
 Generated by PromptCodeGen
 """
         
-        readme_path = os.path.join(project_dir, "README.md")
-        with open(readme_path, 'w', encoding='utf-8') as f:
-            f.write(readme_content)
+        files = {"README.md": readme_content}
         
         # Create .env.example if backend files are present
         has_backend = any(file_info["path"].startswith("backend/") for file_info in project_data.get("files", []))
@@ -92,6 +139,6 @@ DATABASE_URL=sqlite:///./app.db
 API_KEY=your_api_key_here
 PORT=8000
 """
-            env_path = os.path.join(project_dir, ".env.example")
-            with open(env_path, 'w', encoding='utf-8') as f:
-                f.write(env_example_content)
\ No newline at end of file
+            files[".env.example"] = env_example_content
+        
+        return files
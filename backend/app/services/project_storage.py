@@ -0,0 +1,52 @@
+import json
+import zlib
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from ..models.models import GeneratedProject
+
+
+class ProjectStorage:
+    """
+    Compact persisted form of a generation.
+
+    project_data holds the files and instructions once, as zlib-compressed
+    compact JSON; the model's raw text goes to its own compressed column
+    (or is dropped with GENERATION_STORE_RAW_TEXT=false) so loading a
+    project for its files never inflates it. Rows written before this
+    layout keep everything in files_json and are still readable.
+    """
+
+    @staticmethod
+    def store(project: GeneratedProject, generated_data: Dict[str, Any]) -> None:
+        data = {key: value for key, value in generated_data.items() if key != "raw_text"}
+        project.project_data = ProjectStorage._compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+        raw_text = generated_data.get("raw_text")
+        if raw_text and settings.GENERATION_STORE_RAW_TEXT:
+            project.raw_text = ProjectStorage._compress(raw_text)
+
+    @staticmethod
+    def has_data(project: GeneratedProject) -> bool:
+        return bool(project.project_data or project.files_json)
+
+    @staticmethod
+    def load(project: GeneratedProject, include_raw_text: bool = True) -> Dict[str, Any]:
+        """The generated data as returned by the model parser (raw_text "" when not kept)"""
+        if project.project_data is None:
+            data = json.loads(project.files_json)
+            if not include_raw_text:
+                data.pop("raw_text", None)
+            return data
+
+        data = json.loads(zlib.decompress(project.project_data))
+        if include_raw_text:
+            data["raw_text"] = ProjectStorage._decompress(project.raw_text) or ""
+        return data
+
+    @staticmethod
+    def _compress(text: str) -> bytes:
+        return zlib.compress(text.encode("utf-8"), settings.PROJECT_DATA_COMPRESSION_LEVEL)
+
+    @staticmethod
+    def _decompress(blob: Optional[bytes]) -> Optional[str]:
+        return zlib.decompress(blob).decode("utf-8") if blob is not None else None
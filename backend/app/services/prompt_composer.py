@@ -0,0 +1,368 @@
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..config import settings
+from ..snippets import SNIPPETS
+from .metrics import PROMPT_COMPOSE_DURATION
+from .practices_registry import practices_registry
+from .section_index import SectionIndex, section_query
+
+OUTPUT_REQUIREMENTS = """
+        Por favor, gere um projeto completo e funcional com base nos requisitos acima.
+        Retorne o código SEM comentários dentro dos blocos de código. Todas as explicações, instruções e descrições devem ser fornecidas separadamente, no campo de instruções, nunca como comentários no código.
+        Para cada bloco de código que você gerar, use sempre três crases seguidas pelo nome da linguagem (por exemplo, python, js, java, etc.) e feche com três crases.
+        Explique o funcionamento dos blocos de código apenas no campo de instruções, usando Markdown, nunca dentro do código.
+        """
+
+# Truncation strategies
+KEEP_HEAD = "head"  # keep the beginning
+KEEP_HEAD_TAIL = "head_tail"  # keep both ends, elide the middle
+
+OMITTED_MARKER = "\n[... ~{tokens} tokens omitted ...]\n"
+SECTIONS_OMITTED_MARKER = "\n[... {count} sections omitted ...]\n"
+
+
+@dataclass(frozen=True)
+class SectionTemplate:
+    """
+    How one kind of section is rendered and cut.
+
+    Sections of the same kind share a group heading, emitted once. Under a
+    tight budget the lowest priority is cut first; required sections never
+    are, and the document only down to its minimum share (see _fit).
+    """
+    kind: str
+    heading: str
+    priority: int
+    strategy: str = KEEP_HEAD
+    required: bool = False
+    titled: bool = False
+
+
+SECTION_TEMPLATES = {
+    template.kind: template
+    for template in (
+        # The spec itself: cut (keeping its start and end) only after snippets and practices
+        SectionTemplate("document", "## Document Requirements", priority=30, strategy=KEEP_HEAD_TAIL),
+        SectionTemplate("practice", "## Best Practices to Apply", priority=20, titled=True),
+        SectionTemplate("snippet", "## Prompt Engineering Context", priority=10, titled=True),
+        SectionTemplate("extra", "## Additional Instructions", priority=90, required=True),
+        SectionTemplate("output", "## Output Requirements", priority=100, required=True),
+    )
+}
+
+# Rendering order; independent of priority
+SECTION_ORDER = ("document", "snippet", "practice", "extra", "output")
+
+
+def estimate_tokens(text: str, chars_per_token: Optional[float] = None) -> int:
+    """Cheap, linear-time token estimate (no tokenizer round trip)"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / (chars_per_token or settings.PROMPT_CHARS_PER_TOKEN))
+
+
+@dataclass
+class PromptSection:
+    template: SectionTemplate
+    id: str
+    body: str
+    title: Optional[str] = None
+    original_tokens: int = 0
+    tokens: int = 0
+    truncated: bool = False
+    dropped: bool = False
+
+    def lines(self) -> List[str]:
+        if self.template.titled:
+            return [f"### {self.title}", self.body, ""]
+        return [self.body] if self.template.kind == "output" else [self.body, ""]
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.template.kind,
+            "tokens": self.tokens,
+            "original_tokens": self.original_tokens,
+            "truncated": self.truncated,
+            "dropped": self.dropped,
+        }
+
+
+@dataclass
+class ComposedPrompt:
+    prompt: str
+    token_budget: int
+    estimated_tokens: int
+    sections: List[PromptSection] = field(default_factory=list)
+    document_sections: Optional[List[Dict[str, Any]]] = None  # set when composed from top-k sections
+
+    @property
+    def truncated(self) -> bool:
+        return any(section.truncated or section.dropped for section in self.sections)
+
+    def to_response(self) -> Dict[str, Any]:
+        response = {
+            "prompt": self.prompt,
+            "token_budget": self.token_budget,
+            "estimated_tokens": self.estimated_tokens,
+            "truncated": self.truncated,
+            "sections": [section.report() for section in self.sections],
+        }
+        if self.document_sections is not None:
+            response["document_sections"] = self.document_sections
+        return response
+
+
+class PromptComposer:
+    """
+    Builds the generation prompt from a document, snippets and practices.
+
+    Sections are collected first, fitted to the token budget, and joined once
+    at the end, so a multi-megabyte document is copied a constant number of
+    times instead of once per appended piece.
+    """
+
+    @staticmethod
+    def compose(
+        document_content: str,
+        snippet_ids: List[str] = (),
+        practice_ids: List[str] = (),
+        extra_instructions: Optional[str] = None,
+        token_budget: Optional[int] = None,
+        practices: Optional[Dict[str, Dict[str, Any]]] = None,
+        section_top_k: Optional[int] = None,
+        section_index: Optional[SectionIndex] = None,
+    ) -> ComposedPrompt:
+        """
+        `practices` is a preloaded id -> practice map (see load_practices); default: the registry.
+
+        With `section_top_k`, the document is reduced to its k sections most
+        relevant to the snippets, practices and extra instructions (BM25 over
+        `section_index`, the document's stored index; built here if absent).
+        """
+        with PROMPT_COMPOSE_DURATION.time():
+            budget = token_budget or settings.PROMPT_TOKEN_BUDGET
+            if practices is None:
+                practices = PromptComposer.load_practices(practice_ids)
+            sections = PromptComposer._collect(
+                document_content, snippet_ids, practice_ids, extra_instructions, practices
+            )
+            for section in sections:
+                section.original_tokens = section.tokens = PromptComposer._section_tokens(section)
+
+            document_sections = None
+            if section_top_k:
+                document_sections = PromptComposer._select_document_sections(
+                    sections, budget, section_top_k, section_index or SectionIndex.build(document_content),
+                    extra_instructions,
+                )
+
+            PromptComposer._fit(sections, budget)
+            prompt = PromptComposer._render(sections)
+            return ComposedPrompt(prompt, budget, estimate_tokens(prompt), sections, document_sections)
+
+    @staticmethod
+    def load_practices(practice_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Look practices up once, e.g. for several prompts composed from the same selection"""
+        practices = {}
+        for practice_id in practice_ids:
+            practice = practices_registry.get(practice_id)
+            if practice:
+                practices[practice_id] = practice
+        return practices
+
+    @staticmethod
+    def _collect(
+        document_content: str,
+        snippet_ids: List[str],
+        practice_ids: List[str],
+        extra_instructions: Optional[str],
+        practices: Dict[str, Dict[str, Any]],
+    ) -> List[PromptSection]:
+        sections = [PromptSection(SECTION_TEMPLATES["document"], "document", document_content)]
+        for snippet_id in snippet_ids:
+            if snippet_id in SNIPPETS:
+                snippet = SNIPPETS[snippet_id]
+                sections.append(PromptSection(
+                    SECTION_TEMPLATES["snippet"], f"snippet:{snippet_id}", snippet['content'], snippet['title']
+                ))
+        for practice_id in practice_ids:
+            practice = practices.get(practice_id)
+            if practice:
+                sections.append(PromptSection(
+                    SECTION_TEMPLATES["practice"], f"practice:{practice_id}", practice['content'], practice['title']
+                ))
+        if extra_instructions:
+            sections.append(PromptSection(SECTION_TEMPLATES["extra"], "extra_instructions", extra_instructions))
+        sections.append(PromptSection(SECTION_TEMPLATES["output"], "output_requirements", OUTPUT_REQUIREMENTS))
+        return sections
+
+    @staticmethod
+    def _select_document_sections(
+        sections: List[PromptSection],
+        budget: int,
+        top_k: int,
+        index: SectionIndex,
+        extra_instructions: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        """
+        Replace the document body with its `top_k` best-scoring sections that
+        fit what the other sections leave of the budget, in document order.
+
+        Sections not matching the query at all are never picked, unless none
+        match: then the document's first sections are used. Gaps are marked.
+        """
+        document, others = sections[0], sections[1:]
+        content = document.body
+        query = section_query([s.body for s in others if s.template.kind in ("snippet", "practice")], extra_instructions)
+        scores = index.scores(query)
+        ranked = sorted(
+            (number for number, score in enumerate(scores) if score > 0), key=lambda number: (-scores[number], number)
+        ) or list(range(len(index.sections)))
+
+        # At least the document's minimum share, even if snippets and practices must then be cut
+        available = max(
+            budget - sum(s.tokens for s in others) - PromptComposer._heading_tokens(sections) - 2,
+            PromptComposer._document_floor(sections, budget),
+        )
+        marker_tokens = estimate_tokens(SECTIONS_OMITTED_MARKER.format(count=len(index.sections)))
+        chosen: Dict[int, str] = {}
+        used = 0
+        for number in ranked:
+            if len(chosen) >= top_k:
+                break
+            text = index.sections[number].text(content)
+            cost = estimate_tokens(text) + 1 + marker_tokens
+            if used + cost > available:
+                continue  # a smaller, lower-ranked section may still fit
+            chosen[number] = text
+            used += cost
+
+        parts: List[str] = []
+        previous = -1
+        for number in sorted(chosen):
+            if number > previous + 1:
+                parts.append(SECTIONS_OMITTED_MARKER.format(count=number - previous - 1))
+            parts.append(chosen[number])
+            previous = number
+        if previous < len(index.sections) - 1:
+            parts.append(SECTIONS_OMITTED_MARKER.format(count=len(index.sections) - 1 - previous))
+
+        document.body = "\n".join(parts)
+        document.tokens = PromptComposer._section_tokens(document)
+        document.truncated = len(chosen) < len(index.sections)
+        return [
+            {
+                "title": index.sections[number].title,
+                "score": round(scores[number], 3),
+                "tokens": estimate_tokens(chosen[number]),
+            }
+            for number in sorted(chosen)
+        ]
+
+    @staticmethod
+    def _section_tokens(section: PromptSection) -> int:
+        return sum(estimate_tokens(line) + 1 for line in section.lines())  # +1 per newline
+
+    @staticmethod
+    def _heading_tokens(sections: List[PromptSection]) -> int:
+        kinds = {section.template.kind for section in sections if not section.dropped}
+        return sum(estimate_tokens(SECTION_TEMPLATES[kind].heading) + 1 for kind in kinds)
+
+    @staticmethod
+    def _document_floor(sections: List[PromptSection], budget: int) -> int:
+        """Tokens the document keeps under any budget: PROMPT_MIN_DOCUMENT_SHARE of what the required sections leave"""
+        required = sum(s.tokens for s in sections if s.template.required)
+        room = budget - required - PromptComposer._heading_tokens(sections)
+        return max(int(room * settings.PROMPT_MIN_DOCUMENT_SHARE), settings.PROMPT_MIN_SECTION_TOKENS, 1)
+
+    @staticmethod
+    def _fit(sections: List[PromptSection], budget: int) -> None:
+        """
+        Cut sections until the estimate fits the budget: first the document
+        down to its minimum share (it is usually what overflows), then the
+        other optional sections, lowest priority first, then the document
+        below its share. The document is truncated but never dropped: the
+        model would generate code without the spec.
+        """
+        def overflow() -> int:
+            used = sum(s.tokens for s in sections if not s.dropped) + PromptComposer._heading_tokens(sections)
+            return used - budget
+
+        excess = overflow()
+        if excess <= 0:
+            return
+        documents = [s for s in sections if s.template.kind == "document"]
+        document_tokens = sum(s.tokens for s in documents)
+        if documents:
+            floor = min(PromptComposer._document_floor(sections, budget), document_tokens)
+            document_tokens = max(document_tokens - excess, floor)
+
+        def document_cut() -> int:
+            return sum(s.tokens for s in documents) - document_tokens
+
+        cuttable = sorted(
+            (s for s in sections if not s.template.required and s.template.kind != "document"),
+            key=lambda s: s.template.priority
+        )
+        for section in cuttable:
+            excess = overflow() - document_cut()
+            if excess <= 0:
+                break
+            PromptComposer._shrink(section, section.tokens - excess)
+
+        min_tokens = max(settings.PROMPT_MIN_SECTION_TOKENS, 1)
+        for document in documents:
+            keep_tokens = max(document_tokens - max(overflow() - document_cut(), 0), min_tokens)
+            if keep_tokens < document.tokens:
+                PromptComposer._shrink(document, keep_tokens, can_drop=False)
+
+    @staticmethod
+    def _shrink(section: PromptSection, keep_tokens: int, can_drop: bool = True) -> None:
+        # Too little would be left to be useful: drop the whole section
+        if keep_tokens < max(settings.PROMPT_MIN_SECTION_TOKENS, 1) and can_drop:
+            section.dropped = True
+            section.tokens = 0
+            return
+        section.body = PromptComposer._truncate(section, keep_tokens)
+        section.truncated = True
+        section.tokens = PromptComposer._section_tokens(section)
+
+    @staticmethod
+    def _truncate(section: PromptSection, keep_tokens: int) -> str:
+        body = section.body
+        chars_per_token = settings.PROMPT_CHARS_PER_TOKEN
+        omitted_tokens = max(section.original_tokens - keep_tokens, 0)
+        marker = OMITTED_MARKER.format(tokens=omitted_tokens)
+        overhead = section.tokens - estimate_tokens(body)  # title and newlines
+        keep_chars = max(int((keep_tokens - overhead - estimate_tokens(marker)) * chars_per_token), 0)
+
+        if section.template.strategy == KEEP_HEAD_TAIL:
+            head_chars = keep_chars * 3 // 4
+            tail_chars = keep_chars - head_chars
+            head = PromptComposer._cut_at_line(body, head_chars)
+            tail = body[len(body) - tail_chars:] if tail_chars else ""
+            return head + marker + tail
+        return PromptComposer._cut_at_line(body, keep_chars) + marker
+
+    @staticmethod
+    def _cut_at_line(text: str, limit: int) -> str:
+        """Prefix of at most `limit` chars, ending at a line break when one is close"""
+        if limit <= 0:
+            return ""
+        newline = text.rfind("\n", max(limit - 200, 0), limit)
+        return text[:newline] if newline > 0 else text[:limit]
+
+    @staticmethod
+    def _render(sections: List[PromptSection]) -> str:
+        parts: List[str] = []
+        for kind in SECTION_ORDER:
+            group = [s for s in sections if s.template.kind == kind and not s.dropped]
+            if not group:
+                continue
+            parts.append(SECTION_TEMPLATES[kind].heading)
+            for section in group:
+                parts.extend(section.lines())
+        return "\n".join(parts)
@@ -0,0 +1,400 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from ..config import settings
+from .metrics import ADMISSION_WAIT, RATE_LIMIT_REJECTIONS
+from .redis_client import RedisClient, RedisError
+
+# Redis backend: optimistic-transaction retries per token, and the poll interval for a free slot
+REDIS_WATCH_RETRIES = 5
+REDIS_SLOT_POLL_SECONDS = 0.05
+# Scope key where batch handlers leave their admissions for RateLimitMiddleware to release
+ADMISSIONS_SCOPE_KEY = "rate_limit.admissions"
+
+
+@dataclass(frozen=True)
+class RouteLimit:
+    """
+    Limits one client gets on a group of routes: a token bucket refilled at
+    `rate` requests per second holding up to `burst`, and at most
+    `concurrency` requests in progress (0 disables either).
+    """
+    name: str
+    rate: float = 0.0
+    burst: int = 1
+    concurrency: int = 0
+
+
+class RateLimited(Exception):
+    def __init__(self, limit: RouteLimit, reason: str, retry_after: float):
+        super().__init__(f"Rate limit '{limit.name}' exceeded ({reason})")
+        self.limit = limit
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_seconds(self) -> int:
+        """Retry-After header value: whole seconds, at least 1"""
+        return max(math.ceil(self.retry_after), 1)
+
+    @property
+    def detail(self) -> str:
+        return f"Too many requests ({self.reason} limit), retry in {self.retry_after_seconds}s"
+
+
+@dataclass
+class Admission:
+    """A request let through; release() frees its concurrency slots"""
+    slot_key: Optional[str] = None
+    token: Optional[str] = None
+    slots: int = 0
+
+
+class MemoryRateLimitBackend:
+    """Per-process state: limits hold per worker"""
+
+    def __init__(self):
+        self._tats: Dict[str, float] = {}  # theoretical arrival time per bucket (GCRA)
+        self._slots: Dict[str, int] = {}
+        self._released: Dict[str, asyncio.Event] = {}
+
+    async def reserve(self, key: str, rate: float, burst: int, max_wait: float, cost: int = 1) -> Tuple[bool, float]:
+        """
+        Take `cost` tokens, possibly ones only available `wait` seconds from
+        now (up to `max_wait`). Returns (granted, wait); when not granted, the
+        wait is how long until the tokens would be available.
+        """
+        now = time.monotonic()
+        if len(self._tats) > 10_000:
+            # Buckets that have refilled completely carry no state
+            self._tats = {k: tat for k, tat in self._tats.items() if tat > now}
+        interval = 1 / rate
+        tat = max(self._tats.get(key, now), now)
+        wait = tat - now - (burst - cost) * interval
+        if wait > max_wait:
+            return False, wait
+        self._tats[key] = tat + cost * interval
+        return True, max(wait, 0.0)
+
+    async def acquire_slot(self, key: str, token: str, limit: int, count: int = 1) -> bool:
+        if self._slots.get(key, 0) + count > limit:
+            return False
+        self._slots[key] = self._slots.get(key, 0) + count
+        return True
+
+    async def release_slot(self, key: str, token: str, count: int = 1) -> None:
+        remaining = self._slots.get(key, count) - count
+        if remaining > 0:
+            self._slots[key] = remaining
+        else:
+            self._slots.pop(key, None)
+        released = self._released.pop(key, None)
+        if released is not None:
+            released.set()
+
+    async def wait_for_release(self, key: str, timeout: float) -> None:
+        released = self._released.setdefault(key, asyncio.Event())
+        try:
+            await asyncio.wait_for(released.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+class RedisRateLimitBackend:
+    """
+    State in Redis, shared by every worker (and host) using the same server.
+
+    Buckets are stored as GCRA timestamps updated under WATCH / MULTI; slots
+    are sorted-set members scored by lease expiry, so slots of a crashed
+    worker free themselves after RATE_LIMIT_SLOT_LEASE_SECONDS. Timestamps
+    are wall-clock: hosts sharing a server need synchronized clocks.
+    """
+
+    def __init__(self, client: RedisClient, lease_seconds: float, prefix: str = "ratelimit:"):
+        self.client = client
+        self.lease_seconds = lease_seconds
+        self.prefix = prefix
+
+    async def reserve(self, key: str, rate: float, burst: int, max_wait: float, cost: int = 1) -> Tuple[bool, float]:
+        key = f"{self.prefix}bucket:{key}"
+        interval = 1 / rate
+        async with self.client.connection() as connection:
+            for _ in range(REDIS_WATCH_RETRIES):
+                now = time.time()
+                _, stored = await connection.pipeline(("WATCH", key), ("GET", key))
+                tat = max(float(stored), now) if stored is not None else now
+                wait = tat - now - (burst - cost) * interval
+                if wait > max_wait:
+                    await connection.execute("UNWATCH")
+                    return False, wait
+                # Kept until the bucket is full again
+                ttl_ms = math.ceil((tat + cost * interval - now) * 1000) + 1000
+                *_, committed = await connection.pipeline(
+                    ("MULTI",), ("SET", key, repr(tat + cost * interval), "PX", ttl_ms), ("EXEC",)
+                )
+                if isinstance(committed, RedisError):
+                    raise committed
+                if committed is not None:
+                    return True, max(wait, 0.0)
+        # Other requests of the same client kept winning the race
+        return False, interval
+
+    @staticmethod
+    def _members(token: str, count: int) -> List[str]:
+        return [token] if count == 1 else [f"{token}:{i}" for i in range(count)]
+
+    async def acquire_slot(self, key: str, token: str, limit: int, count: int = 1) -> bool:
+        key = f"{self.prefix}slots:{key}"
+        now = time.time()
+        members = self._members(token, count)
+        expiry = repr(now + self.lease_seconds)
+        async with self.client.connection() as connection:
+            *_, replies = await connection.pipeline(
+                ("MULTI",),
+                ("ZREMRANGEBYSCORE", key, "-inf", repr(now)),
+                ("ZADD", key, *(part for member in members for part in (expiry, member))),
+                *(("ZRANK", key, member) for member in members),
+                ("PEXPIRE", key, math.ceil(self.lease_seconds * 1000)),
+                ("EXEC",),
+            )
+            if isinstance(replies, RedisError):
+                raise replies
+            # Earlier arrivals rank first
+            if max(replies[2:2 + count]) < limit:
+                return True
+            await connection.execute("ZREM", key, *members)
+            return False
+
+    async def release_slot(self, key: str, token: str, count: int = 1) -> None:
+        await self.client.execute("ZREM", f"{self.prefix}slots:{key}", *self._members(token, count))
+
+    async def wait_for_release(self, key: str, timeout: float) -> None:
+        await asyncio.sleep(min(REDIS_SLOT_POLL_SECONDS, timeout))
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class RateLimiter:
+    """
+    Admission control per client on the routes listed in RATE_LIMIT_ROUTES.
+
+    A request first takes a token from its client's bucket (waiting for one
+    if it comes within RATE_LIMIT_MAX_WAIT_SECONDS), then a concurrency slot
+    (queued with at most RATE_LIMIT_MAX_WAITING others of the same client
+    for the rest of that time). Anything beyond is shed with RateLimited, so
+    a client over its share gets a fast 429 instead of a slow answer, and
+    cannot hold the generation slots and parse workers everyone shares.
+
+    If the backend is unreachable, requests are let through.
+    """
+
+    def __init__(
+        self,
+        backend,
+        routes: Dict[str, RouteLimit],
+        max_wait: float,
+        max_waiting: int,
+        client_header: Optional[str] = None,
+        trust_forwarded_for: bool = False,
+        batch_routes: Optional[Dict[str, RouteLimit]] = None,
+    ):
+        self.backend = backend
+        self.routes = routes
+        self.batch_routes = batch_routes or {}
+        self.max_wait = max_wait
+        self.max_waiting = max_waiting
+        self.client_header = client_header.lower().encode() if client_header else None
+        self.trust_forwarded_for = trust_forwarded_for
+        self._waiting: Dict[str, int] = {}
+
+    def limit_for(self, path: str) -> Optional[RouteLimit]:
+        return self.routes.get(path.rstrip("/") or "/")
+
+    def batch_limit_for(self, path: str) -> Optional[RouteLimit]:
+        """Limit a batch route's handler charges per item (see RATE_LIMIT_BATCH_ROUTES)"""
+        return self.batch_routes.get(path.rstrip("/") or "/")
+
+    def client_key(self, scope) -> str:
+        """API key (hashed, never stored as sent) if the client sends one, else its address"""
+        headers = dict(scope.get("headers") or [])
+        if self.client_header and headers.get(self.client_header):
+            return "key:" + hashlib.sha256(headers[self.client_header]).hexdigest()[:32]
+        if self.trust_forwarded_for and headers.get(b"x-forwarded-for"):
+            return "ip:" + headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def acquire(self, limit: RouteLimit, client: str, cost: int = 1) -> Admission:
+        """
+        Admit a request worth `cost` single requests (e.g. a batch of
+        generations): it takes `cost` tokens and up to `cost` concurrency
+        slots, at most the whole limit; Admission.slots says how many.
+        """
+        key = f"{limit.name}:{client}"
+        started = time.monotonic()
+        try:
+            admission = await self._acquire(limit, key, started + self.max_wait, max(cost, 1))
+        except RateLimited as e:
+            RATE_LIMIT_REJECTIONS.inc(limit=limit.name, reason=e.reason)
+            raise
+        except (OSError, RedisError, asyncio.TimeoutError) as e:
+            logging.warning(f"[RateLimit] Backend indisponível, requisição admitida sem limite: {e}")
+            return Admission()
+        ADMISSION_WAIT.observe(time.monotonic() - started, limit=limit.name)
+        return admission
+
+    async def _acquire(self, limit: RouteLimit, key: str, deadline: float, cost: int) -> Admission:
+        if limit.rate > 0:
+            granted, wait = await self.backend.reserve(key, limit.rate, limit.burst, self.max_wait, cost)
+            if not granted:
+                raise RateLimited(limit, "rate", wait)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        if limit.concurrency <= 0:
+            return Admission()
+
+        token = uuid.uuid4().hex
+        slots = min(cost, limit.concurrency)
+        if await self.backend.acquire_slot(key, token, limit.concurrency, slots):
+            return Admission(key, token, slots)
+        if self._waiting.get(key, 0) >= self.max_waiting:
+            raise RateLimited(limit, "concurrency", self.max_wait)
+        self._waiting[key] = self._waiting.get(key, 0) + 1
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RateLimited(limit, "concurrency", self.max_wait)
+                await self.backend.wait_for_release(key, remaining)
+                if await self.backend.acquire_slot(key, token, limit.concurrency, slots):
+                    return Admission(key, token, slots)
+        finally:
+            self._waiting[key] -= 1
+            if not self._waiting[key]:
+                del self._waiting[key]
+
+    async def release(self, admission: Admission) -> None:
+        if admission.slot_key is None:
+            return
+        try:
+            await self.backend.release_slot(admission.slot_key, admission.token, admission.slots)
+        except (OSError, RedisError, asyncio.TimeoutError) as e:
+            # The lease frees the slot eventually
+            logging.warning(f"[RateLimit] Falha ao liberar slot: {e}")
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+
+def create_rate_limiter() -> Optional[RateLimiter]:
+    """RateLimiter from settings; None when RATE_LIMIT_ENABLED is off"""
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if not settings.RATE_LIMIT_REDIS_URL:
+            raise ValueError("RATE_LIMIT_BACKEND=redis requires RATE_LIMIT_REDIS_URL")
+        backend = RedisRateLimitBackend(
+            RedisClient(settings.RATE_LIMIT_REDIS_URL, timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS),
+            settings.RATE_LIMIT_SLOT_LEASE_SECONDS,
+        )
+    elif settings.RATE_LIMIT_BACKEND == "memory":
+        backend = MemoryRateLimitBackend()
+    else:
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {settings.RATE_LIMIT_BACKEND}")
+
+    limits = {
+        name: RouteLimit(
+            name,
+            rate=float(limit.get("rate", 0)),
+            burst=max(int(limit.get("burst", 1)), 1),
+            concurrency=int(limit.get("concurrency", 0)),
+        )
+        for name, limit in settings.RATE_LIMITS.items()
+    }
+    routes = {path.rstrip("/"): limits[name] for path, name in settings.RATE_LIMIT_ROUTES.items()}
+    batch_routes = {path.rstrip("/"): limits[name] for path, name in settings.RATE_LIMIT_BATCH_ROUTES.items()}
+    return RateLimiter(
+        backend,
+        routes,
+        max_wait=settings.RATE_LIMIT_MAX_WAIT_SECONDS,
+        max_waiting=settings.RATE_LIMIT_MAX_WAITING,
+        client_header=settings.RATE_LIMIT_CLIENT_HEADER,
+        trust_forwarded_for=settings.RATE_LIMIT_TRUST_FORWARDED_FOR,
+        batch_routes=batch_routes,
+    )
+
+
+async def admit_batch(scope, items: int) -> Admission:
+    """
+    Charge a request on a RATE_LIMIT_BATCH_ROUTES route as `items` requests,
+    from its handler once the item count is known (raises RateLimited).
+    RateLimitMiddleware releases the slots when the response is over.
+    """
+    limiter = getattr(scope["app"].state, "rate_limiter", None)
+    admissions = scope.get(ADMISSIONS_SCOPE_KEY)
+    limit = limiter.batch_limit_for(scope["path"]) if limiter is not None else None
+    if limit is None or admissions is None:
+        return Admission()
+    admission = await limiter.acquire(limit, limiter.client_key(scope), cost=items)
+    admissions.append(admission)
+    return admission
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware applying app.state.rate_limiter (set up in the
+    lifespan). The concurrency slot is held until the last body chunk is
+    sent, so streamed generations count for their whole duration. Batch
+    routes are charged by their handler (admit_batch) and released here.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        limiter = getattr(scope["app"].state, "rate_limiter", None) if scope["type"] == "http" else None
+        limit = limiter.limit_for(scope["path"]) if limiter is not None else None
+        if limit is None:
+            if limiter is None or limiter.batch_limit_for(scope["path"]) is None:
+                await self.app(scope, receive, send)
+                return
+            admissions = []
+            try:
+                await self.app({**scope, ADMISSIONS_SCOPE_KEY: admissions}, receive, send)
+            finally:
+                for admission in admissions:
+                    await limiter.release(admission)
+            return
+
+        try:
+            admission = await limiter.acquire(limit, limiter.client_key(scope))
+        except RateLimited as e:
+            retry_after = e.retry_after_seconds
+            body = json.dumps({"detail": e.detail}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await limiter.release(admission)
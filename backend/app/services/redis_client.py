@@ -0,0 +1,122 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Sequence
+from urllib.parse import unquote, urlsplit
+
+
+class RedisError(Exception):
+    """Error reply from the server, or a broken connection"""
+
+
+class RedisConnection:
+    """One RESP2 connection; commands are sent and answered in order, each round trip within `timeout`"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, timeout: float):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+
+    @staticmethod
+    def encode(args: Sequence[Any]) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    async def read_reply(self) -> Any:
+        """Error replies inside arrays (EXEC) come back as RedisError values, not raised"""
+        line = await self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise RedisError("Connection closed")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            return RedisError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            return (await self.reader.readexactly(length + 2))[:-2]
+        if kind == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [await self.read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    async def pipeline(self, *commands: Sequence[Any]) -> List[Any]:
+        """Send all commands in one write, then read every reply (asyncio.TimeoutError past `timeout`)"""
+        return await asyncio.wait_for(self._round_trip(commands), self.timeout)
+
+    async def _round_trip(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        self.writer.write(b"".join(self.encode(command) for command in commands))
+        await self.writer.drain()
+        return [await self.read_reply() for _ in commands]
+
+    async def execute(self, *args: Any) -> Any:
+        reply = (await self.pipeline(args))[0]
+        if isinstance(reply, RedisError):
+            raise reply
+        return reply
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class RedisClient:
+    """
+    Minimal asyncio Redis client: the handful of commands the rate limiter
+    needs, over a small pool of connections (redis://[:password@]host[:port][/db]).
+
+    Connections belong to the event loop that opened them.
+    """
+
+    def __init__(self, url: str, max_connections: int = 10, timeout: float = 1.0):
+        parts = urlsplit(url)
+        if parts.scheme != "redis":
+            raise ValueError(f"Unsupported Redis URL: {url}")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._idle: List[RedisConnection] = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def _connect(self) -> RedisConnection:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        connection = RedisConnection(reader, writer, self.timeout)
+        if self.password:
+            await connection.execute("AUTH", self.password)
+        if self.db:
+            await connection.execute("SELECT", self.db)
+        return connection
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[RedisConnection]:
+        """A connection for exclusive use (WATCH / MULTI state is per connection)"""
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            try:
+                if connection is None:
+                    connection = await asyncio.wait_for(self._connect(), self.timeout)
+                yield connection
+            except BaseException:
+                # Unknown protocol state: never reuse it
+                if connection is not None:
+                    connection.close()
+                raise
+            self._idle.append(connection)
+
+    async def execute(self, *args: Any) -> Any:
+        async with self.connection() as connection:
+            return await connection.execute(*args)
+
+    async def aclose(self) -> None:
+        while self._idle:
+            self._idle.pop().close()
+
@@ -0,0 +1,272 @@
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+# A file path: optional directories plus a name with an extension, or a well-known extensionless file
+_PATH_PATTERN = re.compile(
+    r"^(?:[\w.\-]+/)*(?:[\w.\-]*\w\.[A-Za-z0-9]+|Dockerfile|Makefile|Procfile)$"
+)
+_HEADER_STRIP = "`*_#:>\"' "
+
+
+def extract_path(text: str) -> Optional[str]:
+    """Find a file path in a fence info string or the markdown line above a block"""
+    for token in reversed(text.split()):
+        candidate = token.strip(_HEADER_STRIP)
+        if candidate.startswith("path="):
+            candidate = candidate[len("path="):].strip(_HEADER_STRIP)
+        if candidate and _PATH_PATTERN.match(candidate):
+            return candidate
+    return None
+
+
+class FencedBlockExtractor:
+    """
+    Incrementally extract files from fenced code blocks as each block closes.
+
+    Feed raw model output in arbitrary chunks; every call returns the files
+    whose closing fence arrived in that chunk. Work is linear in the input.
+    A block is a file when its info string or the line above it names a
+    path; a ```json block with a "files" list yields each listed file.
+    """
+
+    def __init__(self):
+        self._partial: List[str] = []
+        self._in_block = False
+        self._info = ""
+        self._header = ""
+        self._block_lines: List[str] = []
+        self._last_text_line = ""
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        parts = chunk.split("\n")
+        if len(parts) == 1:
+            self._partial.append(chunk)
+            return []
+
+        parts[0] = "".join(self._partial) + parts[0]
+        self._partial = [parts[-1]]
+
+        files: List[Dict[str, Any]] = []
+        for line in parts[:-1]:
+            files.extend(self._process_line(line))
+        return files
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Flush the trailing line; an unterminated block is discarded"""
+        tail = "".join(self._partial)
+        self._partial = []
+        return self._process_line(tail) if tail else []
+
+    def _process_line(self, line: str) -> List[Dict[str, Any]]:
+        stripped = line.strip()
+
+        if not self._in_block:
+            if stripped.startswith("```"):
+                self._in_block = True
+                self._info = stripped[3:].strip()
+                self._header = self._last_text_line
+                self._block_lines = []
+            elif stripped:
+                self._last_text_line = stripped
+            return []
+
+        if stripped == "```":
+            self._in_block = False
+            self._last_text_line = ""
+            return self._build_files("\n".join(self._block_lines))
+
+        self._block_lines.append(line)
+        return []
+
+    def _build_files(self, content: str) -> List[Dict[str, Any]]:
+        info_tokens = self._info.split()
+        language = info_tokens[0].lower() if info_tokens else ""
+        path = extract_path(self._info) or extract_path(self._header)
+
+        if language == "json" and not path:
+            return _listed_files(_load_json_object(content))
+
+        if not path:
+            return []
+        return [{"path": path, "content": content}]
+
+
+class JsonObjectScanner:
+    """
+    Find the first balanced top-level {...} object in text fed line by line.
+
+    Braces are matched outside JSON strings only. Runs of braces and whole
+    strings are consumed by single regex matches, so the scan stays linear
+    and mostly in C. JSON strings cannot span lines: a quote left open at the
+    end of a line abandons that candidate instead of swallowing the rest of
+    the response.
+    """
+
+    _STRUCTURE = re.compile(r'\{+|\}+|"')
+    _STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+
+    def __init__(self, required_key: Optional[str] = None):
+        self.required_key = required_key
+        self.result: Optional[Dict[str, Any]] = None
+        self._depth = 0
+        self._pieces: List[str] = []
+
+    def reset(self) -> None:
+        """Drop the candidate in progress (e.g. at a code fence)"""
+        self._depth = 0
+        self._pieces = []
+
+    def feed_line(self, line: str) -> None:
+        if self.result is not None:
+            return
+
+        pos = start = 0
+        while True:
+            if self._depth == 0:
+                pos = line.find("{", pos)
+                if pos < 0:
+                    return
+                start, self._pieces = pos, []
+
+            match = self._STRUCTURE.search(line, pos)
+            if match is None:
+                break
+            first, run = match.start(), match.end() - match.start()
+            if line[first] == '"':
+                string = self._STRING.match(line, first)
+                if string is None:
+                    self.reset()  # unterminated string: not JSON
+                    return
+                pos = string.end()
+            elif line[first] == "{":
+                self._depth += run
+                pos = match.end()
+            elif run < self._depth:
+                self._depth -= run
+                pos = match.end()
+            else:
+                pos = first + self._depth
+                self._depth = 0
+                self._try_candidate("\n".join(self._pieces + [line[start:pos]]))
+                if self.result is not None:
+                    return
+
+        self._pieces.append(line[start:])
+
+    def _try_candidate(self, candidate: str) -> None:
+        self._pieces = []
+        if self.required_key and f'"{self.required_key}"' not in candidate:
+            return  # cheap pre-check before a full parse
+        data = _load_json_object(candidate)
+        if data is not None and (not self.required_key or self.required_key in data):
+            self.result = data
+
+
+def _load_json_object(text: str) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _listed_files(data: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The well-formed entries of a {"files": [...]} payload"""
+    files = data.get("files") if data is not None else None
+    if not isinstance(files, list):
+        return []
+    return [f for f in files if isinstance(f, dict) and "path" in f and "content" in f]
+
+
+class ResponseParser(FencedBlockExtractor):
+    """
+    Single-pass parser for a model response, whole or streamed in chunks.
+
+    feed() returns files as their fenced blocks close (as FencedBlockExtractor
+    does); result() then builds the generation payload from, in order:
+    a ```json block holding {"files": [...]}, the first balanced object with
+    a "files" key in the text outside code blocks, or the fenced blocks that
+    name a file path. Instructions not given in the JSON are the text outside
+    code blocks.
+    """
+
+    PARSE_ERROR = "Não foi possível interpretar a resposta da Gemini."
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[str] = []
+        self._outside_lines: List[str] = []
+        self._fenced_files: List[Dict[str, Any]] = []
+        self._block_data: Optional[Dict[str, Any]] = None
+        self._scanner = JsonObjectScanner(required_key="files")
+
+    @classmethod
+    def parse(cls, text: str) -> Dict[str, Any]:
+        parser = cls()
+        parser.feed(text)
+        parser.close()
+        return parser.result()
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self._chunks.append(chunk)
+        return super().feed(chunk)
+
+    def close(self) -> List[Dict[str, Any]]:
+        files = super().close()
+        if self._in_block:
+            # Truncated response: an unterminated block can still hold the JSON payload
+            self._capture_block_data("\n".join(self._block_lines))
+        return files
+
+    def _process_line(self, line: str) -> List[Dict[str, Any]]:
+        if line.strip().startswith("```"):
+            self._scanner.reset()
+        elif not self._in_block:
+            self._outside_lines.append(line)
+            self._scanner.feed_line(line)
+        return super()._process_line(line)
+
+    def _build_files(self, content: str) -> List[Dict[str, Any]]:
+        language = (self._info.split() or [""])[0].lower()
+        if language not in ("json", "") or extract_path(self._info) or extract_path(self._header):
+            files = super()._build_files(content)
+            self._fenced_files.extend(files)
+            return files
+
+        # ```json (or a bare ```) block: parsed once, both for the stream and for result()
+        data = self._capture_block_data(content)
+        return _listed_files(data) if language == "json" else []
+
+    def _capture_block_data(self, content: str) -> Optional[Dict[str, Any]]:
+        if not content.lstrip().startswith("{"):
+            return None
+        data = _load_json_object(content)
+        if self._block_data is None and data is not None and "files" in data:
+            self._block_data = data
+        return data
+
+    def result(self) -> Dict[str, Any]:
+        text = "".join(self._chunks)
+        outside_text = "\n".join(self._outside_lines).strip()
+        data = self._block_data if self._block_data is not None else self._scanner.result
+
+        instructions = None
+        if data is not None:
+            files = data.get("files", [])
+            instructions = data.get("instructions")
+            logging.info(f"Arquivos retornados: {len(files) if isinstance(files, list) else files}")
+            if not isinstance(files, list):
+                logging.error(f"Formato inesperado de arquivos: {type(files).__name__}")
+                files = []
+            valid_files = [f for f in files if isinstance(f, dict) and "path" in f and "content" in f]
+            if valid_files:
+                return {"files": valid_files, "raw_text": text, "instructions": instructions or outside_text}
+            logging.error("Nenhum arquivo válido encontrado no JSON da resposta")
+
+        if self._fenced_files:
+            return {"files": self._fenced_files, "raw_text": text, "instructions": instructions or outside_text}
+        if data is not None:
+            return {"files": [], "raw_text": text, "instructions": instructions or outside_text}
+        return {"files": [], "raw_text": text, "instructions": outside_text, "error": self.PARSE_ERROR}
@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from typing import List
+
+from sqlalchemy import Table, literal_column, select, text
+from sqlalchemy.sql.elements import ColumnElement
+
+# Postgres text search configuration: no stemming, specs mix Portuguese and English
+TSVECTOR_CONFIG = "simple"
+# Postgres caps a tsvector at 1 MB; only the start of very large documents is indexed there
+TSVECTOR_MAX_CHARS = 500_000
+
+
+@dataclass(frozen=True)
+class SearchTarget:
+    """A text column with a full-text index: FTS5 table + triggers on SQLite, GIN index on Postgres"""
+    table: str
+    column: str
+
+    @property
+    def fts_table(self) -> str:
+        return f"{self.table}_fts"
+
+    @property
+    def tsvector(self) -> str:
+        return (
+            f"to_tsvector('{TSVECTOR_CONFIG}', left(coalesce({self.table}.{self.column}, ''), {TSVECTOR_MAX_CHARS}))"
+        )
+
+    def create_ddl(self, dialect: str) -> List[str]:
+        if dialect == "sqlite":
+            fts, table, column = self.fts_table, self.table, self.column
+            # External content: the index stores tokens only, the text stays in `table`;
+            # the triggers update it row by row as rows are written
+            return [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"{column}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END",
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+                f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+                # Index rows written before the triggers existed
+                f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+            ]
+        if dialect == "postgresql":
+            # Expression index: kept current by Postgres itself, matched by match_clause()
+            return [
+                f"CREATE INDEX IF NOT EXISTS ix_{self.table}_{self.column}_fts "
+                f"ON {self.table} USING gin (({self.tsvector}))"
+            ]
+        return []
+
+    def drop_ddl(self, dialect: str) -> List[str]:
+        if dialect == "sqlite":
+            return [f"DROP TRIGGER IF EXISTS {self.fts_table}_{suffix}" for suffix in ("ai", "ad", "au")] + [
+                f"DROP TABLE IF EXISTS {self.fts_table}"
+            ]
+        if dialect == "postgresql":
+            return [f"DROP INDEX IF EXISTS ix_{self.table}_{self.column}_fts"]
+        return []
+
+
+SEARCH_TARGETS = {
+    target.table: target
+    for target in (
+        SearchTarget("documents", "content"),
+        SearchTarget("generated_projects", "prompt"),
+    )
+}
+
+
+def install_search_index(table: Table, connection, **kw) -> None:
+    """after_create hook, so create_all databases (tests, scripts) get the same index as migrations"""
+    for statement in SEARCH_TARGETS[table.name].create_ddl(connection.dialect.name):
+        connection.execute(text(statement))
+
+
+def is_search_table(name: str) -> bool:
+    """FTS5 tables and their shadow tables (documents_fts, documents_fts_data, ...)"""
+    return any(name == t.fts_table or name.startswith(f"{t.fts_table}_") for t in SEARCH_TARGETS.values())
+
+
+def fts5_query(query: str) -> str:
+    """Every word as a quoted phrase (implicit AND): user input never hits FTS5 query syntax"""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+def match_clause(table: Table, query: str, dialect: str) -> ColumnElement:
+    """WHERE clause selecting the rows of `table` that match `query`"""
+    target = SEARCH_TARGETS[table.name]
+    if dialect == "sqlite":
+        fts = target.fts_table
+        matching = (
+            select(literal_column("rowid"))
+            .select_from(text(fts))
+            .where(text(f"{fts} MATCH :search_query").bindparams(search_query=fts5_query(query)))
+        )
+        return table.c.id.in_(matching)
+    if dialect == "postgresql":
+        return text(
+            f"{target.tsvector} @@ websearch_to_tsquery('{TSVECTOR_CONFIG}', :search_query)"
+        ).bindparams(search_query=query)
+    # No full-text index on other backends: plain substring match
+    return table.c[target.column].contains(query)
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import math
+import re
+import unicodedata
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models.models import Document
+
+# BM25 parameters (the usual defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+INDEX_VERSION = 1
+
+_HEADING = re.compile(r"(#{1,6})[ \t]+(.+?)[ \t#]*$")
+_TERM = re.compile(r"[^\W\d_]{2,}")
+_COMBINING_MARKS = re.compile("[\u0300-\u036f]")
+
+# Too common to tell sections apart (English and Portuguese)
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+shall should must can may not all any each every into than then there these those which who when where
+o os as um uma uns umas de do da dos das em no na nos nas por para com sem que se ao aos e ou ser deve
+devem pode podem não nao mais como sua seu suas seus este esta isso todo toda todos todas entre sobre
+""".split())
+
+
+def terms(text: str) -> Counter:
+    """Lowercased, accent-folded word counts; plural -s trimmed, stopwords dropped"""
+    counts = Counter(_TERM.findall(text.lower()))
+    normalized: Counter = Counter()
+    for word, count in counts.items():
+        if not word.isascii():
+            word = _COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", word))
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        if word not in STOPWORDS:
+            normalized[word] += count
+    return normalized
+
+
+@dataclass
+class DocumentSection:
+    """content[start:end]; `heading` is repeated when a long section is split in parts"""
+    title: str
+    start: int
+    end: int
+    length: int = 0  # indexed terms
+    heading: str = ""
+
+    def text(self, content: str) -> str:
+        body = content[self.start:self.end].strip("\n")
+        return f"{self.heading} (cont.)\n{body}" if self.heading else body
+
+
+def split_sections(content: str, max_chars: Optional[int] = None) -> List[DocumentSection]:
+    """
+    Sections at markdown headings (DOCX headings are extracted as such),
+    ignoring fenced code. Text without headings (PDFs, plain text) and
+    sections longer than `max_chars` are split at paragraph breaks.
+    """
+    max_chars = max_chars or int(settings.SECTION_MAX_TOKENS * settings.PROMPT_CHARS_PER_TOKEN)
+    sections: List[DocumentSection] = []
+    title, start, offset, in_fence = "", 0, 0, False
+    for line in content.splitlines(keepends=True):
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_fence = not in_fence
+        elif not in_fence and stripped.startswith("#"):
+            match = _HEADING.match(stripped)
+            if match:
+                if content[start:offset].strip():
+                    sections.append(DocumentSection(title, start, offset))
+                title, start = match.group(2), offset
+        offset += len(line)
+    if content[start:].strip():
+        sections.append(DocumentSection(title, start, len(content)))
+
+    result = []
+    for section in sections:
+        result.extend(_split_long(content, section, max_chars))
+    return result
+
+
+def _split_long(content: str, section: DocumentSection, max_chars: int) -> List[DocumentSection]:
+    if section.end - section.start <= max_chars:
+        return [section]
+    heading_end = content.find("\n", section.start, section.end)
+    heading = content[section.start:heading_end].strip() if section.title and heading_end > 0 else ""
+    parts = []
+    start = section.start
+    while section.end - start > max_chars:
+        limit = start + max_chars
+        cut = content.rfind("\n\n", start + max_chars // 2, limit)
+        if cut < 0:
+            cut = content.rfind("\n", start + max_chars // 2, limit)
+        cut = cut + 1 if cut >= 0 else limit
+        parts.append(DocumentSection(section.title, start, cut))
+        start = cut
+    parts.append(DocumentSection(section.title, start, section.end))
+    for part in parts[1:]:
+        part.heading = heading
+    return parts
+
+
+@dataclass
+class SectionIndex:
+    """
+    BM25 index over the sections of one document.
+
+    Built once at upload (in a parse worker) and stored with the Document
+    row as compressed JSON: section offsets into the content plus postings
+    (term -> [[section, term frequency], ...]), not the text itself.
+    """
+    sections: List[DocumentSection]
+    postings: Dict[str, List[List[int]]] = field(default_factory=dict)
+
+    @staticmethod
+    def build(content: str) -> "SectionIndex":
+        sections = split_sections(content)
+        postings: Dict[str, List[List[int]]] = {}
+        for number, section in enumerate(sections):
+            counts = terms(section.text(content))
+            section.length = sum(counts.values())
+            for term, count in counts.items():
+                postings.setdefault(term, []).append([number, count])
+        return SectionIndex(sections, postings)
+
+    @staticmethod
+    def build_bytes(content: str) -> bytes:
+        """Build and serialize in one call: a picklable unit of work for the parse pool"""
+        return SectionIndex.build(content).to_bytes()
+
+    def to_bytes(self) -> bytes:
+        data = {
+            "version": INDEX_VERSION,
+            "sections": [[s.title, s.start, s.end, s.length, s.heading] for s in self.sections],
+            "postings": self.postings,
+        }
+        return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+    @staticmethod
+    def from_bytes(blob: bytes) -> Optional["SectionIndex"]:
+        """None for an index written by another version (rebuild it)"""
+        data = json.loads(zlib.decompress(blob))
+        if data.get("version") != INDEX_VERSION:
+            return None
+        return SectionIndex([DocumentSection(*section) for section in data["sections"]], data["postings"])
+
+    def scores(self, query: Dict[str, float]) -> List[float]:
+        """BM25 score of every section for weighted query terms"""
+        count = len(self.sections)
+        scores = [0.0] * count
+        if not count:
+            return scores
+        average_length = sum(s.length for s in self.sections) / count or 1.0
+        for term, weight in query.items():
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for number, frequency in postings:
+                length_norm = 1 - BM25_B + BM25_B * self.sections[number].length / average_length
+                scores[number] += weight * idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+        return scores
+
+
+def section_query(context_texts: List[str], extra_instructions: Optional[str]) -> Dict[str, float]:
+    """Query terms from the selected snippets / practices; the extra instructions count double"""
+    query: Dict[str, float] = {term: 1.0 for text in context_texts for term in terms(text)}
+    if extra_instructions:
+        query.update((term, 2.0) for term in terms(extra_instructions))
+    return query
+
+
+async def load_section_index(db: AsyncSession, document: Document) -> SectionIndex:
+    """The document's stored index; built and stored on first use for documents that predate it"""
+    if document.section_index is not None:
+        index = await asyncio.to_thread(SectionIndex.from_bytes, document.section_index)
+        if index is not None:
+            return index
+    index = await asyncio.to_thread(SectionIndex.build, document.content or "")
+    document.section_index = index.to_bytes()
+    await db.commit()
+    return index
@@ -0,0 +1,179 @@
+import json
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError
+
+STRUCTURED_SYSTEM_INSTRUCTION = (
+    "Responda somente com JSON no schema fornecido: `files` com `path` e `content` de cada arquivo "
+    "do projeto (código SEM comentários), `instructions` com as explicações em Markdown e `commands` "
+    "com os comandos de shell para instalar e executar o projeto."
+)
+
+_FILES_ARRAY = re.compile(r'"files"\s*:\s*\[')
+
+
+class GeneratedFile(BaseModel):
+    path: str = Field(min_length=1)
+    content: str
+
+
+# Sent to the model as the response schema (docstring and descriptions included),
+# and what its answer is validated into
+class StructuredProject(BaseModel):
+    """A complete, runnable software project"""
+    files: List[GeneratedFile] = Field(min_length=1, description="Every file of the project")
+    instructions: str = Field(default="", description="Explanations and usage, in Markdown")
+    commands: List[str] = Field(default=[], description="Shell commands to install and run the project")
+
+
+@dataclass
+class StructuredAttempt:
+    """One model answer: validated project, or the complete files salvaged from it plus the errors"""
+    project: Optional[StructuredProject]
+    salvaged: List[GeneratedFile] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+def validate_output(text: str) -> StructuredAttempt:
+    try:
+        return StructuredAttempt(StructuredProject.model_validate_json(text))
+    except ValidationError as e:
+        errors = [
+            f"{'.'.join(str(part) for part in error['loc']) or 'response'}: {error['msg']}"
+            for error in e.errors()[:10]
+        ]
+        return StructuredAttempt(None, salvage_files(text), errors)
+
+
+def salvage_files(text: str) -> List[GeneratedFile]:
+    """The complete, valid entries of the "files" array, even when the JSON was cut off"""
+    match = _FILES_ARRAY.search(text)
+    if match is None:
+        return []
+
+    decoder = json.JSONDecoder()
+    files: List[GeneratedFile] = []
+    pos = match.end()
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text) or text[pos] == "]":
+            return files
+        try:
+            entry, pos = decoder.raw_decode(text, pos)
+        except ValueError:
+            return files  # truncated mid-entry
+        try:
+            files.append(GeneratedFile.model_validate(entry))
+        except ValidationError:
+            continue
+
+
+def repair_prompt(prompt: str, attempt: StructuredAttempt) -> str:
+    """Ask only for what is missing: the salvaged files are listed, not regenerated"""
+    complete = "\n".join(f"- {f.path}" for f in attempt.salvaged) or "- (nenhum)"
+    errors = "\n".join(f"- {error}" for error in attempt.errors)
+    return (
+        f"{prompt}\n\n"
+        "## Correção de resposta parcial\n"
+        "A resposta anterior foi interrompida ou não passou na validação do schema:\n"
+        f"{errors}\n"
+        "Estes arquivos já estão completos e NÃO devem ser repetidos:\n"
+        f"{complete}\n"
+        "Retorne o mesmo JSON apenas com os arquivos que faltam ou estavam inválidos, "
+        "além de `instructions` e `commands` completos."
+    )
+
+
+def merge_repair(
+    attempt: StructuredAttempt, repair: StructuredAttempt
+) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """Combine salvaged files with the repair answer; returns (generated data or None, fully valid)"""
+    files = {f.path: f for f in attempt.salvaged}
+    if repair.project is not None:
+        files.update((f.path, f) for f in repair.project.files)
+    else:
+        files.update((f.path, f) for f in repair.salvaged)
+    if not files:
+        return None, False
+
+    data: Dict[str, Any] = {"files": [f.model_dump() for f in files.values()]}
+    if repair.project is not None:
+        data["instructions"] = repair.project.instructions
+        data["commands"] = repair.project.commands
+    return data, repair.project is not None
+
+
+def token_usage(response) -> Tuple[int, int]:
+    """(prompt tokens, output tokens) reported by the model, 0 when absent"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return 0, 0
+    return usage.prompt_token_count or 0, usage.candidates_token_count or 0
+
+
+class StructuredOutputStats:
+    """
+    Failure rate and token cost of structured generations in this worker.
+
+    A repair resends the prompt but only asks for the missing files; the
+    full regeneration it replaces is estimated at the failed attempt's cost
+    (same prompt, same output size), which gives the tokens saved.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.generations = 0
+            self.valid_first_attempt = 0
+            self.repaired = 0
+            self.failed = 0
+            self.repair_requests = 0
+            self.first_attempt_tokens = 0
+            self.repair_tokens = 0
+            self.regeneration_tokens_avoided = 0
+
+    def record_first_attempt(self, valid: bool, prompt_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            self.generations += 1
+            self.valid_first_attempt += int(valid)
+            self.first_attempt_tokens += prompt_tokens + output_tokens
+
+    def record_repair(self, failed_attempt_tokens: int, prompt_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            self.repair_requests += 1
+            self.repair_tokens += prompt_tokens + output_tokens
+            self.regeneration_tokens_avoided += failed_attempt_tokens
+
+    def record_outcome(self, repaired: bool) -> None:
+        with self._lock:
+            if repaired:
+                self.repaired += 1
+            else:
+                self.failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            invalid = self.generations - self.valid_first_attempt
+            return {
+                "generations": self.generations,
+                "valid_first_attempt": self.valid_first_attempt,
+                "repaired": self.repaired,
+                "failed": self.failed,
+                "first_attempt_failure_rate": round(invalid / self.generations, 4) if self.generations else 0.0,
+                "final_failure_rate": round(self.failed / self.generations, 4) if self.generations else 0.0,
+                "repair_requests": self.repair_requests,
+                "first_attempt_tokens": self.first_attempt_tokens,
+                "repair_tokens": self.repair_tokens,
+                "regeneration_tokens_avoided": self.regeneration_tokens_avoided,
+                "tokens_saved": self.regeneration_tokens_avoided - self.repair_tokens,
+            }
+
+
+structured_stats = StructuredOutputStats()
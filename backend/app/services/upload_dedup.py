@@ -0,0 +1,37 @@
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.models import Document
+
+
+class UploadDeduplicator:
+    """Finds a previously parsed Document with the same raw bytes, counting hits and misses"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    async def find(self, db: AsyncSession, content_sha256: str, file_type: str) -> Optional[Document]:
+        result = await db.execute(
+            select(Document)
+            .where(Document.content_sha256 == content_sha256, Document.file_type == file_type)
+            .order_by(Document.id)
+            .limit(1)
+        )
+        document = result.scalars().first()
+        with self._lock:
+            if document is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return document
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+upload_dedup = UploadDeduplicator()
@@ -0,0 +1,98 @@
+import hashlib
+import tempfile
+from typing import AsyncGenerator, Optional
+
+from starlette.datastructures import Headers
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+# Allowance for multipart boundaries and part headers when checking Content-Length
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLargeError(MultiPartException):
+    """Raised as soon as an uploaded file exceeds the configured limit"""
+
+
+class NamedSpooledTemporaryFile(tempfile.SpooledTemporaryFile):
+    """
+    SpooledTemporaryFile that rolls over to a *named* temporary file.
+
+    Small uploads stay in memory; large ones land on disk under a path that
+    libraries such as PyMuPDF can open directly instead of re-reading the
+    whole upload into memory. Everything written is hashed on the way in.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sha256 = hashlib.sha256()
+
+    def write(self, s):
+        self._sha256.update(s)
+        return super().write(s)
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of the bytes written so far"""
+        return self._sha256.hexdigest()
+
+    def rollover(self):
+        if self._rolled:
+            return
+        memory_file = self._file
+        disk_file = self._file = tempfile.NamedTemporaryFile(**self._TemporaryFileArgs)
+        del self._TemporaryFileArgs
+
+        position = memory_file.tell()
+        with memory_file.getbuffer() as buffer:
+            disk_file.write(buffer)
+        memory_file.close()
+        disk_file.seek(position, 0)
+        self._rolled = True
+
+    @property
+    def path(self) -> Optional[str]:
+        """Filesystem path once rolled over to disk, None while in memory"""
+        return self._file.name if self._rolled else None
+
+
+class SpoolingMultiPartParser(MultiPartParser):
+    """
+    Starlette's streaming multipart parser with a hard cap on file size.
+
+    File parts are written chunk by chunk into NamedSpooledTemporaryFile
+    spools; parsing aborts with UploadTooLargeError the moment the cap is
+    crossed, without buffering the rest of the body.
+    """
+
+    def __init__(
+        self,
+        headers: Headers,
+        stream: AsyncGenerator[bytes, None],
+        *,
+        max_upload_bytes: int,
+        spool_max_size: int,
+        max_files: int = 1,
+        max_fields: int = 10,
+    ):
+        super().__init__(headers, stream, max_files=max_files, max_fields=max_fields)
+        self.max_file_size = spool_max_size
+        self.max_upload_bytes = max_upload_bytes
+        self._file_bytes = 0
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        upload = self._current_part.file
+        if upload is not None:
+            # Swap the stock spool (still empty) for one that rolls over to a named file
+            self._files_to_close_on_error.pop().close()
+            upload.file = NamedSpooledTemporaryFile(max_size=self.max_file_size)
+            self._files_to_close_on_error.append(upload.file)
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._current_part.file is not None:
+            self._file_bytes += end - start
+            if self._file_bytes > self.max_upload_bytes:
+                raise UploadTooLargeError(
+                    f"File exceeds the maximum upload size of {self.max_upload_bytes} bytes"
+                )
+        super().on_part_data(data, start, end)
@@ -0,0 +1 @@
+# Benchmark harness (run from backend/: python -m benchmarks.<name>)
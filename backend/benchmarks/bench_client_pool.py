@@ -0,0 +1,74 @@
+"""
+Per-call overhead of a fresh Gemini client versus the shared pooled client.
+
+Calls GenerativeService directly against a zero-latency stub, so the numbers
+are client construction + connection setup + request, nothing else.
+
+    python -m benchmarks.bench_client_pool --calls 200
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from app.config import settings
+from app.services.gemini_client import GeminiClientProvider
+from app.services.generative import GenerativeService
+
+from .stub_llm import StubLLMServer
+
+
+async def per_call_client(calls: int) -> list:
+    timings = []
+    for i in range(calls):
+        started = time.perf_counter()
+        provider = GeminiClientProvider()
+        await GenerativeService(provider).generate_code_async(f"bench {i}")
+        timings.append(time.perf_counter() - started)
+        await provider.aclose()
+    return timings
+
+
+async def pooled_client(calls: int) -> list:
+    provider = GeminiClientProvider()
+    service = GenerativeService(provider)
+    timings = []
+    for i in range(calls):
+        started = time.perf_counter()
+        await service.generate_code_async(f"bench {i}")
+        timings.append(time.perf_counter() - started)
+    await provider.aclose()
+    return timings
+
+
+def summarize(timings: list) -> dict:
+    timings = sorted(timings)
+    return {
+        "mean_ms": round(statistics.mean(timings) * 1000, 2),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 2),
+        "p95_ms": round(timings[int(len(timings) * 0.95)] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    with StubLLMServer(latency=0) as stub:
+        settings.GEMINI_API_KEY = "bench-key"
+        settings.GEMINI_BASE_URL = stub.base_url
+        # Pay the google.genai import before measuring
+        GeminiClientProvider().get()
+
+        results = {
+            "per_call_client": summarize(asyncio.run(per_call_client(args.calls))),
+            "pooled_client": summarize(asyncio.run(pooled_client(args.calls))),
+        }
+
+    print(json.dumps({"calls": args.calls, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Concurrent /api/generate-code load against a single uvicorn worker.
+
+Starts the stub LLM server and one uvicorn worker (in a scratch directory, so
+the dev database and generated_projects/ are untouched), fires N generations
+at once and probes /health while they are in flight.
+
+    python -m benchmarks.bench_concurrent_generation --requests 50 --latency 1.0
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+import httpx
+
+from .common import free_port, start_backend
+from .stub_llm import StubLLMServer
+
+
+async def run_load(base_url: str, requests: int) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        async def generate(i: int) -> float:
+            started = time.monotonic()
+            response = await client.post("/api/generate-code", json={"prompt": f"bench {i}"})
+            response.raise_for_status()
+            return time.monotonic() - started
+
+        # Warm-up: pays the one-off google.genai import outside the measurement
+        await generate(-1)
+
+        started = time.monotonic()
+        tasks = [asyncio.create_task(generate(i)) for i in range(requests)]
+        await asyncio.sleep(0.1)
+
+        health_started = time.monotonic()
+        await client.get("/health")
+        health_latency = time.monotonic() - health_started
+
+        latencies = sorted(await asyncio.gather(*tasks))
+        elapsed = time.monotonic() - started
+
+    return {
+        "requests": requests,
+        "wall_time_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2),
+        "latency_p50_s": round(latencies[len(latencies) // 2], 3),
+        "latency_max_s": round(latencies[-1], 3),
+        "health_during_load_s": round(health_latency, 4),
+    }
+
+
+def bench(requests: int, latency: float, concurrency: int) -> dict:
+    with StubLLMServer(latency=latency) as stub, tempfile.TemporaryDirectory() as workdir:
+        port = free_port()
+        backend = start_backend(workdir, port, {
+            "GEMINI_API_KEY": "bench-key",
+            "GEMINI_BASE_URL": stub.base_url,
+            "GENERATION_MAX_CONCURRENCY": str(concurrency),
+        })
+        try:
+            result = asyncio.run(run_load(f"http://127.0.0.1:{port}", requests))
+        finally:
+            backend.terminate()
+            backend.wait()
+    result.update({"stub_latency_s": latency, "max_concurrency": concurrency})
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    results = [
+        # Concurrency 1 reproduces the old serialized behaviour
+        bench(args.requests, args.latency, 1),
+        bench(args.requests, args.latency, args.concurrency),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+End-to-end load test: upload -> compose-prompt -> generate-code -> download.
+
+Starts the stub LLM (latency, token rate, answer size and failure rate are
+configurable) and one uvicorn worker in a scratch directory, then runs
+`--users` concurrent virtual users, each going through the whole pipeline
+`--iterations` times with documents from the generated DOCX/PDF/MD corpus.
+Reports p50/p95/p99 latency and throughput per endpoint, prints them and
+saves them as JSON; `--compare` an earlier result file to see the change.
+
+    python -m benchmarks.bench_e2e --users 8 --iterations 5 --latency 1 --tokens-per-second 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from . import input_corpus
+from .common import BACKEND_DIR, free_port, start_backend
+from .stub_llm import StubLLMServer
+
+PIPELINE = "pipeline"
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * fraction // 1))
+    return sorted_values[int(rank) - 1]
+
+
+class LoadRecorder:
+    """Latencies and errors per endpoint ("METHOD /route/template")"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        if ok:
+            self.latencies[endpoint].append(seconds)
+        else:
+            self.errors[endpoint] += 1
+
+    def summary(self, wall_time: float) -> Dict[str, dict]:
+        endpoints = {}
+        for endpoint in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies[endpoint])
+            endpoints[endpoint] = {
+                "requests": len(values) + self.errors[endpoint],
+                "errors": self.errors[endpoint],
+                "throughput_rps": round(len(values) / wall_time, 3) if wall_time else 0.0,
+                "p50_s": round(percentile(values, 0.50), 4),
+                "p95_s": round(percentile(values, 0.95), 4),
+                "p99_s": round(percentile(values, 0.99), 4),
+                "max_s": round(values[-1], 4) if values else 0.0,
+            }
+        return endpoints
+
+
+async def timed(recorder: LoadRecorder, endpoint: str, request) -> Optional[httpx.Response]:
+    started = time.monotonic()
+    try:
+        response = await request
+    except httpx.HTTPError:
+        recorder.record(endpoint, time.monotonic() - started, ok=False)
+        return None
+    recorder.record(endpoint, time.monotonic() - started, ok=response.is_success)
+    return response if response.is_success else None
+
+
+async def pipeline(client: httpx.AsyncClient, recorder: LoadRecorder, document, selection: dict, tag: str) -> bool:
+    upload = await timed(recorder, "POST /api/upload", client.post(
+        "/api/upload", files={"file": (document.filename, document.content, document.mime_type)}
+    ))
+    if upload is None:
+        return False
+    composed = await timed(recorder, "POST /api/compose-prompt", client.post(
+        "/api/compose-prompt", json={"document_id": upload.json()["document_id"], **selection}
+    ))
+    if composed is None:
+        return False
+    # Unique prompt per iteration: every generation reaches the model
+    generated = await timed(recorder, "POST /api/generate-code", client.post(
+        "/api/generate-code",
+        json={"prompt": f"{composed.json()['prompt']}\n{tag}", "use_cache": False},
+        params={"fields": "project_id,download_url"},
+    ))
+    if generated is None:
+        return False
+    downloaded = await timed(recorder, "GET /api/download/{project_id}", client.get(
+        generated.json()["download_url"]
+    ))
+    return downloaded is not None
+
+
+async def run_load(base_url: str, corpus: list, users: int, iterations: int) -> dict:
+    recorder = LoadRecorder()
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        snippets = (await client.get("/api/snippets")).json()["snippets"]
+        practices = (await client.get("/api/practices")).json()["practices"]
+        selection = {
+            "snippet_ids": [s["id"] for s in snippets[:1]],
+            "practice_ids": [p["id"] for p in practices[:2]],
+        }
+        # Warm-up outside the measurement: parse workers, Gemini client, first queries
+        await pipeline(client, LoadRecorder(), corpus[0], selection, "warm-up")
+
+        async def user(number: int) -> None:
+            for iteration in range(iterations):
+                document = corpus[(number * iterations + iteration) % len(corpus)]
+                started = time.monotonic()
+                ok = await pipeline(client, recorder, document, selection, f"user {number} run {iteration}")
+                recorder.record(PIPELINE, time.monotonic() - started, ok)
+
+        started = time.monotonic()
+        await asyncio.gather(*(user(number) for number in range(users)))
+        wall_time = time.monotonic() - started
+
+    return {"wall_time_s": round(wall_time, 3), "endpoints": recorder.summary(wall_time)}
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"git_commit": commit, "python": platform.python_version(), "cpus": os.cpu_count()}
+
+
+def compare(current: dict, previous: dict) -> dict:
+    """Relative change of each latency percentile and throughput versus an earlier run"""
+    changes = {}
+    for endpoint, stats in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(endpoint)
+        if not before:
+            continue
+        changes[endpoint] = {
+            key: f"{(stats[key] - before[key]) / before[key]:+.1%}" if before.get(key) else None
+            for key in ("p50_s", "p95_s", "p99_s", "throughput_rps")
+        }
+    return changes
+
+
+def bench(args, corpus: list) -> dict:
+    stub_options = {
+        "latency": args.latency,
+        "tokens_per_second": args.tokens_per_second,
+        "response_size": args.response_size,
+        "failure_rate": args.failure_rate,
+        "seed": args.seed,
+    }
+    with StubLLMServer(**stub_options) as stub, tempfile.TemporaryDirectory() as workdir:
+        port = free_port()
+        backend = start_backend(workdir, port, {
+            "GEMINI_API_KEY": "bench-key",
+            "GEMINI_BASE_URL": stub.base_url,
+            "GENERATION_MAX_CONCURRENCY": str(args.generation_concurrency),
+        })
+        try:
+            result = asyncio.run(run_load(f"http://127.0.0.1:{port}", corpus, args.users, args.iterations))
+        finally:
+            backend.terminate()
+            backend.wait()
+        stub_stats = {"requests": stub.app.state.requests, "injected_failures": stub.app.state.failures}
+
+    return {
+        "benchmark": "e2e",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": environment(),
+        "config": {
+            "users": args.users,
+            "iterations": args.iterations,
+            "documents": len(corpus),
+            "sections": args.sections,
+            "generation_concurrency": args.generation_concurrency,
+            "stub": stub_options,
+        },
+        **result,
+        "stub": stub_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--documents", type=int, default=12, help="corpus size (uploads cycle through it)")
+    parser.add_argument("--sections", type=int, default=20, help="requirement sections per document")
+    parser.add_argument("--latency", type=float, default=1.0, help="stub time to first token, seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--response-size", type=int, default=20_000, help="stub answer size in characters")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of stub calls answered 503")
+    parser.add_argument("--generation-concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="result file (default: benchmarks/results/e2e-<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare with")
+    args = parser.parse_args()
+
+    corpus = input_corpus.generate(args.documents, args.sections, seed=args.seed)
+    result = bench(args, corpus)
+    if args.compare:
+        with open(args.compare) as f:
+            result["comparison"] = {"baseline": args.compare, "endpoints": compare(result, json.load(f))}
+
+    output = args.output or os.path.join(
+        BACKEND_DIR, "benchmarks", "results", f"e2e-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+    print(f"Saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Document listing and search: keyset vs OFFSET pages, FTS5 vs LIKE.
+
+Fills a scratch SQLite database (create_all, so the FTS5 index and its
+triggers are in place) with N documents, then times a deep page fetched
+with OFFSET against the same page fetched by keyset (id < cursor), and a
+word search through the full-text index against a LIKE scan of the content.
+Also reports the insert cost the index triggers add.
+
+    python -m benchmarks.bench_listing --documents 20000 --content-kb 8
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.orm import load_only, sessionmaker
+
+from app.database import Base, create_db_engine
+from app.models.models import Document
+from app.services.search_index import SEARCH_TARGETS, match_clause
+
+WORDS = ["invoice", "order", "customer", "ledger", "shipment", "report", "payment", "export", "audit", "cart"]
+COLUMNS = (Document.id, Document.document_id, Document.filename, Document.created_at)
+# Only in the oldest document: the LIKE scan has to read every row to find it
+RARE_WORD = "zephyrquartz"
+
+
+def fill(Session, documents: int, content_kb: int, rng: random.Random) -> float:
+    words = WORDS + [f"term{i}" for i in range(2000)]
+    started = time.perf_counter()
+    with Session() as db:
+        for start in range(0, documents, 500):
+            db.add_all([
+                Document(
+                    document_id=str(uuid.uuid4()),
+                    filename=f"spec_{i}.md",
+                    file_type="md",
+                    content=" ".join(rng.choices(words, k=content_kb * 1024 // 7) + ([RARE_WORD] if i == 0 else [])),
+                )
+                for i in range(start, min(start + 500, documents))
+            ])
+            db.commit()
+    return time.perf_counter() - started
+
+
+def timed(Session, query, repeat: int = 5) -> float:
+    best = float("inf")
+    with Session() as db:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            db.execute(query).all()
+            best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2)
+
+
+def insert_without_index(workdir: str, documents: int, content_kb: int) -> float:
+    engine = create_db_engine(f"sqlite:///{os.path.join(workdir, 'plain.db')}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for statement in SEARCH_TARGETS["documents"].drop_ddl("sqlite"):
+            connection.exec_driver_sql(statement)
+    seconds = fill(sessionmaker(bind=engine), documents, content_kb, random.Random(0))
+    engine.dispose()
+    return seconds
+
+
+def bench(documents: int, content_kb: int, page_size: int) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        insert_plain_s = insert_without_index(workdir, documents, content_kb)
+        engine = create_db_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        insert_s = fill(Session, documents, content_kb, random.Random(0))
+
+        listing = select(Document).options(load_only(*COLUMNS)).order_by(Document.id.desc())
+        deep = documents - page_size * 2
+        with Session() as db:
+            cursor = db.scalar(select(Document.id).order_by(Document.id.desc()).offset(deep - 1).limit(1))
+
+        table = Document.__table__
+        result = {
+            "documents": documents,
+            "content_kb": content_kb,
+            "insert_without_index_s": round(insert_plain_s, 2),
+            "insert_s": round(insert_s, 2),
+            "deep_page_offset_ms": timed(Session, listing.offset(deep).limit(page_size)),
+            "deep_page_keyset_ms": timed(Session, listing.where(Document.id < cursor).limit(page_size)),
+            "search_like_ms": timed(
+                Session, listing.where(Document.content.contains(RARE_WORD)).limit(page_size)
+            ),
+            "search_fts_ms": timed(
+                Session, listing.where(match_clause(table, RARE_WORD, "sqlite")).limit(page_size)
+            ),
+            "search_common_word_fts_ms": timed(
+                Session, listing.where(match_clause(table, "invoice", "sqlite")).limit(page_size)
+            ),
+        }
+        engine.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--content-kb", type=int, default=8)
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps(bench(args.documents, args.content_kb, args.page_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
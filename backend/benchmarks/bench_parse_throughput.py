@@ -0,0 +1,93 @@
+"""
+Upload throughput of /api/upload as the parse pool grows.
+
+Builds a corpus of text-heavy PDFs, then for each PARSE_POOL_WORKERS value
+starts a fresh uvicorn worker and posts the corpus with the given client
+concurrency. Throughput should scale with the pool size up to the number
+of cores; PARSE_POOL_WORKERS=0 parses on a thread (GIL-bound baseline).
+
+    python -m benchmarks.bench_parse_throughput --workers 0 1 2 4 --documents 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import fitz
+import httpx
+
+from .common import free_port, start_backend
+
+LINE = "The system shall validate every invoice line against the purchase order. "
+
+
+def build_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(page.rect + (36, 36, -36, -36), f"Page {i + 1}\n" + LINE * 60, fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+async def upload_all(port: int, corpus: list, concurrency: int) -> list:
+    slots = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+        async def one(index: int, pdf: bytes) -> float:
+            async with slots:
+                started = time.monotonic()
+                response = await client.post(
+                    "/api/upload", files={"file": (f"spec_{index}.pdf", pdf, "application/pdf")}
+                )
+                response.raise_for_status()
+                return time.monotonic() - started
+
+        return await asyncio.gather(*(one(i, pdf) for i, pdf in enumerate(corpus)))
+
+
+def bench(pool_workers: int, corpus: list, concurrency: int, workdir: str) -> dict:
+    port = free_port()
+    backend = start_backend(workdir, port, {"PARSE_POOL_WORKERS": str(pool_workers)})
+    try:
+        # Let the pool warm up, then one untimed request
+        time.sleep(3)
+        asyncio.run(upload_all(port, corpus[:1], 1))
+        started = time.monotonic()
+        latencies = asyncio.run(upload_all(port, corpus, concurrency))
+        elapsed = time.monotonic() - started
+    finally:
+        backend.terminate()
+        backend.wait()
+
+    latencies.sort()
+    return {
+        "parse_pool_workers": pool_workers,
+        "documents": len(corpus),
+        "elapsed_s": round(elapsed, 2),
+        "documents_per_s": round(len(corpus) / elapsed, 2),
+        "p50_s": round(latencies[len(latencies) // 2], 3),
+        "max_s": round(latencies[-1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, os.cpu_count() or 1])
+    parser.add_argument("--documents", type=int, default=32)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    corpus = [build_pdf(args.pages) for _ in range(args.documents)]
+    results = []
+    for pool_workers in args.workers:
+        with tempfile.TemporaryDirectory() as workdir:
+            results.append(bench(pool_workers, corpus, args.concurrency, workdir))
+    print(json.dumps({"cpu_count": os.cpu_count(), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
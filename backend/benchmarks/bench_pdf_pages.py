@@ -0,0 +1,98 @@
+"""
+PDF text extraction throughput in pages/sec.
+
+Builds a corpus of large multi-page PDFs and extracts each one serially
+(DocumentParser.parse) and through ParsePool with page ranges fanned out
+across 1..N workers. Also reports the time to the first page from the
+incremental generator, which is what an early-stopping caller pays.
+
+    python -m benchmarks.bench_pdf_pages --documents 4 --pages 500 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import fitz
+
+from app.services.document_parser import DocumentParser
+from app.services.parse_pool import ParsePool
+
+LINE = "Each order line carries a SKU, a quantity, a unit price and a tax code. "
+
+
+def build_pdf(path: str, pages: int) -> None:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(page.rect + (36, 36, -36, -36), f"Page {i + 1}\n" + LINE * 60, fontsize=8)
+    doc.save(path)
+    doc.close()
+
+
+def bench_serial(corpus: list, total_pages: int) -> dict:
+    started = time.monotonic()
+    for path in corpus:
+        DocumentParser.parse(path, "spec.pdf")
+    elapsed = time.monotonic() - started
+    first_started = time.monotonic()
+    next(DocumentParser.iter_pdf_pages(corpus[0]))
+    return {
+        "mode": "serial",
+        "elapsed_s": round(elapsed, 2),
+        "pages_per_s": round(total_pages / elapsed, 1),
+        "first_page_s": round(time.monotonic() - first_started, 4),
+    }
+
+
+async def bench_pool(corpus: list, total_pages: int, workers: int, pages_per_task: int) -> dict:
+    pool = ParsePool(workers=workers, timeout=600)
+    await pool.warm_up()
+    try:
+        started = time.monotonic()
+        for path in corpus:
+            async for _ in pool.iter_pdf_pages(path, pages_per_task=pages_per_task):
+                pass
+        elapsed = time.monotonic() - started
+
+        first_started = time.monotonic()
+        pages = pool.iter_pdf_pages(corpus[0], pages_per_task=pages_per_task)
+        await pages.__anext__()
+        first_page = time.monotonic() - first_started
+        await pages.aclose()
+    finally:
+        pool.shutdown()
+    return {
+        "mode": f"pool_{workers}",
+        "elapsed_s": round(elapsed, 2),
+        "pages_per_s": round(total_pages / elapsed, 1),
+        "first_page_s": round(first_page, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--pages-per-task", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = []
+        for i in range(args.documents):
+            path = os.path.join(workdir, f"spec_{i}.pdf")
+            build_pdf(path, args.pages)
+            corpus.append(path)
+        total_pages = args.documents * args.pages
+
+        results = [bench_serial(corpus, total_pages)]
+        for workers in args.workers:
+            results.append(asyncio.run(bench_pool(corpus, total_pages, workers, args.pages_per_task)))
+    print(json.dumps({"cpu_count": os.cpu_count(), "total_pages": total_pages, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
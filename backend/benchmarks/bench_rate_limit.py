@@ -0,0 +1,124 @@
+"""
+Noisy neighbour: one client flooding /api/generate-code next to a polite one.
+
+Starts the stub LLM and the backend (a scratch directory per run), then has
+a "noisy" client run N request loops back to back while a "polite" client
+sends one generation every --interval seconds. Reports the polite client's
+latency and how many of the noisy client's requests were served or shed,
+with admission control off and on (memory backend, or the shared Redis
+backend against the stub Redis server with several workers).
+
+    python -m benchmarks.bench_rate_limit --noisy 12 --duration 20 --latency 1
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+from .bench_e2e import percentile
+from .common import free_port, start_backend
+from .stub_llm import StubLLMServer
+from .stub_redis import StubRedisServer
+
+
+async def run_load(base_url: str, noisy: int, duration: float, interval: float, workers: int) -> dict:
+    statuses: Counter = Counter()
+    polite_latencies = []
+    polite_errors = 0
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        # Warm-up: pays the one-off google.genai import outside the measurement, on every worker
+        await asyncio.gather(*(
+            client.post("/api/generate-code", json={"prompt": f"warm-up {i}"}, headers={"X-API-Key": f"warm-up {i}"})
+            for i in range(workers * 4)
+        ))
+        deadline = time.monotonic() + duration
+
+        async def noisy_loop(i: int) -> None:
+            number = 0
+            while time.monotonic() < deadline:
+                # Unique prompts: every request is a real generation, never a cache hit
+                response = await client.post(
+                    "/api/generate-code", json={"prompt": f"noisy {i} {number}"}, headers={"X-API-Key": "noisy"}
+                )
+                number += 1
+                statuses[response.status_code] += 1
+                if response.status_code == 429:
+                    await asyncio.sleep(0.05)  # ignores Retry-After, as a misbehaving client would
+
+        async def polite_loop() -> None:
+            nonlocal polite_errors
+            number = 0
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                response = await client.post(
+                    "/api/generate-code", json={"prompt": f"polite {number}"}, headers={"X-API-Key": "polite"}
+                )
+                if response.status_code == 200:
+                    polite_latencies.append(time.monotonic() - started)
+                else:
+                    polite_errors += 1
+                number += 1
+                await asyncio.sleep(max(interval - (time.monotonic() - started), 0))
+
+        await asyncio.gather(polite_loop(), *(noisy_loop(i) for i in range(noisy)))
+
+    polite_latencies.sort()
+    return {
+        "polite_requests": len(polite_latencies) + polite_errors,
+        "polite_errors": polite_errors,
+        "polite_p50_s": round(percentile(polite_latencies, 0.5), 3),
+        "polite_p95_s": round(percentile(polite_latencies, 0.95), 3),
+        "polite_max_s": round(polite_latencies[-1], 3) if polite_latencies else 0.0,
+        "noisy_served": statuses[200],
+        "noisy_rejected_429": statuses[429],
+        "noisy_failed": sum(statuses.values()) - statuses[200] - statuses[429],
+    }
+
+
+def bench(mode: str, workers: int, noisy: int, duration: float, interval: float, latency: float,
+          concurrency: int) -> dict:
+    env = {"GENERATION_MAX_CONCURRENCY": str(concurrency)}
+    if mode != "off":
+        env.update({"RATE_LIMIT_ENABLED": "true", "RATE_LIMIT_BACKEND": mode})
+
+    with StubLLMServer(latency=latency) as stub, StubRedisServer() as redis, \
+            tempfile.TemporaryDirectory() as workdir:
+        env.update({"GEMINI_API_KEY": "bench-key", "GEMINI_BASE_URL": stub.base_url})
+        if mode == "redis":
+            env["RATE_LIMIT_REDIS_URL"] = redis.url
+        port = free_port()
+        backend = start_backend(workdir, port, env, workers=workers)
+        try:
+            result = asyncio.run(run_load(f"http://127.0.0.1:{port}", noisy, duration, interval, workers))
+        finally:
+            backend.terminate()
+            backend.wait()
+    return {"rate_limit": mode, "workers": workers, **result}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--noisy", type=int, default=12, help="concurrent request loops of the noisy client")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between polite requests")
+    parser.add_argument("--latency", type=float, default=1.0, help="stub model latency")
+    parser.add_argument("--concurrency", type=int, default=8, help="GENERATION_MAX_CONCURRENCY")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn workers for the redis run")
+    parser.add_argument("--modes", nargs="+", default=["off", "memory", "redis"], choices=["off", "memory", "redis"])
+    args = parser.parse_args()
+
+    results = [
+        bench(mode, args.workers if mode == "redis" else 1, args.noisy, args.duration, args.interval,
+              args.latency, args.concurrency)
+        for mode in args.modes
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
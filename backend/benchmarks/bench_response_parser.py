@@ -0,0 +1,76 @@
+"""
+Response parsing over the synthetic corpus, old regex parser vs ResponseParser.
+
+For each corpus case and size: parse time and throughput for the previous
+regex-based parser (whole text), ResponseParser on the whole text, and
+ResponseParser fed in 4 KB stream chunks, plus whether the expected files
+were recovered.
+
+    python -m benchmarks.bench_response_parser --sizes-mb 1 4 16
+"""
+import argparse
+import json
+import logging
+import random
+import re
+import time
+
+from app.services.response_parser import ResponseParser
+
+from .response_corpus import chunked, corpus
+
+
+def legacy_parse(text: str) -> dict:
+    """The parser this replaced: first non-greedy {...}, re.sub per fallback branch"""
+    match = re.search(r"\{[\s\S]*?\}", text)
+    try:
+        data = json.loads(match.group(0) if match else text)
+    except Exception:
+        return {"files": [], "instructions": re.sub(r"```[\s\S]*?```", "", text).strip(), "error": True}
+    files = data.get("files", []) if isinstance(data, dict) else []
+    if not isinstance(files, list):
+        return {"files": [], "instructions": re.sub(r"```[\s\S]*?```", "", text).strip()}
+    valid = [f for f in files if isinstance(f, dict) and "path" in f and "content" in f]
+    return {"files": valid, "instructions": data.get("instructions") or re.sub(r"```[\s\S]*?```", "", text).strip()}
+
+
+def parse_streamed(text: str) -> dict:
+    parser = ResponseParser()
+    for chunk in chunked(text, random.Random(0)):
+        parser.feed(chunk)
+    parser.close()
+    return parser.result()
+
+
+def measure(parse, text: str, expected) -> dict:
+    started = time.perf_counter()
+    result = parse(text)
+    elapsed = time.perf_counter() - started
+    return {
+        "ms": round(elapsed * 1000, 1),
+        "mb_per_s": round(len(text) / 1024 ** 2 / elapsed, 1) if elapsed else None,
+        "correct": [f["path"] for f in result["files"]] == (expected or []),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)  # the corpus includes deliberately broken payloads
+
+    results = []
+    for size_mb in args.sizes_mb:
+        for name, text, expected in corpus(int(size_mb * 1024 ** 2)):
+            results.append({
+                "case": name,
+                "size_mb": round(len(text) / 1024 ** 2, 2),
+                "legacy_regex": measure(legacy_parse, text, expected),
+                "single_pass": measure(ResponseParser.parse, text, expected),
+                "single_pass_streamed": measure(parse_streamed, text, expected),
+            })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Section index build cost and top-k prompt size on a long specification.
+
+Generates a markdown spec of N requirement sections (about 100 pages at the
+default), builds its BM25 section index as an upload does, and composes the
+prompt with the whole document versus its top-k sections for a practice
+selection and extra instructions.
+
+    python -m benchmarks.bench_section_index --sections 400 --top-k 8
+"""
+import argparse
+import json
+import random
+import time
+
+from app.services.prompt_composer import PromptComposer
+from app.services.practices_registry import practices_registry
+from app.services.section_index import SectionIndex
+
+from .input_corpus import build_markdown, requirement_sections
+
+
+def best_of(fn, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2), result
+
+
+def bench(sections: int, paragraphs: int, top_k: int) -> dict:
+    rng = random.Random(0)
+    spec_sections = requirement_sections(rng, sections)
+    # Longer sections than the upload corpus: a few paragraphs per requirement
+    spec_sections = [(heading, body * paragraphs) for heading, body in spec_sections]
+    content = build_markdown(spec_sections).decode()
+
+    practices_registry.refresh()
+    practice_ids = [practice["id"] for practice in practices_registry.all()[:2]]
+    extra = "Invoices must be reconciled against payments, with an audit trail entry"
+
+    build_ms, index = best_of(lambda: SectionIndex.build(content))
+    blob = index.to_bytes()
+    load_ms, index = best_of(lambda: SectionIndex.from_bytes(blob))
+    full_ms, full = best_of(lambda: PromptComposer.compose(content, [], practice_ids, extra))
+    top_ms, top = best_of(lambda: PromptComposer.compose(
+        content, [], practice_ids, extra, section_top_k=top_k, section_index=index
+    ))
+
+    return {
+        "document_chars": len(content),
+        "sections": len(index.sections),
+        "index_build_ms": build_ms,
+        "index_bytes": len(blob),
+        "index_load_ms": load_ms,
+        "compose_full_ms": full_ms,
+        "compose_top_k_ms": top_ms,
+        "prompt_tokens_full": full.estimated_tokens,
+        "prompt_tokens_top_k": top.estimated_tokens,
+        "top_sections": [section["title"] for section in top.document_sections],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sections", type=int, default=400)
+    parser.add_argument("--paragraphs", type=int, default=3, help="repeat each section body this many times")
+    parser.add_argument("--top-k", type=int, default=8)
+    args = parser.parse_args()
+
+    print(json.dumps(bench(args.sections, args.paragraphs, args.top_k), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Backend startup cost: app import time and time to the first request.
+
+Each sample is a fresh interpreter. "import" times `import app.main`, once
+as shipped (parser libraries loaded lazily) and once with docx, PyPDF2 and
+fitz imported up front as the app used to. "first_request" starts uvicorn
+on a migrated database and times spawn -> first /health response, then
+the first and second GET /api/practices.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from .common import BACKEND_DIR, free_port, migrate_database
+
+IMPORT_SNIPPET = """
+import sys, time
+started = time.perf_counter()
+{preload}
+import app.main
+elapsed = time.perf_counter() - started
+print(elapsed, ",".join(m for m in ("docx", "fitz", "PyPDF2", "alembic") if m in sys.modules))
+"""
+
+
+def time_import(eager_parsers: bool) -> tuple:
+    preload = "import docx, fitz, PyPDF2" if eager_parsers else ""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(preload=preload)],
+        cwd=BACKEND_DIR,
+        env=dict(os.environ, PYTHONPATH=BACKEND_DIR),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    return float(output[0]), output[1] if len(output) > 1 else ""
+
+
+def time_first_request(schema_check: str) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        env_overrides = {"DB_SCHEMA_CHECK": schema_check, "PARSE_POOL_WORKERS": "1"}
+        migrate_database(workdir, env_overrides)
+        port = free_port()
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=workdir,
+            env=dict(os.environ, PYTHONPATH=BACKEND_DIR, **env_overrides),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+                while True:
+                    try:
+                        client.get("/health")
+                        break
+                    except httpx.TransportError:
+                        if time.perf_counter() - started > 60:
+                            raise RuntimeError("Backend did not start")
+                        time.sleep(0.005)
+                ready = time.perf_counter() - started
+
+                latencies = []
+                for _ in range(2):
+                    request_started = time.perf_counter()
+                    client.get("/api/practices").raise_for_status()
+                    latencies.append(time.perf_counter() - request_started)
+        finally:
+            process.terminate()
+            process.wait()
+    return {"ready_s": ready, "first_request_ms": latencies[0] * 1000, "second_request_ms": latencies[1] * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--schema-checks", nargs="+", default=["off", "warn"])
+    args = parser.parse_args()
+
+    results = []
+    for eager in (False, True):
+        samples = [time_import(eager) for _ in range(args.runs)]
+        results.append({
+            "mode": "import_eager_parsers" if eager else "import_lazy_parsers",
+            "p50_s": round(statistics.median(s for s, _ in samples), 3),
+            "min_s": round(min(s for s, _ in samples), 3),
+            "heavy_modules_loaded": samples[0][1],
+        })
+
+    for schema_check in args.schema_checks:
+        samples = [time_first_request(schema_check) for _ in range(args.runs)]
+        results.append({
+            "mode": f"first_request_schema_check_{schema_check}",
+            **{
+                f"p50_{key}": round(statistics.median(s[key] for s in samples), 3)
+                for key in ("ready_s", "first_request_ms", "second_request_ms")
+            },
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Perceived latency of /api/generate-code versus /api/generate-code/stream.
+
+The stub model emits its response over --latency seconds in --chunks pieces;
+time to first byte (TTFB) on the streaming endpoint should track one chunk,
+not the whole generation.
+
+    python -m benchmarks.bench_streaming --latency 5 --chunks 50 --runs 5
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from .common import free_port, start_backend
+from .stub_llm import StubLLMServer
+
+RESPONSE_TEXT = "\n\n".join(
+    f"### `src/module_{i}.py`\n```python\n" + "\n".join(f"value_{j} = {j}" for j in range(40)) + "\n```"
+    for i in range(10)
+)
+
+
+def measure(client: httpx.Client, path: str, prompt: str) -> dict:
+    started = time.monotonic()
+    first_byte = first_file = None
+    with client.stream("POST", path, json={"prompt": prompt, "use_cache": False}) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            now = time.monotonic() - started
+            if first_byte is None:
+                first_byte = now
+            if first_file is None and '"type": "file"' in line:
+                first_file = now
+    return {"ttfb_s": first_byte, "first_file_s": first_file, "total_s": time.monotonic() - started}
+
+
+def summarize(samples: list) -> dict:
+    return {
+        key: round(statistics.median(s[key] for s in samples), 3)
+        for key in samples[0]
+        if all(s[key] is not None for s in samples)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=5.0)
+    parser.add_argument("--chunks", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with StubLLMServer(latency=args.latency, response_text=RESPONSE_TEXT, stream_chunks=args.chunks) as stub, \
+            tempfile.TemporaryDirectory() as workdir:
+        port = free_port()
+        backend = start_backend(workdir, port, {"GEMINI_API_KEY": "bench-key", "GEMINI_BASE_URL": stub.base_url})
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+                # Warm-up: pays the one-off google.genai import outside the measurement
+                measure(client, "/api/generate-code", "warm-up")
+                results = {
+                    path: summarize([measure(client, path, f"bench {i}") for i in range(args.runs)])
+                    for path in ("/api/generate-code", "/api/generate-code/stream")
+                }
+        finally:
+            backend.terminate()
+            backend.wait()
+
+    print(json.dumps({"stub_latency_s": args.latency, "chunks": args.chunks, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Peak server memory while uploading large PDFs to /api/upload.
+
+Builds PDFs of the requested sizes (a few text pages plus an incompressible
+embedded attachment), uploads each to a fresh uvicorn worker and reports the
+growth of the worker's peak RSS (VmHWM, Linux only) against the file size.
+
+    python -m benchmarks.bench_upload_memory --sizes-mb 100 300
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import fitz
+import httpx
+
+from .common import free_port, start_backend
+
+
+def build_pdf(path: str, size_mb: int, pages: int = 20) -> None:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"Requirement page {i + 1}")
+    doc.embfile_add("payload.bin", os.urandom(size_mb * 1024 * 1024))
+    doc.save(path)
+    doc.close()
+
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not available")
+
+
+def bench(size_mb: int, workdir: str) -> dict:
+    pdf_path = os.path.join(workdir, f"spec_{size_mb}mb.pdf")
+    build_pdf(pdf_path, size_mb)
+    file_mb = os.path.getsize(pdf_path) / (1024 * 1024)
+
+    port = free_port()
+    backend = start_backend(workdir, port, {"UPLOAD_MAX_BYTES": str(2 * 1024 ** 3)})
+    try:
+        baseline = peak_rss_mb(backend.pid)
+        started = time.monotonic()
+        with open(pdf_path, "rb") as pdf:
+            response = httpx.post(
+                f"http://127.0.0.1:{port}/api/upload",
+                files={"file": ("spec.pdf", pdf, "application/pdf")},
+                timeout=None,
+            )
+        response.raise_for_status()
+        elapsed = time.monotonic() - started
+        peak = peak_rss_mb(backend.pid)
+    finally:
+        backend.terminate()
+        backend.wait()
+        os.remove(pdf_path)
+
+    return {
+        "file_mb": round(file_mb, 1),
+        "upload_s": round(elapsed, 2),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(peak, 1),
+        "peak_growth_mb": round(peak - baseline, 1),
+        "growth_per_file_mb": round((peak - baseline) / file_mb, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[100, 300])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [bench(size, workdir) for size in args.sizes_mb]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Project ZIP build time for projects with hundreds of files.
+
+Compares the previous approach (write every file into a temporary tree,
+os.walk it, re-read each file into the ZIP) with building the ZIP from the
+in-memory file list, to disk and as a stream, at several compression levels.
+
+    python -m benchmarks.bench_zip_build --files 200 800 --levels 0 1 6 9
+"""
+import argparse
+import json
+import os
+import random
+import string
+import tempfile
+import time
+import zipfile
+
+from app.config import settings
+from app.services.project_generator import ProjectGenerator
+
+
+def make_project(file_count: int, file_kb: int) -> dict:
+    rng = random.Random(file_count)
+    words = ["def", "return", "class", "import", "self", "value", "request", "response", "items", "=", "(", ")"]
+    files = []
+    for i in range(file_count):
+        body = " ".join(rng.choice(words) for _ in range(file_kb * 160))
+        files.append({"path": f"backend/app/module_{i // 20}/file_{i}.py", "content": body})
+    return {"files": files, "instructions": ["pip install -r requirements.txt"], "commands": ["pytest"]}
+
+
+def legacy_zip(project: dict, zip_path: str) -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for file_info in project["files"]:
+            file_path = os.path.join(temp_dir, file_info["path"])
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(file_info["content"])
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+            for root, _, files in os.walk(temp_dir):
+                for file in files:
+                    file_path = os.path.join(root, file)
+                    zipf.write(file_path, os.path.relpath(file_path, temp_dir))
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench(file_count: int, file_kb: int, levels: list, repeat: int, workdir: str) -> dict:
+    project = make_project(file_count, file_kb)
+    os.chdir(workdir)
+    result = {
+        "files": file_count,
+        "raw_mb": round(sum(len(f["content"]) for f in project["files"]) / 1024 ** 2, 2),
+        "legacy_temp_tree_s": round(timed(lambda: legacy_zip(project, "legacy.zip"), repeat), 4),
+        "levels": [],
+    }
+    for level in levels:
+        settings.ZIP_COMPRESSION_LEVEL = level
+        result["levels"].append({
+            "level": level,
+            "in_memory_s": round(timed(lambda: ProjectGenerator.build_project_zip(project), repeat), 4),
+            "streamed_s": round(timed(lambda: sum(map(len, ProjectGenerator.stream_project_zip(project))), repeat), 4),
+            "zip_mb": round(len(ProjectGenerator.build_project_zip(project)) / 1024 ** 2, 2),
+        })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, nargs="+", default=[200, 800])
+    parser.add_argument("--file-kb", type=int, default=4)
+    parser.add_argument("--levels", type=int, nargs="+", default=[0, 1, 6, 9])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [bench(count, args.file_kb, args.levels, args.repeat, workdir) for count in args.files]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
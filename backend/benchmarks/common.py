@@ -0,0 +1,96 @@
+"""Helpers shared by the benchmark scripts"""
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def migrate_database(workdir: str, env_overrides: dict) -> None:
+    """Run `alembic upgrade head` against the database the backend in `workdir` will use"""
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, **env_overrides)
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "-c", os.path.join(BACKEND_DIR, "alembic.ini"), "upgrade", "head"],
+        cwd=workdir,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def start_backend(workdir: str, port: int, env_overrides: dict, workers: int = 1) -> subprocess.Popen:
+    """
+    Run uvicorn app.main:app from `workdir` (fresh SQLite DB and generated_projects/).
+
+    Per-client rate limits are off unless `env_overrides` turns them on: the
+    benchmarks load the backend from one client on purpose.
+    """
+    env_overrides = {"RATE_LIMIT_ENABLED": "false", **env_overrides}
+    migrate_database(workdir, env_overrides)
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, **env_overrides)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=workdir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Backend did not start")
+
+
+class BackgroundServer:
+    """Run an ASGI app with uvicorn in a daemon thread (stub servers for tests and benchmarks)"""
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        self.app = app
+        self.host = host
+        self.port = port or free_port(host)
+        self._server = uvicorn.Server(
+            uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{type(self).__name__} did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,122 @@
+"""
+Generated requirement documents (DOCX, PDF, Markdown) for end-to-end runs.
+
+Deterministic for a given seed, so two runs upload the same bytes. Run as a
+script to write the corpus to a directory:
+
+    python -m benchmarks.input_corpus --out corpus/ --documents 12 --sections 20
+"""
+import argparse
+import io
+import os
+import random
+from dataclasses import dataclass
+from typing import List
+
+MIME_TYPES = {
+    "md": "text/markdown",
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+SUBJECTS = ["invoice", "customer", "order", "shipment", "report", "user account", "payment", "product"]
+ACTIONS = ["validate", "store", "export", "notify about", "archive", "reconcile", "audit", "search"]
+CONSTRAINTS = [
+    "within 200 ms at the 95th percentile",
+    "with an audit trail entry",
+    "only for authenticated users",
+    "in a single database transaction",
+    "and expose it through the REST API",
+    "retrying transient failures three times",
+]
+
+
+@dataclass
+class InputDocument:
+    filename: str
+    content: bytes
+    mime_type: str
+
+
+def requirement_sections(rng: random.Random, sections: int) -> List[tuple]:
+    """(heading, paragraphs) pairs of plausible requirement text"""
+    result = []
+    for number in range(1, sections + 1):
+        subject = rng.choice(SUBJECTS)
+        paragraphs = [
+            f"The system shall {rng.choice(ACTIONS)} every {subject} {rng.choice(CONSTRAINTS)}."
+            for _ in range(rng.randint(3, 6))
+        ]
+        result.append((f"{number}. {subject.title()} requirements", paragraphs))
+    return result
+
+
+def build_markdown(sections: List[tuple]) -> bytes:
+    lines = ["# Software Requirements", ""]
+    for heading, paragraphs in sections:
+        lines += [f"## {heading}", ""] + [f"- {paragraph}" for paragraph in paragraphs] + [""]
+    return "\n".join(lines).encode()
+
+
+def build_docx(sections: List[tuple]) -> bytes:
+    import docx
+
+    document = docx.Document()
+    document.add_heading("Software Requirements", level=1)
+    for heading, paragraphs in sections:
+        document.add_heading(heading, level=2)
+        for paragraph in paragraphs:
+            document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_pdf(sections: List[tuple]) -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    # A handful of sections per page, like a typeset spec
+    for start in range(0, len(sections), 4):
+        page = doc.new_page()
+        text = "\n\n".join(
+            heading + "\n" + "\n".join(paragraphs) for heading, paragraphs in sections[start:start + 4]
+        )
+        page.insert_textbox(page.rect + (36, 36, -36, -36), text, fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+BUILDERS = {"md": build_markdown, "docx": build_docx, "pdf": build_pdf}
+
+
+def generate(documents: int, sections: int = 20, kinds=("docx", "pdf", "md"), seed: int = 0) -> List[InputDocument]:
+    """`documents` inputs cycling through `kinds`, each with `sections` requirement sections"""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(documents):
+        kind = kinds[index % len(kinds)]
+        content = BUILDERS[kind](requirement_sections(rng, sections))
+        corpus.append(InputDocument(f"spec_{index:03d}.{kind}", content, MIME_TYPES[kind]))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--documents", type=int, default=12)
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--kinds", nargs="+", default=["docx", "pdf", "md"], choices=sorted(BUILDERS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for document in generate(args.documents, args.sections, args.kinds, args.seed):
+        with open(os.path.join(args.out, document.filename), "wb") as f:
+            f.write(document.content)
+        print(document.filename, len(document.content))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Synthetic model responses for the response-parser benchmark and fuzz tests.
+
+Every case is (name, text, expected file paths); expected is None for
+inputs that hold no project at all. Sizes are approximate.
+"""
+import json
+import random
+from typing import List, Optional, Tuple
+
+Case = Tuple[str, str, Optional[List[str]]]
+
+# Characters that trip naive scanners: braces, quotes, escapes, backticks
+TRICKY = ['{', '}', '"', "\\", '`', '```', '\\"', '{"a": {"b": [1, {"c": "}"}]}}', "'"]
+
+
+def make_files(rng: random.Random, total_bytes: int, file_bytes: int = 4096) -> List[dict]:
+    files = []
+    for index in range(max(1, total_bytes // file_bytes)):
+        lines = []
+        size = 0
+        while size < file_bytes:
+            line = f"value_{rng.randrange(10 ** 6)} = {{'key': \"{rng.choice(TRICKY)}\"}}  # {rng.random():.6f}"
+            lines.append(line)
+            size += len(line) + 1
+        files.append({"path": f"src/pkg{index % 7}/module_{index}.py", "content": "\n".join(lines)})
+    return files
+
+
+def payload(files: List[dict], nested: bool = False) -> dict:
+    data = {"files": files, "instructions": "Run `python -m src` and open {http://localhost:8000}."}
+    if nested:
+        data["meta"] = {"layers": {"api": {"routes": [{"path": "/", "methods": ["GET"]}]}}, "notes": "}{"}
+    return data
+
+
+def fenced_json(rng: random.Random, size: int) -> Case:
+    files = make_files(rng, size)
+    text = (
+        "Here is the project {as requested}.\n\n```json\n"
+        + json.dumps(payload(files, nested=True), indent=2)
+        + "\n```\n\nLet me know if you need changes."
+    )
+    return "fenced_json", text, [f["path"] for f in files]
+
+
+def raw_json(rng: random.Random, size: int) -> Case:
+    files = make_files(rng, size)
+    return "raw_json", json.dumps(payload(files, nested=True)), [f["path"] for f in files]
+
+
+def prose_then_json(rng: random.Random, size: int) -> Case:
+    """Stray braces and code before the payload: the first '{...}' is not the answer"""
+    files = make_files(rng, size)
+    text = (
+        "Use a config like {debug: true} or {\"debug\": true}.\n"
+        "```python\nsettings = {'a': {'b': 1}}\n```\n"
+        "Result object: " + json.dumps(payload(files, nested=True)) + "\nDone {ok}."
+    )
+    return "prose_then_json", text, [f["path"] for f in files]
+
+
+def fenced_files(rng: random.Random, size: int) -> Case:
+    files = make_files(rng, size)
+    blocks = [f"### `{f['path']}`\n```python\n{f['content']}\n```\n" for f in files]
+    return "fenced_files", "Project layout below.\n\n" + "\n".join(blocks), [f["path"] for f in files]
+
+
+def garbage(rng: random.Random, size: int) -> Case:
+    """Brace/quote/backtick soup with no project in it"""
+    pieces, total = [], 0
+    while total < size:
+        piece = rng.choice(TRICKY + ["\n", " ", "word", "{\"files\": ", "\"unterminated"])
+        pieces.append(piece)
+        total += len(piece)
+    return "garbage", "".join(pieces), None
+
+
+def deep_nesting(rng: random.Random, size: int) -> Case:
+    depth = size // 2
+    return "deep_nesting", "{" * depth + "}" * depth, None
+
+
+GENERATORS = (fenced_json, raw_json, prose_then_json, fenced_files, garbage, deep_nesting)
+
+
+def corpus(size: int, seed: int = 0) -> List[Case]:
+    rng = random.Random(seed)
+    return [generator(rng, size) for generator in GENERATORS]
+
+
+def chunked(text: str, rng: random.Random, max_chunk: int = 4096) -> List[str]:
+    """Split like a model stream: arbitrary boundaries, including mid-line and mid-fence"""
+    chunks, pos = [], 0
+    while pos < len(text):
+        step = rng.randint(1, max_chunk)
+        chunks.append(text[pos:pos + step])
+        pos += step
+    return chunks
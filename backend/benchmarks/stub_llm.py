@@ -0,0 +1,189 @@
+"""
+Local stand-in for the Gemini REST API, used by benchmarks and tests.
+
+Point the backend at it with GEMINI_BASE_URL=<server.base_url>.
+"""
+import asyncio
+import json
+import random
+from typing import Dict, Iterable, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from .common import BackgroundServer
+
+DEFAULT_RESPONSE_TEXT = """```json
+{"files": [{"path": "main.py", "content": "print('hello')"}], "instructions": "Run python main.py"}
+```"""
+
+# Answer to requests in JSON mode (generationConfig.responseMimeType = application/json)
+DEFAULT_STRUCTURED_TEXT = json.dumps({
+    "files": [{"path": "main.py", "content": "print('hello')"}],
+    "instructions": "Run python main.py",
+    "commands": ["python main.py"],
+})
+
+
+def sized_response_text(size: int) -> str:
+    """A fenced-JSON project answer of about `size` characters, split over several files"""
+    files = max(1, min(size // 4096, 32))
+    line = "value = compute(value)\n"
+    content = line * max(1, (size - 200 * files) // (files * len(line)))
+    project = {
+        "files": [{"path": f"src/module_{i}.py", "content": content} for i in range(files)],
+        "instructions": "Run python src/module_0.py",
+    }
+    return f"```json\n{json.dumps(project)}\n```"
+
+
+def create_stub_app(
+    latency: float = 1.0,
+    response_text: str = DEFAULT_RESPONSE_TEXT,
+    stream_chunks: int = 20,
+    fail_first: int = 0,
+    structured_texts: Optional[List[str]] = None,
+    tokens_per_second: float = 0.0,
+    response_size: int = 0,
+    failure_rate: float = 0.0,
+    seed: Optional[int] = None,
+    model_latency: Optional[Dict[str, float]] = None,
+    latencies: Optional[List[float]] = None,
+    failing_models: Iterable[str] = (),
+) -> FastAPI:
+    """
+    Build an app answering generateContent after `latency` seconds.
+
+    streamGenerateContent spreads the same latency over `stream_chunks`
+    server-sent events, like a model emitting tokens at a steady rate.
+    With `tokens_per_second`, `latency` is the time to the first token and
+    the answer's output tokens are then emitted at that rate.
+    `response_size` replaces `response_text` with a project of about that
+    many characters (see sized_response_text).
+    The first `fail_first` requests get a 503, as from an overloaded model,
+    and after them a `failure_rate` fraction at random (`seed` to repeat a run).
+    JSON-mode requests get `structured_texts` in turn (the last one repeats);
+    one that is not valid JSON is reported as cut off at MAX_TOKENS.
+    Responses carry usageMetadata at ~4 characters per token.
+    Per model: `model_latency` overrides `latency`, and `failing_models`
+    always answer 503. `latencies` are used by successive requests in turn
+    instead (the last one repeats), e.g. one slow call then fast ones.
+    app.state.models lists the model of every request.
+    """
+    app = FastAPI()
+    app.state.requests = 0
+    app.state.failures = 0
+    app.state.fail_remaining = fail_first
+    app.state.bodies = []
+    app.state.models = []
+    failing = frozenset(failing_models)
+    latency_queue = list(latencies or [])
+    structured = list(structured_texts or [DEFAULT_STRUCTURED_TEXT])
+    failure_rng = random.Random(seed)
+    if response_size:
+        response_text = sized_response_text(response_size)
+
+    def generation_time(text: str, model: str) -> float:
+        if latency_queue:
+            base = latency_queue.pop(0) if len(latency_queue) > 1 else latency_queue[0]
+        else:
+            base = (model_latency or {}).get(model, latency)
+        if tokens_per_second <= 0:
+            return base
+        return base + (len(text) // 4) / tokens_per_second
+
+    @app.post("/{api_version}/models/{model_action}")
+    async def generate_content(api_version: str, model_action: str, request: Request):
+        body = json.loads(await request.body() or b"{}")
+        app.state.bodies.append(body)
+        app.state.requests += 1
+        model, _, action = model_action.partition(":")
+        app.state.models.append(model)
+
+        if model in failing or app.state.fail_remaining > 0 or failure_rng.random() < failure_rate:
+            app.state.fail_remaining = max(app.state.fail_remaining - 1, 0)
+            app.state.failures += 1
+            return JSONResponse(
+                status_code=503,
+                content={"error": {"code": 503, "message": "The model is overloaded.", "status": "UNAVAILABLE"}},
+            )
+
+        if action == "streamGenerateContent":
+            return StreamingResponse(
+                _stream_chunks(model, response_text, generation_time(response_text, model), stream_chunks),
+                media_type="text/event-stream",
+            )
+
+        prompt_tokens = len(json.dumps(body.get("contents", ""))) // 4
+        if body.get("generationConfig", {}).get("responseMimeType") == "application/json":
+            text = structured.pop(0) if len(structured) > 1 else structured[0]
+            await asyncio.sleep(generation_time(text, model))
+            return _response_payload(model, text, prompt_tokens=prompt_tokens, finish_reason=_finish_reason(text))
+        await asyncio.sleep(generation_time(response_text, model))
+        return _response_payload(model, response_text, prompt_tokens=prompt_tokens)
+
+    return app
+
+
+def _finish_reason(text: str) -> str:
+    try:
+        json.loads(text)
+    except ValueError:
+        return "MAX_TOKENS"
+    return "STOP"
+
+
+def _response_payload(
+    model: str, text: str, finished: bool = True, prompt_tokens: int = 0, finish_reason: str = "STOP"
+) -> dict:
+    candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+    if finished:
+        candidate["finishReason"] = finish_reason
+    usage = {
+        "promptTokenCount": prompt_tokens,
+        "candidatesTokenCount": len(text) // 4,
+        "totalTokenCount": prompt_tokens + len(text) // 4,
+    }
+    return {"candidates": [candidate], "modelVersion": model, "usageMetadata": usage}
+
+
+async def _stream_chunks(model: str, text: str, latency: float, chunks: int):
+    chunks = max(1, min(chunks, len(text)))
+    size = -(-len(text) // chunks)
+    pieces = [text[i:i + size] for i in range(0, len(text), size)]
+    for i, piece in enumerate(pieces):
+        await asyncio.sleep(latency / len(pieces))
+        payload = _response_payload(model, piece, finished=i == len(pieces) - 1)
+        yield f"data: {json.dumps(payload)}\r\n\r\n"
+
+
+class StubLLMServer(BackgroundServer):
+    """Run the stub app with uvicorn in a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **app_kwargs):
+        super().__init__(create_stub_app(**app_kwargs), host, port)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local stub Gemini server")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds to the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="output rate (0 = all at once)")
+    parser.add_argument("--response-size", type=int, default=0, help="answer size in characters")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered 503")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--failing-model", action="append", default=[], help="model always answered 503")
+    args = parser.parse_args()
+
+    app = create_stub_app(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        response_size=args.response_size,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+        failing_models=args.failing_model,
+    )
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
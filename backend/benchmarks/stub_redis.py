@@ -0,0 +1,263 @@
+"""
+Local stand-in for Redis, used by tests and benchmarks.
+
+Speaks RESP2 and implements the commands the rate limiter sends (strings
+with PX expiry, sorted sets, WATCH / MULTI / EXEC with the same abort
+semantics) on in-memory data, in one asyncio loop on a background thread.
+Point the backend at it with RATE_LIMIT_BACKEND=redis RATE_LIMIT_REDIS_URL=<url>.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .common import free_port
+
+Reply = Any
+
+
+class CommandError(Exception):
+    pass
+
+
+class StubRedisStore:
+    def __init__(self):
+        self.data: Dict[bytes, Any] = {}  # bytes value, or dict member -> score for sorted sets
+        self.expires: Dict[bytes, float] = {}
+        self.versions: Dict[bytes, int] = {}  # bumped on every write, for WATCH
+        self.commands = 0
+
+    def _alive(self, key: bytes) -> bool:
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.time():
+            self._delete(key)
+        return key in self.data
+
+    def _touch(self, key: bytes) -> None:
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def _delete(self, key: bytes) -> bool:
+        self.expires.pop(key, None)
+        if self.data.pop(key, None) is None:
+            return False
+        self._touch(key)
+        return True
+
+    def _zset(self, key: bytes) -> Dict[bytes, float]:
+        value = self.data.get(key) if self._alive(key) else None
+        if value is None:
+            return {}
+        if not isinstance(value, dict):
+            raise CommandError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def version(self, key: bytes) -> int:
+        self._alive(key)
+        return self.versions.get(key, 0)
+
+    def execute(self, name: str, args: List[bytes]) -> Reply:
+        self.commands += 1
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            raise CommandError(f"ERR unknown command '{name}'")
+        return handler(*args)
+
+    def cmd_ping(self, *args) -> Reply:
+        return "PONG"
+
+    def cmd_auth(self, *args) -> Reply:
+        return "OK"
+
+    def cmd_select(self, db) -> Reply:
+        return "OK"
+
+    def cmd_get(self, key) -> Reply:
+        if not self._alive(key):
+            return None
+        if isinstance(self.data[key], dict):
+            raise CommandError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return self.data[key]
+
+    def cmd_set(self, key, value, *options) -> Reply:
+        self.data[key] = value
+        self.expires.pop(key, None)
+        if len(options) == 2 and options[0].upper() == b"PX":
+            self.expires[key] = time.time() + int(options[1]) / 1000
+        self._touch(key)
+        return "OK"
+
+    def cmd_del(self, *keys) -> Reply:
+        return sum(self._delete(key) for key in keys if self._alive(key))
+
+    def cmd_pexpire(self, key, milliseconds) -> Reply:
+        if not self._alive(key):
+            return 0
+        self.expires[key] = time.time() + int(milliseconds) / 1000
+        return 1
+
+    def cmd_zadd(self, key, *scores_and_members) -> Reply:
+        zset = self._zset(key)
+        added = 0
+        for score, member in zip(scores_and_members[::2], scores_and_members[1::2]):
+            added += member not in zset
+            zset[member] = float(score)
+        self.data[key] = zset
+        self._touch(key)
+        return added
+
+    def cmd_zrem(self, key, *members) -> Reply:
+        zset = self._zset(key)
+        removed = sum(zset.pop(member, None) is not None for member in members)
+        if removed:
+            self._touch(key)
+            if not zset:
+                self._delete(key)
+        return removed
+
+    def cmd_zrank(self, key, member) -> Reply:
+        zset = self._zset(key)
+        if member not in zset:
+            return None
+        return sorted(zset, key=lambda m: (zset[m], m)).index(member)
+
+    def cmd_zcard(self, key) -> Reply:
+        return len(self._zset(key))
+
+    def cmd_zremrangebyscore(self, key, minimum, maximum) -> Reply:
+        zset = self._zset(key)
+        low, high = float(minimum), float(maximum)
+        doomed = [member for member, score in zset.items() if low <= score <= high]
+        return self.cmd_zrem(key, *doomed) if doomed else 0
+
+
+class StubRedisServer:
+    """Serve a StubRedisStore on a free port from a daemon thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port or free_port(host)
+        self.store = StubRedisStore()
+        self._loop = asyncio.new_event_loop()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"redis://{self.host}:{self.port}/0"
+
+    async def _read_command(self, reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()  # inline command (redis-cli style)
+        args = []
+        for _ in range(int(line[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    @staticmethod
+    def _encode(reply: Reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, CommandError):
+            return b"-%s\r\n" % str(reply).encode()
+        if isinstance(reply, str):
+            return b"+%s\r\n" % reply.encode()
+        if isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, bytes):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        return b"*%d\r\n" % len(reply) + b"".join(StubRedisServer._encode(item) for item in reply)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        watched: Dict[bytes, int] = {}
+        queued: Optional[List[List[bytes]]] = None  # commands after MULTI
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                name = args[0].decode().upper()
+                if name == "WATCH":
+                    watched.update((key, self.store.version(key)) for key in args[1:])
+                    reply = "OK"
+                elif name == "UNWATCH":
+                    watched.clear()
+                    reply = "OK"
+                elif name == "MULTI":
+                    queued = []
+                    reply = "OK"
+                elif name == "DISCARD":
+                    queued = None
+                    watched.clear()
+                    reply = "OK"
+                elif name == "EXEC":
+                    if queued is None:
+                        reply = CommandError("ERR EXEC without MULTI")
+                    elif any(self.store.version(key) != version for key, version in watched.items()):
+                        writer.write(b"*-1\r\n")  # aborted: a watched key changed
+                        queued, reply = None, None
+                        watched.clear()
+                        await writer.drain()
+                        continue
+                    else:
+                        reply = [self._run(command) for command in queued]
+                        queued = None
+                        watched.clear()
+                elif queued is not None:
+                    queued.append(args)
+                    reply = "QUEUED"
+                else:
+                    reply = self._run(args)
+                writer.write(self._encode(reply))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _run(self, args: List[bytes]) -> Reply:
+        try:
+            return self.store.execute(args[0].decode(), args[1:])
+        except CommandError as e:
+            return e
+        except (TypeError, ValueError) as e:
+            return CommandError(f"ERR {e}")
+
+    def start(self) -> "StubRedisServer":
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, self.host, self.port), self._loop
+        ).result(timeout=10)
+        return self
+
+    def stop(self) -> None:
+        async def close():
+            self._server.close()
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local stub Redis server")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    server = StubRedisServer(port=args.port).start()
+    print(f"Stub Redis at {server.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
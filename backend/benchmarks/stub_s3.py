@@ -0,0 +1,103 @@
+"""
+Local stand-in for an S3-compatible object store, used by tests and benchmarks.
+
+Implements the calls S3ArtifactStore makes (path-style PUT/GET/HEAD/DELETE
+and ListObjectsV2) on an in-memory bucket. Requests must carry a SigV4
+Authorization header and PUT bodies must match x-amz-content-sha256.
+Point the backend at it with ARTIFACT_STORE=s3 ARTIFACT_S3_ENDPOINT_URL=<base_url>.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from .common import BackgroundServer
+
+
+def create_stub_s3_app(page_size: int = 1000) -> FastAPI:
+    app = FastAPI()
+    app.state.objects = {}  # (bucket, key) -> (bytes, last modified)
+    app.state.requests = []  # (method, key)
+
+    @app.middleware("http")
+    async def require_signature(request: Request, call_next):
+        if not request.headers.get("authorization", "").startswith("AWS4-HMAC-SHA256 Credential="):
+            return Response(status_code=403)
+        return await call_next(request)
+
+    @app.put("/{bucket}/{key:path}")
+    async def put_object(bucket: str, key: str, request: Request):
+        body = await request.body()
+        if request.headers.get("x-amz-content-sha256") != hashlib.sha256(body).hexdigest():
+            return Response(status_code=400, content="XAmzContentSHA256Mismatch")
+        app.state.requests.append(("PUT", key))
+        app.state.objects[(bucket, key)] = (body, datetime.now(timezone.utc))
+        return Response(status_code=200, headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+
+    @app.api_route("/{bucket}/{key:path}", methods=["GET", "HEAD"])
+    async def get_object(bucket: str, key: str, request: Request):
+        app.state.requests.append((request.method, key))
+        if (bucket, key) not in app.state.objects:
+            return Response(status_code=404)
+        body, modified = app.state.objects[(bucket, key)]
+        headers = {"Last-Modified": format_datetime(modified, usegmt=True), "Accept-Ranges": "bytes"}
+        if request.method == "HEAD":
+            return Response(status_code=200, headers={**headers, "Content-Length": str(len(body))})
+
+        range_header = request.headers.get("range")
+        if range_header:
+            first, _, last = range_header.removeprefix("bytes=").partition("-")
+            start, end = int(first), (int(last) + 1 if last else len(body))
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{len(body)}"
+            return Response(content=body[start:end], status_code=206, headers=headers)
+        return Response(content=body, headers=headers)
+
+    @app.delete("/{bucket}/{key:path}")
+    async def delete_object(bucket: str, key: str):
+        app.state.requests.append(("DELETE", key))
+        app.state.objects.pop((bucket, key), None)
+        return Response(status_code=204)
+
+    @app.get("/{bucket}")
+    async def list_objects(bucket: str, request: Request):
+        prefix = request.query_params.get("prefix", "")
+        after = request.query_params.get("continuation-token", "")
+        keys = sorted(k for b, k in app.state.objects if b == bucket and k.startswith(prefix) and k > after)
+        page, truncated = keys[:page_size], len(keys) > page_size
+
+        contents = "".join(
+            f"<Contents><Key>{escape(key)}</Key><Size>{len(app.state.objects[(bucket, key)][0])}</Size>"
+            f"<LastModified>{app.state.objects[(bucket, key)][1].strftime('%Y-%m-%dT%H:%M:%S.000Z')}</LastModified></Contents>"
+            for key in page
+        )
+        token = f"<NextContinuationToken>{escape(page[-1])}</NextContinuationToken>" if truncated else ""
+        xml = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+            f"<Name>{escape(bucket)}</Name><Prefix>{escape(prefix)}</Prefix>"
+            f"<IsTruncated>{'true' if truncated else 'false'}</IsTruncated>{token}{contents}"
+            "</ListBucketResult>"
+        )
+        return Response(content=xml, media_type="application/xml")
+
+    return app
+
+
+class StubS3Server(BackgroundServer):
+    """Run the stub object store with uvicorn in a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **app_kwargs):
+        super().__init__(create_stub_s3_app(**app_kwargs), host, port)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local stub S3 server")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+
+    uvicorn.run(create_stub_s3_app(), host="127.0.0.1", port=args.port)
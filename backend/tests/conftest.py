@@ -0,0 +1,102 @@
+import io
+
+import docx
+import fitz
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.database import (
+    Base, create_async_db_engine, create_db_engine, get_async_db, get_db, get_session_factory
+)
+from app.main import app
+from app.services.generation_cache import generation_cache
+from app.services.model_router import model_router
+from benchmarks.stub_llm import StubLLMServer
+
+
+@pytest.fixture
+def db_sessionmaker(tmp_path):
+    """Isolated SQLite database per test"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def isolated_app(db_sessionmaker, tmp_path, monkeypatch):
+    """App wired to the test database, writing artifacts under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    # Parse on a thread; tests/test_parse_pool.py covers the process pool
+    monkeypatch.setattr(settings, "PARSE_POOL_WORKERS", 0)
+    # tests/test_rate_limiter.py covers admission control
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+
+    def override_get_db():
+        db = db_sessionmaker()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # Connections are not pooled: each TestClient runs its own event loop
+    async_engine = create_async_db_engine(f"sqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+    async_sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with async_sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_session_factory] = lambda: db_sessionmaker
+    generation_cache.clear_memory()
+    model_router.reset()
+    yield app
+    app.dependency_overrides.clear()
+    generation_cache.clear_memory()
+    model_router.reset()
+
+
+@pytest.fixture
+def api_client(isolated_app):
+    with TestClient(isolated_app) as client:
+        yield client
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    with StubLLMServer(latency=0.2) as server:
+        monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+        monkeypatch.setattr(settings, "GEMINI_BASE_URL", server.base_url)
+        yield server
+
+
+@pytest.fixture
+def make_pdf():
+    """Build a PDF with one page per text"""
+    def build(pages):
+        doc = fitz.open()
+        for text in pages:
+            doc.new_page().insert_text((72, 72), text)
+        data = doc.tobytes()
+        doc.close()
+        return data
+    return build
+
+
+@pytest.fixture
+def make_docx():
+    """Build a DOCX with one paragraph per text"""
+    def build(paragraphs):
+        document = docx.Document()
+        for text in paragraphs:
+            document.add_paragraph(text)
+        buffer = io.BytesIO()
+        document.save(buffer)
+        return buffer.getvalue()
+    return build
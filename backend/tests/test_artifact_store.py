@@ -0,0 +1,112 @@
+import io
+import os
+import time
+import zipfile
+
+import pytest
+
+from app.models.models import GeneratedProject
+from app.services import artifact_store
+from app.services.artifact_store import ArtifactStore, ArtifactSweeper, LocalArtifactStore, S3ArtifactStore
+from benchmarks.stub_s3 import StubS3Server
+
+
+@pytest.fixture
+def s3_store():
+    with StubS3Server(page_size=2) as server:
+        yield S3ArtifactStore(
+            endpoint_url=server.base_url, bucket="artifacts", access_key="test", secret_key="secret"
+        ), server
+
+
+@pytest.fixture(params=["local", "s3"])
+def store(request, tmp_path, s3_store):
+    if request.param == "local":
+        return LocalArtifactStore(str(tmp_path / "blobs"))
+    return s3_store[0]
+
+
+def test_identical_content_shares_one_blob(store):
+    key = store.put(b"zip bytes")
+    assert store.put(b"zip bytes") == key
+    assert [a.key for a in store.list()] == [key]
+    assert store.stat(key).size == 9
+    assert b"".join(store.iter_bytes(key, 4)) == b"bytes"
+    assert b"".join(store.iter_bytes(key, 0, 3)) == b"zip"
+
+    store.delete(key)
+    assert store.stat(key) is None
+    assert store.list() == []
+
+
+def test_s3_store_pages_listing_and_skips_existing_uploads(s3_store):
+    store, server = s3_store
+    keys = {store.put(f"blob {i}".encode()) for i in range(5)}
+    store.put(b"blob 0")
+
+    assert {a.key for a in store.list()} == keys
+    assert [method for method, _ in server.app.state.requests].count("PUT") == 5
+
+
+def test_sweeper_evicts_expired_then_least_recently_used(tmp_path):
+    store = LocalArtifactStore(str(tmp_path))
+    old, used, fresh = (store.put(bytes([i]) * 100) for i in range(3))
+    now = time.time()
+    os.utime(store._path(old), (now - 7200, now - 7200))
+    os.utime(store._path(used), (now - 60, now - 60))
+
+    assert ArtifactSweeper(store, max_age=3600, max_total_bytes=10_000).sweep() == 1
+    assert store.stat(old) is None
+
+    # Over the size cap: the least recently used blob goes first
+    assert ArtifactSweeper(store, max_age=3600, max_total_bytes=150).sweep() == 1
+    assert store.stat(used) is None
+    assert store.stat(fresh) is not None
+
+
+def test_download_supports_etag_and_range(api_client, stub_llm):
+    project = api_client.post("/api/generate-code", json={"prompt": "build a todo app"}).json()
+    full = api_client.get(project["download_url"])
+    assert full.status_code == 200
+    assert full.headers["accept-ranges"] == "bytes"
+    assert zipfile.ZipFile(io.BytesIO(full.content)).namelist()
+    etag = full.headers["etag"]
+
+    assert api_client.get(project["download_url"], headers={"If-None-Match": etag}).status_code == 304
+
+    partial = api_client.get(project["download_url"], headers={"Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.content == full.content[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{len(full.content)}"
+
+    # Stale If-Range: the whole file
+    stale = api_client.get(project["download_url"], headers={"Range": "bytes=10-19", "If-Range": '"other"'})
+    assert stale.status_code == 200
+
+    beyond = api_client.get(project["download_url"], headers={"Range": f"bytes={len(full.content)}-"})
+    assert beyond.status_code == 416
+
+
+def test_download_from_s3_store(api_client, stub_llm, s3_store, monkeypatch, db_sessionmaker):
+    store, server = s3_store
+    monkeypatch.setattr(artifact_store, "_store", store)
+
+    project = api_client.post("/api/generate-code", json={"prompt": "hello"}).json()
+    db = db_sessionmaker()
+    key = db.query(GeneratedProject).one().artifact_key
+    db.close()
+    assert ("PUT", f"artifacts/{key}.zip") in server.app.state.requests
+
+    response = api_client.get(project["download_url"], headers={"Range": "bytes=-22"})
+    assert response.status_code == 206
+    assert response.content == b"".join(store.iter_bytes(key))[-22:]
+    assert response.headers["etag"] == f'"{key}"'
+
+
+def test_incomplete_backend_fails_when_created():
+    class PutOnlyStore(ArtifactStore):
+        def put(self, data):
+            return self.key_for(data)
+
+    with pytest.raises(TypeError):
+        PutOnlyStore()
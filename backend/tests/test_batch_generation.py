@@ -0,0 +1,99 @@
+import json
+import time
+
+from app.config import settings
+from app.models.models import Document
+from app.services.practices_registry import practices_registry
+
+
+def add_document(db_sessionmaker, content="Build an API"):
+    db = db_sessionmaker()
+    db.add(Document(document_id="doc", filename="spec.md", content=content, file_type="md"))
+    db.commit()
+    db.close()
+
+
+SPECS = [
+    {"name": "senior", "snippet_ids": ["senior_dev"]},
+    {"name": "junior", "snippet_ids": ["junior_dev"]},
+    {"name": "qa", "snippet_ids": ["qa_perspective"]},
+]
+
+
+def test_batch_generates_specs_concurrently(api_client, stub_llm, db_sessionmaker):
+    add_document(db_sessionmaker)
+    api_client.post("/api/generate-code", json={"prompt": "warm up the client"})
+
+    started = time.monotonic()
+    response = api_client.post("/api/generate-batch", json={"document_id": "doc", "specs": SPECS})
+    elapsed = time.monotonic() - started
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["name"] for r in results] == ["senior", "junior", "qa"]
+    assert all(r["status"] == "completed" for r in results)
+    assert len({r["result"]["project_id"] for r in results}) == 3
+    assert stub_llm.app.state.requests == 1 + 3
+    # Three 0.2s generations overlap instead of running back to back
+    assert elapsed < 3 * 0.2
+
+
+def test_batch_respects_concurrency_limit(api_client, stub_llm, db_sessionmaker):
+    add_document(db_sessionmaker)
+
+    started = time.monotonic()
+    response = api_client.post("/api/generate-batch", json={
+        "document_id": "doc", "specs": SPECS, "max_concurrency": 1
+    })
+
+    assert response.status_code == 200
+    assert time.monotonic() - started >= 3 * 0.2
+
+
+def test_batch_loads_document_and_practices_once(api_client, stub_llm, db_sessionmaker, monkeypatch):
+    add_document(db_sessionmaker)
+    practice_id = practices_registry.all()[0]["id"]
+    lookups = []
+    original_get = practices_registry.get
+    monkeypatch.setattr(practices_registry, "get", lambda pid: lookups.append(pid) or original_get(pid))
+
+    response = api_client.post("/api/generate-batch?fields=project_id", json={
+        "document_id": "doc",
+        "specs": [{"practice_ids": [practice_id], "extra_instructions": f"variant {i}"} for i in range(3)],
+    })
+
+    assert response.status_code == 200
+    assert lookups == [practice_id]
+    assert all(set(r["result"]) == {"project_id"} for r in response.json()["results"])
+
+
+def test_batch_stream_emits_results_as_they_finish(api_client, stub_llm, db_sessionmaker):
+    add_document(db_sessionmaker)
+
+    with api_client.stream("POST", "/api/generate-batch/stream", json={"document_id": "doc", "specs": SPECS}) as response:
+        events = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert [e["type"] for e in events] == ["result", "result", "result", "done"]
+    assert sorted(e["index"] for e in events[:3]) == [0, 1, 2]
+    assert events[-1] == {"type": "done", "completed": 3, "failed": 0}
+
+
+def test_batch_validation(api_client, db_sessionmaker, monkeypatch):
+    add_document(db_sessionmaker)
+    monkeypatch.setattr(settings, "BATCH_MAX_SPECS", 2)
+
+    assert api_client.post("/api/generate-batch", json={"document_id": "missing", "specs": SPECS[:1]}).status_code == 404
+    assert api_client.post("/api/generate-batch", json={"document_id": "doc", "specs": SPECS}).status_code == 400
+    assert api_client.post("/api/generate-batch", json={"document_id": "doc", "specs": []}).status_code == 422
+    unknown_tier = [{**SPECS[0], "tier": "cheapest"}]
+    assert api_client.post("/api/generate-batch", json={"document_id": "doc", "specs": unknown_tier}).status_code == 400
+
+
+def test_batch_specs_use_their_model_tier(api_client, stub_llm, db_sessionmaker):
+    add_document(db_sessionmaker)
+    specs = [{**SPECS[0], "tier": "quality"}, SPECS[1]]
+
+    response = api_client.post("/api/generate-batch", json={"document_id": "doc", "specs": specs})
+
+    assert all(r["status"] == "completed" for r in response.json()["results"])
+    assert sorted(stub_llm.app.state.models) == sorted([settings.GEMINI_MODEL_TIERS["quality"], settings.GEMINI_MODEL])
@@ -0,0 +1,45 @@
+import httpx
+
+from app.services.response_parser import ResponseParser
+from benchmarks import input_corpus
+from benchmarks.bench_e2e import percentile
+from benchmarks.stub_llm import StubLLMServer, sized_response_text
+
+GENERATE_PATH = "/v1beta/models/gemini-2.5-flash:generateContent"
+
+
+def test_stub_knobs():
+    text = sized_response_text(50_000)
+    assert 45_000 < len(text) < 55_000
+    assert len(ResponseParser.parse(text)["files"]) == 12
+
+    with StubLLMServer(latency=0, failure_rate=1.0) as failing:
+        assert httpx.post(failing.base_url + GENERATE_PATH, json={}).status_code == 503
+        assert failing.app.state.failures == 1
+
+    with StubLLMServer(latency=0, response_size=8_000, tokens_per_second=20_000) as stub:
+        response = httpx.post(stub.base_url + GENERATE_PATH, json={})
+        assert response.status_code == 200
+        assert response.elapsed.total_seconds() >= 0.1  # 2000 output tokens at 20k/s
+        assert response.json()["usageMetadata"]["candidatesTokenCount"] >= 1900
+
+
+def test_generated_corpus_uploads(api_client):
+    corpus = input_corpus.generate(3, sections=4)
+
+    assert [d.filename.rsplit(".", 1)[1] for d in corpus] == ["docx", "pdf", "md"]
+    assert input_corpus.generate(3, sections=4)[2].content == corpus[2].content
+    for document in corpus:
+        response = api_client.post(
+            "/api/upload", files={"file": (document.filename, document.content, document.mime_type)}
+        )
+        assert response.status_code == 200, response.text
+        assert "The system shall" in response.json()["content_preview"]
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([3.0], 0.95) == 3
+    assert percentile([], 0.5) == 0
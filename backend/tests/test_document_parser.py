@@ -0,0 +1,54 @@
+import fitz
+import pytest
+
+from app.services.document_parser import DocumentParser
+from app.services.parse_pool import ParsePool
+
+
+def numbered_pages(count):
+    return [f"Page {i + 1}" for i in range(count)]
+
+
+def test_iter_pdf_pages_yields_in_order_and_stops_early(make_pdf, monkeypatch):
+    loaded = []
+    original = fitz.Document.load_page
+    monkeypatch.setattr(fitz.Document, "load_page", lambda doc, n: loaded.append(n) or original(doc, n))
+
+    pages = DocumentParser.iter_pdf_pages(make_pdf(numbered_pages(10)))
+    assert "Page 1" in next(pages)
+    assert "Page 2" in next(pages)
+    pages.close()
+    assert [n for n in loaded if n >= 0] == [0, 1]
+
+
+def test_pypdf2_fallback_is_per_page(make_pdf, monkeypatch):
+    original = fitz.Page.get_text
+
+    def flaky_get_text(page, *args, **kwargs):
+        if page.number == 1:
+            raise RuntimeError("broken content stream")
+        return original(page, *args, **kwargs)
+
+    monkeypatch.setattr(fitz.Page, "get_text", flaky_get_text)
+    pages = list(DocumentParser.iter_pdf_pages(make_pdf(numbered_pages(3))))
+    assert [f"Page {i}" in text for i, text in enumerate(pages, 1)] == [True, True, True]
+
+
+def test_extract_range(make_pdf):
+    pages = DocumentParser.extract_pdf_pages(make_pdf(numbered_pages(6)), 2, 4)
+    assert len(pages) == 2
+    assert "Page 3" in pages[0] and "Page 4" in pages[1]
+
+
+@pytest.mark.asyncio
+async def test_pool_fans_out_page_ranges_in_order(make_pdf):
+    pool = ParsePool(workers=2, timeout=30)
+    try:
+        await pool.warm_up()
+        pages = [text async for text in pool.iter_pdf_pages(make_pdf(numbered_pages(7)), pages_per_task=2)]
+        content, file_type = await pool.parse(make_pdf(numbered_pages(7)), "spec.pdf")
+    finally:
+        pool.shutdown()
+    assert [f"Page {i}" in text for i, text in enumerate(pages, 1)] == [True] * 7
+    assert file_type == "pdf"
+    assert content == "\n".join(pages)
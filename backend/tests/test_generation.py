@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services.generation_cache import generation_cache
+from benchmarks.stub_llm import StubLLMServer
+
+
+def test_generate_code(api_client, stub_llm):
+    response = api_client.post("/api/generate-code", json={"prompt": "hello"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["download_url"] == f"/api/download/{body['project_id']}"
+    assert stub_llm.app.state.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_code_does_not_block_event_loop(isolated_app, stub_llm):
+    transport = httpx.ASGITransport(app=isolated_app)
+    async with isolated_app.router.lifespan_context(isolated_app), \
+            httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        started = time.monotonic()
+        generations = [
+            asyncio.create_task(client.post("/api/generate-code", json={"prompt": f"p{i}"}))
+            for i in range(5)
+        ]
+        await asyncio.sleep(0.05)
+
+        health = await client.get("/health")
+        health_latency = time.monotonic() - started
+
+        responses = await asyncio.gather(*generations)
+        elapsed = time.monotonic() - started
+
+    assert health.status_code == 200
+    assert health_latency < 0.2
+    assert all(r.status_code == 200 for r in responses)
+    # Five 0.2s calls overlap instead of running back to back
+    assert elapsed < 5 * 0.2
+
+
+def test_database_work_runs_off_the_event_loop(api_client, stub_llm, monkeypatch):
+    on_loop = []
+    commit = Session.commit
+
+    def tracking_commit(session):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return commit(session)
+
+    monkeypatch.setattr(Session, "commit", tracking_commit)
+    first = api_client.post("/api/generate-code", json={"prompt": "hello"}).json()
+    # Served from the generation_cache row, which bumps its hit count
+    generation_cache.clear_memory()
+    assert api_client.post("/api/generate-code", json={"prompt": "hello"}).json()["cached"] is True
+    assert api_client.get(first["download_url"]).status_code == 200
+
+    # Project save, cache entry and cache hit, none of them on the event loop
+    assert len(on_loop) >= 3
+    assert not any(on_loop)
+
+
+def test_gemini_client_is_shared_across_requests(api_client, stub_llm):
+    api_client.post("/api/generate-code", json={"prompt": "first"})
+    client = api_client.app.state.gemini_client_provider.get()
+    api_client.post("/api/generate-code", json={"prompt": "second"})
+    assert api_client.app.state.gemini_client_provider.get() is client
+
+
+def test_transient_errors_are_retried(api_client, monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_RETRY_MAX_WAIT_SECONDS", 0.01)
+    with StubLLMServer(latency=0, fail_first=2) as server:
+        monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+        monkeypatch.setattr(settings, "GEMINI_BASE_URL", server.base_url)
+
+        response = api_client.post("/api/generate-code", json={"prompt": "hello"})
+    assert response.status_code == 200
+    assert server.app.state.requests == 3
+
+
+def test_retries_give_up_after_configured_attempts(api_client, monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_RETRY_MAX_WAIT_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "GEMINI_RETRY_ATTEMPTS", 2)
+    with StubLLMServer(latency=0, fail_first=5) as server:
+        monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+        monkeypatch.setattr(settings, "GEMINI_BASE_URL", server.base_url)
+
+        response = api_client.post("/api/generate-code", json={"prompt": "hello"})
+    assert response.status_code == 500
+    assert server.app.state.requests == 2
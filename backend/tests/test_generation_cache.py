@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+from app.models.models import GeneratedProject, GenerationCacheEntry
+from app.services.artifact_store import get_artifact_store
+from app.services.generation_cache import GenerationCache, generation_cache
+
+
+def test_identical_prompt_hits_cache(api_client, stub_llm):
+    first = api_client.post("/api/generate-code", json={"prompt": "build a todo app"}).json()
+    second = api_client.post("/api/generate-code", json={"prompt": "build a todo app  \r\n"}).json()
+
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["project_id"] == first["project_id"]
+    assert second["files"] == first["files"]
+    assert stub_llm.app.state.requests == 1
+
+
+def test_persistent_tier_survives_memory_loss(api_client, stub_llm):
+    first = api_client.post("/api/generate-code", json={"prompt": "hello"}).json()
+    generation_cache.clear_memory()
+
+    second = api_client.post("/api/generate-code", json={"prompt": "hello"}).json()
+    assert second["cached"] is True
+    assert second["download_url"] == first["download_url"]
+    assert api_client.get(second["download_url"]).status_code == 200
+
+
+def test_use_cache_false_bypasses_lookup(api_client, stub_llm):
+    first = api_client.post("/api/generate-code", json={"prompt": "hello"}).json()
+    second = api_client.post("/api/generate-code", json={"prompt": "hello", "use_cache": False}).json()
+
+    assert second["cached"] is False
+    assert second["project_id"] != first["project_id"]
+    assert stub_llm.app.state.requests == 2
+
+
+def test_expired_entry_misses(api_client, stub_llm, db_sessionmaker):
+    api_client.post("/api/generate-code", json={"prompt": "hello"})
+    generation_cache.clear_memory()
+
+    db = db_sessionmaker()
+    db.query(GenerationCacheEntry).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    db.close()
+
+    assert api_client.post("/api/generate-code", json={"prompt": "hello"}).json()["cached"] is False
+    assert stub_llm.app.state.requests == 2
+
+
+def test_entry_with_evicted_zip_still_hits(api_client, stub_llm, db_sessionmaker):
+    first = api_client.post("/api/generate-code", json={"prompt": "hello"}).json()
+    generation_cache.clear_memory()
+
+    db = db_sessionmaker()
+    project = db.query(GeneratedProject).filter(GeneratedProject.project_id == first["project_id"]).one()
+    get_artifact_store().delete(project.artifact_key)
+    db.close()
+
+    second = api_client.post("/api/generate-code", json={"prompt": "hello"}).json()
+    assert second["cached"] is True
+    assert api_client.get(second["download_url"]).status_code == 200
+
+
+def test_entry_without_project_misses(api_client, stub_llm, db_sessionmaker):
+    api_client.post("/api/generate-code", json={"prompt": "hello"})
+    generation_cache.clear_memory()
+
+    db = db_sessionmaker()
+    db.query(GeneratedProject).delete()
+    db.commit()
+    db.close()
+
+    assert api_client.post("/api/generate-code", json={"prompt": "hello"}).json()["cached"] is False
+
+
+def test_key_depends_on_model():
+    assert GenerationCache.make_key("p", "model-a") != GenerationCache.make_key("p", "model-b")
+    assert GenerationCache.make_key("a \nb", "m") == GenerationCache.make_key("a\r\nb\n", "m")
@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import NullPool
+
+from app.api.history import fetch_page
+from app.database import create_async_db_engine
+from app.models.models import Document, GeneratedProject
+from app.services.search_index import fts5_query
+
+
+def upload(api_client, name, text):
+    response = api_client.post("/api/upload", files={"file": (name, text.encode(), "text/markdown")})
+    assert response.status_code == 200
+    return response.json()["document_id"]
+
+
+def test_documents_keyset_pages_newest_first(api_client):
+    ids = [upload(api_client, f"spec_{i}.md", f"# Spec {i}\nBuild service number {i}") for i in range(5)]
+
+    first = api_client.get("/api/documents", params={"limit": 2}).json()
+    second = api_client.get("/api/documents", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    last = api_client.get("/api/documents", params={"limit": 2, "cursor": second["next_cursor"]}).json()
+
+    pages = [first, second, last]
+    assert [item["document_id"] for page in pages for item in page["items"]] == ids[::-1]
+    assert last["next_cursor"] is None
+    assert first["items"][0]["filename"] == "spec_4.md"
+    assert api_client.get("/api/documents", params={"cursor": "not a cursor!"}).status_code == 400
+
+
+def test_search_documents_and_projects(api_client, db_sessionmaker):
+    upload(api_client, "billing.md", "Invoices are reconciled nightly against the ledger")
+    upload(api_client, "shop.md", "A catálogo of products with a shopping cart")
+    with db_sessionmaker() as db:
+        db.add_all([
+            GeneratedProject(project_id="p1", prompt="Build an invoice reconciliation job"),
+            GeneratedProject(project_id="p2", prompt="Build a shopping cart"),
+        ])
+        db.commit()
+
+    def search(path, q):
+        return api_client.get(path, params={"q": q}).json()["items"]
+
+    assert [d["filename"] for d in search("/api/documents", "ledger reconciled")] == ["billing.md"]
+    assert [d["filename"] for d in search("/api/documents", "catalogo")] == ["shop.md"]  # accents folded
+    assert search("/api/documents", "ledger cart") == []
+    assert search("/api/documents", 'AND "OR ( NEAR') == []  # FTS5 syntax is quoted away
+    assert [p["project_id"] for p in search("/api/projects", "cart")] == ["p2"]
+    assert search("/api/projects", "shopping")[0]["download_url"] == "/api/download/p2"
+
+    # Index follows updates and deletes
+    with db_sessionmaker() as db:
+        project = db.query(GeneratedProject).filter_by(project_id="p1").one()
+        project.prompt = "Build a ledger export"
+        db.delete(db.query(GeneratedProject).filter_by(project_id="p2").one())
+        db.commit()
+    assert search("/api/projects", "cart") == []
+    assert search("/api/projects", "invoice") == []
+    assert [p["project_id"] for p in search("/api/projects", "ledger")] == ["p1"]
+
+
+@pytest.mark.asyncio
+async def test_listing_never_loads_large_columns(db_sessionmaker, tmp_path):
+    with db_sessionmaker() as db:
+        db.add(Document(document_id="d1", filename="big.md", content="requirement " * 100_000, file_type="md"))
+        db.commit()
+
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    try:
+        async with AsyncSession(engine) as db:
+            rows, next_cursor = await fetch_page(
+                db, Document, (Document.id, Document.filename), Document.content, "requirement", None, 10
+            )
+    finally:
+        await engine.dispose()
+
+    assert len(rows) == 1 and next_cursor is None
+    document, preview = rows[0]
+    assert len(preview) == 201
+    assert "content" not in document.__dict__  # deferred, never loaded
+    select_list = statements[-1].split(" FROM ")[0]
+    assert "documents.content" not in select_list.replace("substr(documents.content", "")
+
+
+def test_fts5_query_quotes_words():
+    assert fts5_query('say "hi" now') == '"say" """hi""" "now"'
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.models.models import GenerationJob
+from app.services.generative import GenerativeService
+from app.services.job_queue import GenerationJobQueue
+
+
+def wait_for_job(client, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/generate-code/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_submit_and_poll_job(api_client, stub_llm):
+    response = api_client.post("/api/generate-code/jobs", json={"prompt": "hello"})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    job = wait_for_job(api_client, job_id)
+    assert job["status"] == "completed"
+    assert job["result"]["project_id"] == job["project_id"]
+    assert api_client.get(job["result"]["download_url"]).status_code == 200
+
+
+def test_queue_full_returns_429(isolated_app, stub_llm, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_JOB_WORKERS", 1)
+    monkeypatch.setattr(settings, "GENERATION_QUEUE_MAX_DEPTH", 1)
+    with TestClient(isolated_app) as client:
+        statuses = [
+            client.post("/api/generate-code/jobs", json={"prompt": f"p{i}"}).status_code
+            for i in range(3)
+        ]
+    assert statuses[0] == 202
+    assert 429 in statuses
+
+
+def test_job_events_stream(api_client, stub_llm):
+    job_id = api_client.post("/api/generate-code/jobs", json={"prompt": "hello"}).json()["job_id"]
+
+    with api_client.stream("GET", f"/api/generate-code/jobs/{job_id}/events") as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            json.loads(line[len("data: "):])
+            for line in response.iter_lines()
+            if line.startswith("data: ")
+        ]
+
+    assert events[-1]["status"] == "completed"
+    assert events[-1]["result"]["project_id"] == events[-1]["project_id"]
+
+
+def test_unfinished_jobs_resume_after_restart(isolated_app, db_sessionmaker, stub_llm):
+    db = db_sessionmaker()
+    db.add(GenerationJob(job_id="interrupted", status="generating", prompt="hello"))
+    db.commit()
+    db.close()
+
+    with TestClient(isolated_app) as client:
+        job = wait_for_job(client, "interrupted")
+    assert job["status"] == "completed"
+
+
+def test_jobs_running_in_a_live_worker_are_not_requeued(isolated_app, db_sessionmaker, stub_llm):
+    db = db_sessionmaker()
+    db.add(GenerationJob(
+        job_id="elsewhere", status="generating", prompt="hello", owner="other-worker", heartbeat_at=datetime.utcnow()
+    ))
+    db.add(GenerationJob(
+        job_id="abandoned", status="generating", prompt="hello", owner="dead-worker",
+        heartbeat_at=datetime.utcnow() - timedelta(seconds=settings.GENERATION_JOB_STALE_SECONDS + 1)
+    ))
+    db.commit()
+    db.close()
+
+    with TestClient(isolated_app) as client:
+        assert wait_for_job(client, "abandoned")["status"] == "completed"
+        assert client.get("/api/generate-code/jobs/elsewhere").json()["status"] == "generating"
+    assert stub_llm.app.state.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_a_job_is_claimed_by_one_worker_only(db_sessionmaker, stub_llm, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the project ZIP goes to the local artifact store
+    db = db_sessionmaker()
+    db.add(GenerationJob(job_id="shared", status="queued", prompt="hello"))
+    db.commit()
+    db.close()
+    workers = [GenerationJobQueue(db_sessionmaker, GenerativeService()) for _ in range(2)]
+
+    # Both workers picked the job up from the table (e.g. two processes starting at once)
+    await asyncio.gather(*(worker._process("shared") for worker in workers))
+
+    job = workers[0].get_job("shared")
+    assert job["status"] == "completed"
+    assert stub_llm.app.state.requests == 1
+    for worker in workers:
+        await worker._generative_service.client_provider.aclose()
+
+
+def test_job_runs_in_requested_output_mode(api_client, stub_llm):
+    response = api_client.post("/api/generate-code/jobs", json={"prompt": "hello", "output_mode": "structured"})
+
+    job = wait_for_job(api_client, response.json()["job_id"])
+    assert job["status"] == "completed"
+    assert stub_llm.app.state.bodies[-1]["generationConfig"]["responseMimeType"] == "application/json"
+    assert job["result"]["commands"] == ["python main.py"]
+
+
+def test_job_uses_requested_model_tier(api_client, stub_llm):
+    unknown = api_client.post("/api/generate-code/jobs", json={"prompt": "hello", "tier": "cheapest"})
+    response = api_client.post("/api/generate-code/jobs", json={"prompt": "hello", "tier": "fast"})
+
+    assert unknown.status_code == 400
+    assert wait_for_job(api_client, response.json()["job_id"])["status"] == "completed"
+    assert stub_llm.app.state.models == [settings.GEMINI_MODEL_TIERS["fast"]]
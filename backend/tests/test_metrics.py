@@ -0,0 +1,96 @@
+import logging
+
+import pytest
+
+from app.config import settings
+from app.services.generative import _log_content
+from app.services.metrics import (
+    DB_COMMIT_DURATION,
+    HTTP_REQUEST_DURATION,
+    LLM_REQUEST_DURATION,
+    Metric,
+    MetricsRegistry,
+    PROMPT_COMPOSE_DURATION,
+    UPLOAD_PARSE_DURATION,
+    ZIP_BUILD_DURATION,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("work_seconds", "Work", ("kind",), buckets=(0.1, 1))
+    histogram.observe(0.05, kind="a")
+    histogram.observe(0.5, kind="a")
+    histogram.observe(5, kind='we"ird')
+
+    text = registry.render()
+
+    assert "# TYPE work_seconds histogram" in text
+    assert 'work_seconds_bucket{kind="a",le="0.1"} 1' in text
+    assert 'work_seconds_bucket{kind="a",le="1"} 2' in text
+    assert 'work_seconds_bucket{kind="a",le="+Inf"} 2' in text
+    assert 'work_seconds_count{kind="a"} 2' in text
+    assert 'work_seconds_bucket{kind="we\\"ird",le="1"} 0' in text
+
+
+def test_metric_types_must_render():
+    class Unrendered(Metric):
+        type = "gauge"
+
+    with pytest.raises(TypeError):
+        Unrendered("unrendered", "Never rendered")
+
+
+def test_hot_paths_are_recorded_and_exposed(api_client, stub_llm):
+    before = {
+        "upload": UPLOAD_PARSE_DURATION.count(file_type="txt"),
+        "compose": PROMPT_COMPOSE_DURATION.count(),
+        "llm": LLM_REQUEST_DURATION.count(mode="text", outcome="ok"),
+        "zip": ZIP_BUILD_DURATION.count(),
+        "commit": DB_COMMIT_DURATION.count(),
+    }
+
+    upload = api_client.post("/api/upload", files={"file": ("spec.txt", b"Build a CLI", "text/plain")})
+    document_id = upload.json()["document_id"]
+    composed = api_client.post("/api/compose-prompt", json={"document_id": document_id})
+    assert composed.status_code == 200
+    generated = api_client.post("/api/generate-code", json={"prompt": "metrics", "use_cache": False})
+    assert generated.status_code == 200
+
+    assert UPLOAD_PARSE_DURATION.count(file_type="txt") == before["upload"] + 1
+    assert PROMPT_COMPOSE_DURATION.count() == before["compose"] + 1
+    assert LLM_REQUEST_DURATION.count(mode="text", outcome="ok") == before["llm"] + 1
+    assert ZIP_BUILD_DURATION.count() == before["zip"] + 1
+    assert DB_COMMIT_DURATION.count() >= before["commit"] + 2
+    # Labelled by route template, not by the concrete path
+    assert HTTP_REQUEST_DURATION.count(method="POST", route="/api/upload", status="200") >= 1
+
+    response = api_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'llm_request_duration_seconds_count{mode="text",outcome="ok"}' in response.text
+    assert "generations_in_flight 0" in response.text
+    assert 'generation_cache_requests_total{result="miss"}' in response.text
+    assert 'route="/api/generate-code"' in response.text
+
+
+def test_unmatched_paths_share_one_label(api_client):
+    api_client.get("/no/such/path/123")
+
+    assert HTTP_REQUEST_DURATION.count(method="GET", route="unmatched", status="404") >= 1
+    assert "/no/such/path/123" not in api_client.get("/metrics").text
+
+
+def test_content_logging_is_off_by_default(caplog, monkeypatch):
+    caplog.set_level(logging.INFO)
+
+    _log_content("Prompt recebido", "secret document " * 10)
+    assert "secret" not in caplog.text
+    assert "160 caracteres" in caplog.text
+
+    caplog.clear()
+    monkeypatch.setattr(settings, "LOG_CONTENT", True)
+    monkeypatch.setattr(settings, "LOG_CONTENT_MAX_CHARS", 16)
+    _log_content("Prompt recebido", "secret document " * 10)
+    assert "secret document ... [144 caracteres omitidos]" in caplog.text
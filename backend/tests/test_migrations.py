@@ -0,0 +1,63 @@
+import logging
+import subprocess
+import sys
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+
+from app.database import Base, create_db_engine
+from app.migrations import (
+    BACKEND_DIR, check_schema, current_revision, head_revision, include_name, upgrade_to_head
+)
+
+
+@pytest.fixture
+def dev_engine(tmp_path, monkeypatch):
+    # Dev settings point at ./promptcodegen.db, for the app and Alembic alike
+    monkeypatch.chdir(tmp_path)
+    engine = create_db_engine("sqlite:///./promptcodegen.db")
+    yield engine
+    engine.dispose()
+
+
+def test_migrations_match_models(dev_engine):
+    upgrade_to_head()
+
+    assert current_revision(dev_engine) == head_revision()
+    with dev_engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"include_name": include_name})
+        assert compare_metadata(context, Base.metadata) == []
+
+
+def test_upgrade_adopts_create_all_database(dev_engine):
+    # Databases created by the old create_all-at-import have every table but no alembic_version
+    Base.metadata.create_all(bind=dev_engine)
+
+    upgrade_to_head()
+
+    assert current_revision(dev_engine) == head_revision()
+
+
+def test_check_schema_modes(dev_engine, caplog):
+    with caplog.at_level(logging.WARNING):
+        check_schema(dev_engine, "warn")
+    assert "alembic upgrade head" in caplog.text
+
+    with pytest.raises(RuntimeError):
+        check_schema(dev_engine, "fail")
+
+    check_schema(dev_engine, "upgrade")
+    check_schema(dev_engine, "fail")
+
+
+def test_app_import_skips_parser_libraries():
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print(sorted({'docx', 'fitz', 'PyPDF2'} & set(sys.modules)))"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+    assert loaded == "[]"
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from app.config import settings
+from app.services.model_router import model_router
+from benchmarks.stub_llm import StubLLMServer
+
+
+@pytest.fixture
+def stub_models(monkeypatch):
+    """Start a stub LLM with the given options, routed between a primary and a fallback model"""
+    monkeypatch.setattr(settings, "GEMINI_MODEL", "primary-model")
+    monkeypatch.setattr(settings, "GEMINI_FALLBACK_MODEL", "backup-model")
+    monkeypatch.setattr(settings, "GEMINI_RETRY_ATTEMPTS", 1)
+    servers = []
+
+    def start(**kwargs):
+        server = StubLLMServer(**kwargs)
+        servers.append(server.__enter__())
+        monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+        monkeypatch.setattr(settings, "GEMINI_BASE_URL", server.base_url)
+        return server
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+def test_routes_by_tier_and_prompt_size(api_client, stub_models, monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_LARGE_PROMPT_MODEL", "large-model")
+    monkeypatch.setattr(settings, "GEMINI_LARGE_PROMPT_TOKENS", 100)
+    server = stub_models(latency=0)
+
+    small = api_client.post("/api/generate-code", json={"prompt": "small"})
+    large = api_client.post("/api/generate-code", json={"prompt": "x" * 1000})
+    fast = api_client.post("/api/generate-code", json={"prompt": "x" * 1000, "tier": "fast"})
+    unknown = api_client.post("/api/generate-code", json={"prompt": "hello", "tier": "cheapest"})
+
+    assert [r.status_code for r in (small, large, fast)] == [200, 200, 200]
+    assert server.app.state.models == ["primary-model", "large-model", settings.GEMINI_MODEL_TIERS["fast"]]
+    assert unknown.status_code == 400
+
+
+def test_failing_model_falls_back(api_client, stub_models):
+    server = stub_models(latency=0, failing_models=["primary-model"])
+
+    response = api_client.post("/api/generate-code", json={"prompt": "hello"})
+
+    assert response.status_code == 200
+    assert server.app.state.models == ["primary-model", "backup-model"]
+    stats = api_client.get("/api/generate-code/models/stats").json()["models"]
+    assert stats["primary-model"]["errors"] == 1
+    assert stats["backup-model"]["calls"] == 1
+    assert stats["backup-model"]["fallbacks"] == 1
+
+
+def test_slow_model_times_out_and_falls_back(api_client, stub_models, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_MODEL_TIMEOUT_SECONDS", 0.3)
+    server = stub_models(latency=0, model_latency={"primary-model": 2.0})
+
+    started = time.monotonic()
+    response = api_client.post("/api/generate-code", json={"prompt": "hello"})
+
+    assert response.status_code == 200
+    assert time.monotonic() - started < 1.5
+    assert server.app.state.models == ["primary-model", "backup-model"]
+    stats = model_router.snapshot()
+    assert stats["primary-model"]["timeouts"] == 1
+    assert stats["primary-model"]["cancelled"] == 1
+
+
+def test_slow_call_is_hedged_and_the_loser_cancelled(api_client, stub_models, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_HEDGE_MIN_SAMPLES", 3)
+    monkeypatch.setattr(settings, "GENERATION_HEDGE_MIN_DELAY_SECONDS", 0.05)
+    for _ in range(3):
+        model_router.stats("primary-model").record(True, 0.1)
+    # The first request is stuck, its duplicate answers quickly
+    server = stub_models(latencies=[2.0, 0.05])
+
+    started = time.monotonic()
+    response = api_client.post("/api/generate-code", json={"prompt": "hello"})
+
+    assert response.status_code == 200
+    assert time.monotonic() - started < 1.0
+    assert server.app.state.models == ["primary-model", "primary-model"]
+    stats = model_router.snapshot()["primary-model"]
+    assert (stats["hedges"], stats["hedge_wins"], stats["cancelled"]) == (1, 1, 1)
+    assert "backup-model" not in model_router.snapshot()
+
+
+def test_failing_model_is_tried_after_the_fallback(monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_MODEL", "primary-model")
+    monkeypatch.setattr(settings, "GEMINI_FALLBACK_MODEL", "backup-model")
+    assert model_router.candidates("hello") == ["primary-model", "backup-model"]
+
+    for _ in range(settings.GENERATION_MODEL_MIN_CALLS):
+        model_router.stats("primary-model").record(False)
+
+    assert model_router.candidates("hello") == ["backup-model", "primary-model"]
+    model_router.reset()
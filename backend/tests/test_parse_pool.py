@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+from app.services.parse_pool import ParsePool, ParseTimeoutError
+
+
+@pytest.mark.asyncio
+async def test_parse_in_worker_process(make_pdf):
+    pool = ParsePool(workers=1, timeout=30)
+    try:
+        await pool.warm_up()
+        content, file_type = await pool.parse(make_pdf(["Checkout flow"]), "spec.pdf")
+    finally:
+        pool.shutdown()
+    assert file_type == "pdf"
+    assert "Checkout flow" in content
+
+
+@pytest.mark.asyncio
+async def test_timeout_kills_worker_and_pool_recovers():
+    pool = ParsePool(workers=1, timeout=1)
+    try:
+        await pool.warm_up()
+        with pytest.raises(ParseTimeoutError):
+            await pool.run(time.sleep, 30)
+
+        content, _ = await pool.parse(b"# Still alive", "notes.md")
+    finally:
+        pool.shutdown()
+    assert content == "# Still alive"
+
+
+def test_upload_parses_through_app_pool(api_client, make_pdf, monkeypatch):
+    pool = ParsePool(workers=1, timeout=30)
+    monkeypatch.setattr(api_client.app.state, "parse_pool", pool)
+    try:
+        response = api_client.post("/api/upload", files={"file": ("spec.pdf", make_pdf(["Invoices"]), "application/pdf")})
+    finally:
+        pool.shutdown()
+    assert response.status_code == 200
+    assert "Invoices" in response.json()["content_preview"]
+
+
+def test_upload_parse_timeout_returns_422(api_client, monkeypatch):
+    class SlowPool(ParsePool):
+        async def parse(self, source, filename):
+            raise ParseTimeoutError("Document parsing timed out after 1s")
+
+    monkeypatch.setattr(api_client.app.state, "parse_pool", SlowPool(workers=0))
+    response = api_client.post("/api/upload", files={"file": ("spec.md", b"# Spec", "text/markdown")})
+    assert response.status_code == 422
+    assert "timed out" in response.json()["detail"]
@@ -0,0 +1,55 @@
+import os
+
+from app.config import settings
+from app.models.models import Document
+from app.services.practices_registry import PracticesRegistry, practices_registry
+
+
+def test_practices_etag_revalidation(api_client):
+    first = api_client.get("/api/practices")
+    etag = first.headers["etag"]
+    assert len(first.json()["practices"]) > 0
+
+    cached = api_client.get("/api/practices", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    stale = api_client.get("/api/practices", headers={"If-None-Match": '"stale"'})
+    assert stale.status_code == 200
+
+
+def test_registry_reloads_only_changed_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PRACTICES_RELOAD_INTERVAL_SECONDS", 0)
+    (tmp_path / "a.md").write_text("# A\nFirst rule", encoding="utf-8")
+    (tmp_path / "b.md").write_text("# B\nSecond rule", encoding="utf-8")
+
+    registry = PracticesRegistry(str(tmp_path))
+    assert registry.refresh() == 2
+    etag = registry.etag
+    assert registry.refresh() == 0
+    assert registry.etag == etag
+
+    (tmp_path / "a.md").write_text("# A\nChanged rule", encoding="utf-8")
+    os.utime(tmp_path / "a.md", ns=(1, 1))
+    (tmp_path / "b.md").unlink()
+    assert registry.refresh() == 2
+    assert registry.get("a")["excerpt"] == "Changed rule"
+    assert registry.get("b") is None
+    assert registry.etag != etag
+
+
+def test_compose_prompt_includes_selected_practice(api_client, db_sessionmaker):
+    db = db_sessionmaker()
+    db.add(Document(document_id="doc", filename="spec.md", content="Build an API", file_type="md"))
+    db.commit()
+    db.close()
+
+    practice = practices_registry.all()[0]
+    response = api_client.post("/api/compose-prompt", json={
+        "document_id": "doc",
+        "practice_ids": [practice["id"], "missing"],
+    })
+    assert response.status_code == 200
+    prompt = response.json()["prompt"]
+    assert f"### {practice['title']}" in prompt
+    assert "Build an API" in prompt
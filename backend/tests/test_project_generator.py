@@ -0,0 +1,58 @@
+import io
+import json
+import zipfile
+
+from app.config import settings
+from app.models.models import GeneratedProject
+from app.services.project_generator import ProjectGenerator
+
+PROJECT = {
+    "files": [
+        {"path": "backend/main.py", "content": "print('hi')\n"},
+        {"path": "../../etc/passwd", "content": "nope"},
+        {"path": "README.md", "content": "replaced by the generated README"},
+    ],
+    "instructions": ["Run it"],
+    "commands": ["python backend/main.py"],
+}
+
+
+def read_zip(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as zipf:
+        return {info.filename: (info.compress_type, zipf.read(info).decode()) for info in zipf.infolist()}
+
+
+def test_zip_is_built_from_memory():
+    data = ProjectGenerator.build_project_zip(PROJECT)
+    entries = read_zip(data)
+
+    assert sorted(entries) == [".env.example", "README.md", "backend/main.py", "etc/passwd"]
+    assert entries["backend/main.py"] == (zipfile.ZIP_DEFLATED, "print('hi')\n")
+    assert "- Run it" in entries["README.md"][1]
+    # Deterministic bytes, so identical projects share one artifact
+    assert ProjectGenerator.build_project_zip(PROJECT) == data
+
+
+def test_streamed_zip_matches_and_respects_compression_level(monkeypatch):
+    monkeypatch.setattr(settings, "ZIP_COMPRESSION_LEVEL", 0)
+    buffer = io.BytesIO()
+    ProjectGenerator.write_project_zip(PROJECT, buffer)
+
+    streamed = read_zip(b"".join(ProjectGenerator.stream_project_zip(PROJECT)))
+    assert streamed == read_zip(buffer.getvalue())
+    assert {compress_type for compress_type, _ in streamed.values()} == {zipfile.ZIP_STORED}
+
+
+def test_download_rebuilds_missing_zip_from_files_json(api_client, db_sessionmaker):
+    db = db_sessionmaker()
+    db.add(GeneratedProject(
+        project_id="p1", prompt="x", files_json=json.dumps(PROJECT), zip_path="generated_projects/gone.zip"
+    ))
+    db.commit()
+    db.close()
+
+    response = api_client.get("/api/download/p1")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert 'filename="generated_project_p1.zip"' in response.headers["content-disposition"]
+    assert "backend/main.py" in read_zip(response.content)
@@ -0,0 +1,63 @@
+import json
+import zlib
+
+from app.config import settings
+from app.models.models import GeneratedProject
+from app.services.generation_cache import generation_cache
+from app.services.project_storage import ProjectStorage
+
+
+def stored_project(db_sessionmaker):
+    db = db_sessionmaker()
+    project = db.query(GeneratedProject).one()
+    db.close()
+    return project
+
+
+def test_project_is_stored_once_and_compressed(api_client, stub_llm, db_sessionmaker):
+    body = api_client.post("/api/generate-code", json={"prompt": "build a todo app"}).json()
+    project = stored_project(db_sessionmaker)
+
+    assert project.project_id == body["project_id"]
+    assert project.files_json is None
+    data = json.loads(zlib.decompress(project.project_data))
+    assert "raw_text" not in data
+    assert data["files"] == body["files"]
+    assert ProjectStorage.load(project)["raw_text"] == body["raw_text"]
+
+
+def test_raw_text_can_be_dropped(api_client, stub_llm, db_sessionmaker, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_STORE_RAW_TEXT", False)
+    first = api_client.post("/api/generate-code", json={"prompt": "hello"}).json()
+    assert first["raw_text"]
+    assert stored_project(db_sessionmaker).raw_text is None
+
+    generation_cache.clear_memory()
+    second = api_client.post("/api/generate-code", json={"prompt": "hello"}).json()
+    assert second["cached"] is True
+    assert second["raw_text"] == ""
+    assert second["files"] == first["files"]
+
+
+def test_legacy_rows_still_load():
+    project = GeneratedProject(files_json=json.dumps({"files": [{"path": "a.py", "content": "x"}], "raw_text": "r"}))
+    assert ProjectStorage.has_data(project)
+    assert ProjectStorage.load(project)["raw_text"] == "r"
+    assert "raw_text" not in ProjectStorage.load(project, include_raw_text=False)
+
+
+def test_fields_selects_a_lightweight_response(api_client, stub_llm):
+    body = api_client.post(
+        "/api/generate-code?fields=project_id,download_url", json={"prompt": "hello"}
+    ).json()
+    assert set(body) == {"project_id", "download_url"}
+
+    lines = api_client.post("/api/generate-code/stream?fields=download_url", json={"prompt": "hello"}).text
+    done = json.loads(lines.strip().splitlines()[-1])
+    assert done == {"type": "done", "download_url": body["download_url"]}
+
+
+def test_unknown_field_is_rejected(api_client):
+    response = api_client.post("/api/generate-code?fields=project_id,bogus", json={"prompt": "hello"})
+    assert response.status_code == 400
+    assert "bogus" in response.json()["detail"]
@@ -0,0 +1,116 @@
+import time
+
+from app.config import settings
+from app.models.models import Document
+from app.services.prompt_composer import PromptComposer, estimate_tokens
+from app.snippets import SNIPPETS
+
+
+def sections_by_id(composed):
+    return {section.id: section for section in composed.sections}
+
+
+def test_within_budget_keeps_every_section():
+    composed = PromptComposer.compose("Build an API", ["senior_dev"], [], "Use FastAPI", token_budget=10_000)
+
+    assert not composed.truncated
+    assert composed.estimated_tokens <= 10_000
+    assert composed.prompt.startswith("## Document Requirements\nBuild an API\n")
+    assert f"### {SNIPPETS['senior_dev']['title']}" in composed.prompt
+    assert composed.prompt.index("## Additional Instructions") < composed.prompt.index("## Output Requirements")
+    assert all(section.tokens == section.original_tokens > 0 for section in composed.sections)
+
+
+def test_document_is_cut_first_keeping_head_and_tail():
+    document = "START\n" + ("requirement line\n" * 20_000) + "END"
+
+    composed = PromptComposer.compose(document, ["senior_dev"], [], "Use FastAPI", token_budget=2_000)
+
+    sections = sections_by_id(composed)
+    assert composed.estimated_tokens <= 2_000
+    assert sections["document"].truncated
+    assert sections["document"].tokens < sections["document"].original_tokens
+    assert not sections["snippet:senior_dev"].truncated
+    assert "START" in composed.prompt and "END" in composed.prompt
+    assert "tokens omitted" in composed.prompt
+    assert "Use FastAPI" in composed.prompt
+
+
+def test_lower_priority_sections_cut_before_required_ones():
+    composed = PromptComposer.compose("x" * 40_000, list(SNIPPETS), [], "Keep me", token_budget=300)
+
+    sections = sections_by_id(composed)
+    assert not sections["document"].dropped
+    assert "## Document Requirements" in composed.prompt
+    assert all(section.dropped or section.truncated for id, section in sections.items() if id.startswith("snippet:"))
+    assert not sections["extra_instructions"].truncated
+    assert not sections["output_requirements"].truncated
+    assert composed.estimated_tokens <= 300
+
+
+def test_document_survives_tight_budget():
+    document = "START\n" + ("requirement line\n" * 5_000) + "END"
+    practices = {"tests": {"title": "Testing", "content": "Write unit tests for every endpoint.\n" * 40}}
+
+    composed = PromptComposer.compose(document, list(SNIPPETS), ["tests"], token_budget=500, practices=practices)
+
+    sections = sections_by_id(composed)
+    assert composed.estimated_tokens <= 500
+    assert not sections["document"].dropped
+    assert "START" in composed.prompt and "END" in composed.prompt
+    assert all(
+        section.dropped or section.truncated
+        for id, section in sections.items() if id.startswith(("snippet:", "practice:"))
+    )
+    # At least half of what the output requirements leave
+    room = 500 - sections["output_requirements"].tokens
+    assert sections["document"].tokens >= room * settings.PROMPT_MIN_DOCUMENT_SHARE - 20
+
+
+def test_top_sections_survive_tight_budget():
+    document = "# Intro\n" + "filler text\n" * 200 + "# Payments\nCharge cards via the payments API.\n"
+
+    composed = PromptComposer.compose(
+        document, list(SNIPPETS), [], "Implement the payments API", token_budget=400, section_top_k=1
+    )
+
+    assert "Charge cards via the payments API." in composed.prompt
+    assert composed.estimated_tokens <= 400
+
+
+def test_ten_megabyte_document_composes_in_linear_time():
+    document = "The system shall export every order as CSV.\n" * (10 * 1024 * 1024 // 45)
+
+    started = time.perf_counter()
+    full = PromptComposer.compose(document, list(SNIPPETS), [], token_budget=10 ** 7)
+    cut = PromptComposer.compose(document, list(SNIPPETS), [], token_budget=50_000)
+    elapsed = time.perf_counter() - started
+
+    assert sections_by_id(full)["document"].original_tokens == estimate_tokens(document) + 2
+    assert not full.truncated
+    assert cut.estimated_tokens <= 50_000
+    assert elapsed < 2
+
+
+def test_compose_prompt_reports_sections(api_client, db_sessionmaker):
+    db = db_sessionmaker()
+    db.add(Document(document_id="doc", filename="spec.md", content="Build an API\n" * 5_000, file_type="md"))
+    db.commit()
+    db.close()
+
+    response = api_client.post("/api/compose-prompt", json={
+        "document_id": "doc",
+        "snippet_ids": ["qa_perspective"],
+        "token_budget": 1_000,
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["token_budget"] == 1_000
+    assert body["estimated_tokens"] <= 1_000
+    assert body["truncated"] is True
+    assert [section["id"] for section in body["sections"]] == [
+        "document", "snippet:qa_perspective", "output_requirements"
+    ]
+    assert body["sections"][0]["truncated"] is True
+
+    assert api_client.post("/api/compose-prompt", json={"document_id": "doc", "token_budget": 0}).status_code == 422
@@ -0,0 +1,156 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.models.models import Document
+from app.services.rate_limiter import (
+    Admission, RateLimited, RateLimiter, RedisRateLimitBackend, RouteLimit
+)
+from app.services.redis_client import RedisClient
+from benchmarks.common import free_port
+from benchmarks.stub_redis import StubRedisServer
+
+
+@pytest.fixture
+def limited_app(isolated_app, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_MAX_WAIT_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "RATE_LIMITS", {
+        "upload": {"rate": 0.1, "burst": 2},
+        "generate": {"concurrency": 1},
+    })
+    return isolated_app
+
+
+def upload(client, name, headers=None):
+    return client.post("/api/upload", files={"file": (name, b"# Spec\nBuild it", "text/markdown")}, headers=headers)
+
+
+def test_token_bucket_per_client_answers_429_with_retry_after(limited_app):
+    with TestClient(limited_app) as client:
+        statuses = [upload(client, f"spec_{i}.md").status_code for i in range(3)]
+        rejected = upload(client, "spec_3.md")
+        other_client = upload(client, "other.md", headers={"X-API-Key": "team-b"})
+
+    assert statuses == [200, 200, 429]
+    assert rejected.status_code == 429
+    # One token every 10 seconds
+    assert 9 <= int(rejected.headers["retry-after"]) <= 10
+    assert other_client.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_queues_then_sheds(limited_app, stub_llm, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_MAX_WAIT_SECONDS", 2.0)
+    monkeypatch.setattr(settings, "RATE_LIMIT_MAX_WAITING", 1)
+    transport = httpx.ASGITransport(app=limited_app)
+    async with limited_app.router.lifespan_context(limited_app), \
+            httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Pays the one-off google.genai import outside the concurrent part
+        assert (await client.post("/api/generate-code", json={"prompt": "warm-up"})).status_code == 200
+        generations = [client.post("/api/generate-code", json={"prompt": f"p{i}"}) for i in range(3)]
+        responses = await asyncio.gather(*generations)
+
+    # One runs, one waits for its slot, the third is shed at once
+    assert sorted(r.status_code for r in responses) == [200, 200, 429]
+    assert stub_llm.app.state.requests == 3
+
+
+def test_batch_is_charged_per_spec(limited_app, db_sessionmaker, stub_llm, monkeypatch):
+    monkeypatch.setitem(settings.RATE_LIMITS, "generate", {"rate": 0.1, "burst": 3, "concurrency": 2})
+    db = db_sessionmaker()
+    db.add(Document(document_id="doc", filename="spec.md", content="Build an API", file_type="md"))
+    db.commit()
+    db.close()
+
+    def batch(specs):
+        return client.post("/api/generate-batch", json={
+            "document_id": "doc", "specs": [{"name": f"s{i}", "extra_instructions": str(i)} for i in range(specs)]
+        })
+
+    with TestClient(limited_app) as client:
+        over_budget = batch(4)
+        within_budget = batch(2)
+        rest_of_budget_exceeded = batch(2)
+        limiter = limited_app.state.rate_limiter
+
+    assert over_budget.status_code == 429
+    assert int(over_budget.headers["retry-after"]) == 10
+    assert within_budget.status_code == 200
+    assert [r["status"] for r in within_budget.json()["results"]] == ["completed", "completed"]
+    # One token was left, the batch needed two
+    assert rest_of_budget_exceeded.status_code == 429
+    assert stub_llm.app.state.requests == 2
+    assert limiter.backend._slots == {}  # released once the response was sent
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_shares_limits_between_workers():
+    with StubRedisServer() as server:
+        limit = RouteLimit("generate", rate=0.1, burst=3, concurrency=1)
+        workers = [
+            RateLimiter(RedisRateLimitBackend(RedisClient(server.url), lease_seconds=60), {}, 0.0, 1)
+            for _ in range(2)
+        ]
+
+        # Tokens: concurrent requests on both workers get exactly `burst` between them
+        results = await asyncio.gather(
+            *(workers[i % 2].backend.reserve("generate:ip:1", 0.1, 3, 0.0) for i in range(10)),
+        )
+        assert sum(granted for granted, _ in results) == 3
+
+        # Slots: held on one worker, unavailable on the other until released
+        slot_limit = RouteLimit("slots", concurrency=1)
+        admission = await workers[0].acquire(slot_limit, "ip:1")
+        with pytest.raises(RateLimited) as rejected:
+            await workers[1].acquire(slot_limit, "ip:1")
+        assert rejected.value.reason == "concurrency"
+        await workers[0].release(admission)
+        await workers[1].release(await workers[1].acquire(slot_limit, "ip:1"))
+
+        # A request worth several takes as many slots as the limit allows
+        slot_limit = RouteLimit("slots", concurrency=2)
+        admission = await workers[0].acquire(slot_limit, "ip:2", cost=3)
+        assert admission.slots == 2
+        with pytest.raises(RateLimited):
+            await workers[1].acquire(slot_limit, "ip:2")
+        await workers[0].release(admission)
+        await workers[1].release(await workers[1].acquire(slot_limit, "ip:2", cost=2))
+
+        with pytest.raises(RateLimited):
+            await workers[1].acquire(limit, "ip:1")  # bucket of this client is empty
+
+        for worker in workers:
+            await worker.aclose()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_backend_lets_requests_through():
+    client = RedisClient(f"redis://127.0.0.1:{free_port()}/0", timeout=0.2)
+    limiter = RateLimiter(RedisRateLimitBackend(client, lease_seconds=60), {}, 0.0, 1)
+
+    admission = await limiter.acquire(RouteLimit("generate", rate=1, concurrency=1), "ip:1")
+
+    assert admission == Admission()
+    await limiter.aclose()
+
+
+@pytest.mark.asyncio
+async def test_backend_that_stops_answering_lets_requests_through():
+    async def accept_and_ignore(reader, writer):
+        await reader.read()
+
+    server = await asyncio.start_server(accept_and_ignore, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    limiter = RateLimiter(
+        RedisRateLimitBackend(RedisClient(f"redis://127.0.0.1:{port}/0", timeout=0.2), lease_seconds=60), {}, 0.0, 1
+    )
+
+    admission = await asyncio.wait_for(limiter.acquire(RouteLimit("generate", rate=1, concurrency=1), "ip:1"), 5)
+
+    assert admission == Admission()
+    await limiter.aclose()
+    server.close()
@@ -0,0 +1,97 @@
+import json
+import random
+import time
+
+import pytest
+
+from app.services.generative import GenerativeService
+from app.services.response_parser import JsonObjectScanner, ResponseParser
+from benchmarks.response_corpus import chunked, corpus
+
+
+def parse_chunked(text, seed=0):
+    parser = ResponseParser()
+    for chunk in chunked(text, random.Random(seed), max_chunk=512):
+        parser.feed(chunk)
+    parser.close()
+    return parser.result()
+
+
+def test_nested_json_is_parsed_whole():
+    # The old non-greedy regex stopped at the first "}"
+    text = json.dumps({
+        "files": [{"path": "app.py", "content": "routes = {'/': {'GET': index}}"}],
+        "instructions": "Run it",
+        "meta": {"a": {"b": "}"}},
+    })
+
+    result = GenerativeService()._parse_gemini_response(text)
+
+    assert result["files"] == [{"path": "app.py", "content": "routes = {'/': {'GET': index}}"}]
+    assert result["instructions"] == "Run it"
+    assert "error" not in result
+
+
+def test_stray_braces_before_the_payload_are_skipped():
+    text = 'Use {debug: true} or {"debug": true}.\n```python\nx = {"files": 1}\n```\n' \
+           'Here: {"files": [{"path": "a.py", "content": "print(1)"}]}\nBye {ok}'
+
+    result = ResponseParser.parse(text)
+
+    assert [f["path"] for f in result["files"]] == ["a.py"]
+    # No instructions in the JSON: the text outside code blocks stands in
+    assert result["instructions"].startswith("Use {debug: true}")
+    assert "x = " not in result["instructions"]
+
+
+def test_fenced_json_block_wins_over_fenced_files():
+    text = "### `other.py`\n```python\nprint(0)\n```\n```json\n" \
+           '{"files": [{"path": "main.py", "content": "print(1)"}], "instructions": "go"}\n```'
+
+    result = ResponseParser.parse(text)
+
+    assert [f["path"] for f in result["files"]] == ["main.py"]
+    assert result["instructions"] == "go"
+
+
+def test_fenced_files_fallback_and_parse_error():
+    fenced = ResponseParser.parse("Setup:\n### `src/main.py`\n```python\nprint(1)\n```\nRun it.")
+    assert fenced["files"] == [{"path": "src/main.py", "content": "print(1)"}]
+    assert fenced["instructions"] == "Setup:\n### `src/main.py`\nRun it."
+
+    failed = ResponseParser.parse("Sorry, I cannot help with {that.")
+    assert failed["files"] == []
+    assert "error" in failed
+
+
+def test_truncated_fenced_json_block_is_still_read():
+    text = '```json\n{"files": [{"path": "a.py", "content": "x"}]}\n'
+
+    assert [f["path"] for f in ResponseParser.parse(text)["files"]] == ["a.py"]
+
+
+def test_scanner_abandons_unterminated_strings():
+    scanner = JsonObjectScanner(required_key="files")
+    for line in ['{"note": "oops', '{"files": []}']:
+        scanner.feed_line(line)
+
+    assert scanner.result == {"files": []}
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_fuzz_corpus_whole_chunked_and_truncated(seed):
+    rng = random.Random(seed)
+    for name, text, expected in corpus(64 * 1024, seed=seed):
+        whole = ResponseParser.parse(text)
+        assert [f["path"] for f in whole["files"]] == (expected or []), name
+        assert parse_chunked(text, seed) == whole, name
+
+        # Cut anywhere, as a dropped stream would: never raises
+        ResponseParser.parse(text[:rng.randrange(len(text))])
+
+
+def test_multi_megabyte_responses_parse_in_linear_time():
+    started = time.perf_counter()
+    for name, text, expected in corpus(2 * 1024 * 1024):
+        assert [f["path"] for f in parse_chunked(text)["files"]] == (expected or []), name
+    assert time.perf_counter() - started < 5
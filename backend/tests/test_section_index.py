@@ -0,0 +1,97 @@
+import io
+
+import docx
+
+from app.models.models import Document
+from app.services.document_parser import DocumentParser
+from app.services.prompt_composer import PromptComposer
+from app.services.section_index import SectionIndex, split_sections
+
+SPEC = """# Inventory Platform
+Overview of the platform.
+
+## Authentication
+Users sign in with email and password; sessions expire after one hour.
+
+## Billing
+Invoices are generated monthly. Each invoice lists payments and refunds.
+Overdue invoices trigger a reminder email.
+
+## Reporting
+```
+# not a heading inside code
+```
+Managers export sales reports as CSV.
+"""
+
+
+def test_split_at_headings_outside_code():
+    sections = split_sections(SPEC)
+
+    assert [s.title for s in sections] == ["Inventory Platform", "Authentication", "Billing", "Reporting"]
+    assert sections[2].text(SPEC).startswith("## Billing\nInvoices")
+    assert "# not a heading" in sections[3].text(SPEC)
+
+
+def test_long_sections_are_split_in_parts_with_the_heading_repeated():
+    content = "## Rules\n" + "\n\n".join(f"Rule {i} applies to every order." for i in range(200))
+
+    sections = split_sections(content, max_chars=1000)
+
+    assert len(sections) > 5
+    assert all(s.end - s.start <= 1000 for s in sections)
+    assert sections[1].text(content).startswith("## Rules (cont.)\nRule")
+    assert "".join(content[s.start:s.end] for s in sections) == content
+
+
+def test_docx_headings_become_markdown_headings():
+    document = docx.Document()
+    document.add_heading("Billing", level=2)
+    document.add_paragraph("Invoices are generated monthly.")
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    content, _ = DocumentParser.parse(buffer.getvalue(), "spec.docx")
+
+    assert content == "## Billing\nInvoices are generated monthly."
+
+
+def test_bm25_ranks_the_matching_section_first():
+    index = SectionIndex.from_bytes(SectionIndex.build(SPEC).to_bytes())
+
+    scores = index.scores({"invoice": 1.0, "payment": 1.0})
+
+    assert max(range(len(scores)), key=scores.__getitem__) == 2
+    assert scores[1] == 0
+
+
+def test_compose_top_k_sections_within_budget():
+    composed = PromptComposer.compose(SPEC, extra_instructions="Handle overdue invoices", section_top_k=1)
+
+    assert "## Billing" in composed.prompt
+    assert "## Authentication" not in composed.prompt
+    assert "[... 2 sections omitted ...]" in composed.prompt
+    assert [s["title"] for s in composed.to_response()["document_sections"]] == ["Billing"]
+
+    # Only what fits the budget is picked, best first
+    tight = PromptComposer.compose(SPEC, extra_instructions="invoices email", section_top_k=3, token_budget=230)
+    assert [s["title"] for s in tight.to_response()["document_sections"]] == ["Billing"]
+    assert tight.estimated_tokens <= 230
+
+
+def test_index_is_stored_at_upload_and_built_once_for_older_rows(api_client, db_sessionmaker):
+    upload = api_client.post("/api/upload", files={"file": ("spec.md", SPEC.encode(), "text/markdown")})
+    with db_sessionmaker() as db:
+        stored = db.query(Document).filter_by(document_id=upload.json()["document_id"]).one()
+        assert SectionIndex.from_bytes(stored.section_index).sections[2].title == "Billing"
+        db.add(Document(document_id="legacy", filename="old.md", content=SPEC, file_type="md"))
+        db.commit()
+
+    response = api_client.post("/api/compose-prompt", json={
+        "document_id": "legacy", "extra_instructions": "sales reports export", "section_top_k": 1,
+    })
+
+    assert response.status_code == 200
+    assert [s["title"] for s in response.json()["document_sections"]] == ["Reporting"]
+    with db_sessionmaker() as db:
+        assert db.query(Document).filter_by(document_id="legacy").one().section_index is not None
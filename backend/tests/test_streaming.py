@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from app.config import settings
+from app.models.models import GeneratedProject
+from app.services.response_parser import FencedBlockExtractor
+from benchmarks.stub_llm import StubLLMServer
+
+MARKDOWN_RESPONSE = """Aqui está o projeto.
+
+### `backend/main.py`
+```python
+print("hello")
+```
+
+**Arquivo: requirements.txt**
+```text
+fastapi
+```
+
+```bash
+python backend/main.py
+```
+"""
+
+
+def feed_in_chunks(text, size):
+    extractor = FencedBlockExtractor()
+    files = []
+    for i in range(0, len(text), size):
+        files.extend(extractor.feed(text[i:i + size]))
+    return files + extractor.close()
+
+
+@pytest.mark.parametrize("size", [1, 7, 10_000])
+def test_extractor_emits_files_with_paths(size):
+    files = feed_in_chunks(MARKDOWN_RESPONSE, size)
+    assert files == [
+        {"path": "backend/main.py", "content": 'print("hello")'},
+        {"path": "requirements.txt", "content": "fastapi"},
+    ]
+
+
+def test_extractor_reads_json_block():
+    text = '```json\n{"files": [{"path": "a.py", "content": "x = {1: 2}"}]}\n```'
+    assert feed_in_chunks(text, 3) == [{"path": "a.py", "content": "x = {1: 2}"}]
+
+
+def test_generate_code_stream(api_client, db_sessionmaker, monkeypatch):
+    with StubLLMServer(latency=0.2, response_text=MARKDOWN_RESPONSE, stream_chunks=10) as server:
+        monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+        monkeypatch.setattr(settings, "GEMINI_BASE_URL", server.base_url)
+
+        with api_client.stream("POST", "/api/generate-code/stream", json={"prompt": "hello"}) as response:
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            events = [json.loads(line) for line in response.iter_lines() if line]
+
+    types = [event["type"] for event in events]
+    assert types.count("chunk") > 1
+    assert types[-1] == "done"
+    assert "".join(e["text"] for e in events if e["type"] == "chunk") == MARKDOWN_RESPONSE
+
+    streamed = [e["path"] for e in events if e["type"] == "file"]
+    done = events[-1]
+    assert streamed == ["backend/main.py", "requirements.txt"]
+    assert [f["path"] for f in done["files"]] == streamed
+    assert api_client.get(done["download_url"]).status_code == 200
+
+    # Saved through the stream's own session, after the request's dependencies are gone
+    db = db_sessionmaker()
+    try:
+        project = db.query(GeneratedProject).filter(GeneratedProject.project_id == done["project_id"]).one()
+    finally:
+        db.close()
+    assert project.prompt == "hello"
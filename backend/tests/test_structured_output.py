@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from app.config import settings
+from app.services.structured_output import salvage_files, structured_stats, validate_output
+from benchmarks.stub_llm import StubLLMServer
+
+BIG = "x = 1\n" * 800
+
+
+def project_json(paths, instructions="Run it", commands=("python a.py",)):
+    return json.dumps({
+        "files": [{"path": path, "content": BIG} for path in paths],
+        "instructions": instructions,
+        "commands": list(commands),
+    })
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    structured_stats.reset()
+    yield
+    structured_stats.reset()
+
+
+@pytest.fixture
+def structured_llm(monkeypatch):
+    def start(texts):
+        server = StubLLMServer(latency=0, structured_texts=texts)
+        server.__enter__()
+        monkeypatch.setattr(settings, "GEMINI_API_KEY", "test-key")
+        monkeypatch.setattr(settings, "GEMINI_BASE_URL", server.base_url)
+        servers.append(server)
+        return server
+
+    servers = []
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+def test_salvage_keeps_complete_files_of_a_cut_off_answer():
+    truncated = project_json(["a.py", "b.py", "c.py"])[:-len(BIG)]
+
+    attempt = validate_output(truncated)
+
+    assert attempt.project is None
+    assert [f.path for f in attempt.salvaged] == ["a.py", "b.py"]
+    assert attempt.errors
+    assert salvage_files("no json here") == []
+
+
+def test_structured_mode_sends_schema_and_validates(api_client, structured_llm):
+    server = structured_llm([project_json(["a.py"])])
+
+    response = api_client.post("/api/generate-code", json={"prompt": "hello", "output_mode": "structured"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [f["path"] for f in body["files"]] == ["a.py"]
+    assert body["commands"] == ["python a.py"]
+    config = server.app.state.bodies[0]["generationConfig"]
+    assert config["responseMimeType"] == "application/json"
+    assert set(config["responseSchema"]["properties"]) == {"files", "instructions", "commands"}
+
+    stats = api_client.get("/api/generate-code/structured/stats").json()
+    assert stats["generations"] == 1 and stats["valid_first_attempt"] == 1
+    assert stats["repair_requests"] == 0
+
+
+def test_partial_answer_triggers_one_repair_for_missing_files(api_client, structured_llm):
+    truncated = project_json(["a.py", "b.py", "c.py"])[:-len(BIG)]
+    server = structured_llm([truncated, project_json(["c.py"], instructions="Fixed")])
+
+    response = api_client.post("/api/generate-code", json={"prompt": "hello", "output_mode": "structured"})
+
+    body = response.json()
+    assert sorted(f["path"] for f in body["files"]) == ["a.py", "b.py", "c.py"]
+    assert body["instructions"] == "Fixed"
+    assert server.app.state.requests == 2
+    repair_prompt = server.app.state.bodies[1]["contents"][0]["parts"][0]["text"]
+    assert repair_prompt.startswith("hello")
+    assert "- a.py\n- b.py" in repair_prompt
+
+    stats = structured_stats.stats()
+    assert stats["first_attempt_failure_rate"] == 1.0
+    assert stats["repaired"] == 1 and stats["final_failure_rate"] == 0.0
+    assert stats["tokens_saved"] > 0
+
+
+def test_failed_repair_returns_what_was_salvaged(api_client, structured_llm, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_REPAIR_ATTEMPTS", 1)
+    truncated = project_json(["a.py", "b.py"])[:-len(BIG)]
+    structured_llm([truncated, '{"files": []}'])
+
+    body = api_client.post("/api/generate-code", json={"prompt": "hello", "output_mode": "structured"}).json()
+
+    assert [f["path"] for f in body["files"]] == ["a.py"]
+    assert structured_stats.stats()["failed"] == 1
+
+
+def test_text_and_structured_results_are_cached_apart(api_client, structured_llm):
+    server = structured_llm([project_json(["a.py"])])
+
+    api_client.post("/api/generate-code", json={"prompt": "same"})
+    api_client.post("/api/generate-code", json={"prompt": "same", "output_mode": "structured"})
+    cached = api_client.post("/api/generate-code", json={"prompt": "same", "output_mode": "structured"}).json()
+
+    assert server.app.state.requests == 2
+    assert cached["cached"] is True and cached["commands"] == ["python a.py"]
@@ -0,0 +1,81 @@
+from app.config import settings
+from app.models.models import Document
+
+
+def test_upload_markdown(api_client, db_sessionmaker):
+    response = api_client.post("/api/upload", files={"file": ("spec.md", b"# Spec\nBuild it", "text/markdown")})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["file_type"] == "md"
+    assert body["content_preview"] == "# Spec\nBuild it"
+
+    db = db_sessionmaker()
+    assert db.query(Document).filter(Document.document_id == body["document_id"]).one().content == "# Spec\nBuild it"
+    db.close()
+
+
+def test_upload_pdf_spooled_to_disk(api_client, make_pdf, monkeypatch):
+    # Force the spool to roll over so PyMuPDF opens the file by path
+    monkeypatch.setattr(settings, "UPLOAD_SPOOL_MEMORY_BYTES", 16)
+    pdf = make_pdf(["first page", "second page"])
+
+    response = api_client.post("/api/upload", files={"file": ("spec.pdf", pdf, "application/pdf")})
+    assert response.status_code == 200
+    assert "first page" in response.json()["content_preview"]
+    assert "second page" in response.json()["content_preview"]
+
+
+def test_upload_docx_in_memory(api_client, make_docx):
+    response = api_client.post("/api/upload", files={"file": ("spec.docx", make_docx(["Hello", "World"]), "application/octet-stream")})
+    assert response.status_code == 200
+    assert response.json()["content_preview"] == "Hello\nWorld"
+
+
+def test_upload_over_limit_is_rejected(api_client, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 1024)
+
+    # Rejected from Content-Length before the body is read
+    response = api_client.post("/api/upload", files={"file": ("big.txt", b"x" * 200_000, "text/plain")})
+    assert response.status_code == 413
+
+    # Rejected while streaming when the declared length is within the allowance
+    response = api_client.post("/api/upload", files={"file": ("big.txt", b"x" * 2048, "text/plain")})
+    assert response.status_code == 413
+
+
+def test_upload_rejects_unsupported_type(api_client):
+    response = api_client.post("/api/upload", files={"file": ("image.png", b"\x89PNG", "image/png")})
+    assert response.status_code == 400
+
+
+def test_repeat_upload_reuses_parsed_document(api_client, db_sessionmaker, make_pdf, monkeypatch):
+    from app.services.document_parser import DocumentParser
+    from app.services.upload_dedup import upload_dedup
+
+    monkeypatch.setattr(upload_dedup, "hits", 0)
+    monkeypatch.setattr(upload_dedup, "misses", 0)
+    pdf = make_pdf(["dedup me"])
+
+    first = api_client.post("/api/upload", files={"file": ("spec.pdf", pdf, "application/pdf")}).json()
+    assert first["cached"] is False
+
+    def fail(*args, **kwargs):
+        raise AssertionError("repeat upload must not be parsed")
+
+    monkeypatch.setattr(DocumentParser, "parse", fail)
+    second = api_client.post("/api/upload", files={"file": ("copy.pdf", pdf, "application/pdf")}).json()
+    assert second["cached"] is True
+    assert second["document_id"] == first["document_id"]
+    assert api_client.get("/api/upload/stats").json() == {"hits": 1, "misses": 1}
+
+    db = db_sessionmaker()
+    assert db.query(Document).count() == 1
+    db.close()
+
+
+def test_same_bytes_with_another_type_is_parsed_again(api_client):
+    first = api_client.post("/api/upload", files={"file": ("notes.md", b"# Notes", "text/markdown")}).json()
+    second = api_client.post("/api/upload", files={"file": ("notes.txt", b"# Notes", "text/plain")}).json()
+    assert second["cached"] is False
+    assert second["file_type"] == "txt"
+    assert second["document_id"] != first["document_id"]
@@ -5,6 +5,7 @@ cd "$(dirname "$0")/../backend"
 echo "Starting backend..."
 source venv/bin/activate || python -m venv venv && source venv/bin/activate
 pip install -r requirements.txt
+alembic upgrade head
 uvicorn app.main:app --host 0.0.0.0 --port 8000 &
 BACK_PID=$!
 
@@ -17,6 +17,10 @@ source venv/bin/activate
 echo "Installing dependencies..."
 pip install -r requirements.txt
 
+# Create or update the database schema
+echo "Running database migrations..."
+alembic upgrade head
+
 # Run the application
 echo "Starting FastAPI server..."
 uvicorn app.main:app --reload --port 8000
\ No newline at end of file